@@ -0,0 +1,482 @@
+"""
+api_server.py
+-------------
+
+Этот файл реализует HTTP/JSON-сервис поиска фильмов на asyncio: `python main.py serve`.
+
+Сервис нужен другим внутренним сервисам и использует те же DatabaseManager и QueryLogger,
+что и консольное приложение. Конечные точки (параметры передаются в строке запроса GET
+или объектом JSON в теле POST):
+
+    GET /search/keyword?keywords=...&mode=title|natural|boolean
+    GET /search/genre?genre=...
+    GET /search/year?year=...
+    GET /search/actor?actor=...
+    GET /search/multi?keywords=...&mode=...&genre=...&start_year=...&end_year=...&actor=...&sort_by=...&sort_order=...
+    GET /random?limit=...
+    GET /popular?limit=...
+    GET /stats?limit=...
+    GET /health
+
+У всех конечных точек, кроме /health, есть необязательный параметр limit (не больше max_limit).
+/stats возвращает время выполнения запросов к базе данных (p50/p95/p99 по формам запросов,
+см. database/instrumentation.py) и количество медленных запросов.
+Идентификатор пользователя для журнала запросов передается заголовком X-User-Id (по умолчанию 0,
+как у гостя в консольном приложении).
+
+Цикл событий только разбирает запросы и отправляет ответы, а сами обращения к базе данных
+выполняются в ограниченном пуле потоков (db_workers). Запросы сверх max_pending сразу
+получают 503, запросы дольше request_timeout — 504. По SIGINT/SIGTERM сервер перестает
+принимать соединения, дожидается выполняемых запросов (не дольше shutdown_timeout),
+записывает журнал запросов и закрывает пулы соединений.
+
+Вместо DatabaseManager и QueryLogger серверу можно передать любые объекты с теми же методами,
+например заглушку базы данных для локальной проверки.
+
+Классы:
+-------
+ApiServer
+    __init__(self, db_manager, query_logger, **options)
+        Инициализирует объект ApiServer.
+
+    start(self)
+        Начинает принимать соединения.
+
+    serve_forever(self)
+        Обслуживает запросы до сигнала остановки.
+
+    stop(self)
+        Просит serve_forever завершить работу.
+
+    shutdown(self)
+        Корректно останавливает сервер.
+
+Функции:
+--------
+run_server(args)
+    Точка входа команды `serve`.
+"""
+
+import asyncio
+import json
+import signal
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from config import API_SERVER_CONFIG, DATABASE_CONFIG
+from database import DatabaseManager, close_connection_pools, execute_search, get_query_stats
+from database.pool import PoolExhaustedError
+from log_manager import QueryLogger
+
+# Конечные точки поиска: путь -> (тип поиска, допустимые параметры)
+SEARCH_ROUTES = {
+    '/search/keyword': ('keyword', ('keywords', 'mode')),
+    '/search/genre': ('genre', ('genre',)),
+    '/search/year': ('year', ('year',)),
+    '/search/actor': ('actor', ('actor',)),
+    '/search/multi': ('multiple_criteria', ('keywords', 'mode', 'genre', 'start_year', 'end_year', 'actor',
+                                            'sort_by', 'sort_order')),
+}
+
+# Максимальное количество строк заголовков одного запроса
+MAX_HEADER_LINES = 100
+
+
+class _HttpError(Exception):
+    """
+    Ошибка, которая возвращается клиенту с заданным кодом ответа.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class ApiServer:
+    """
+    Класс HTTP/JSON-сервиса поиска фильмов.
+
+    Атрибуты:
+    ----------
+    db_manager : DatabaseManager
+        Менеджер базы данных.
+    query_logger : QueryLogger
+        Журнал поисковых запросов.
+    host : str
+        Адрес, на котором принимаются соединения.
+    port : int
+        Порт, на котором принимаются соединения (0 — любой свободный).
+    db_workers : int
+        Количество потоков, выполняющих обращения к базе данных.
+    max_pending : int
+        Максимальное количество запросов, ожидающих или выполняющих обращение к базе данных.
+    request_timeout : float
+        Максимальное время чтения и выполнения одного запроса (в секундах).
+    keepalive_timeout : float
+        Время ожидания следующего запроса в открытом соединении (в секундах).
+    shutdown_timeout : float
+        Максимальное время ожидания выполняемых запросов при остановке (в секундах).
+    max_limit : int
+        Максимальное значение параметра limit.
+    max_body_size : int
+        Максимальный размер тела запроса (в байтах).
+
+    Методы:
+    -------
+    start()
+        Начинает принимать соединения.
+    serve_forever()
+        Обслуживает запросы до сигнала остановки.
+    stop()
+        Просит serve_forever завершить работу.
+    shutdown()
+        Корректно останавливает сервер.
+    """
+
+    def __init__(self, db_manager, query_logger, **options):
+        """
+        Инициализирует объект ApiServer.
+
+        Параметры:
+        ----------
+        db_manager : DatabaseManager
+            Менеджер базы данных.
+        query_logger : QueryLogger
+            Журнал поисковых запросов.
+        **options
+            Переопределяют значения из API_SERVER_CONFIG: host, port, db_workers, max_pending,
+            request_timeout, keepalive_timeout, shutdown_timeout, max_limit, max_body_size.
+        """
+        settings = dict(API_SERVER_CONFIG, **options)
+        self.db_manager = db_manager
+        self.query_logger = query_logger
+        self.host = settings['host']
+        self.port = settings['port']
+        self.db_workers = settings['db_workers']
+        self.max_pending = settings['max_pending']
+        self.request_timeout = settings['request_timeout']
+        self.keepalive_timeout = settings['keepalive_timeout']
+        self.shutdown_timeout = settings['shutdown_timeout']
+        self.max_limit = settings['max_limit']
+        self.max_body_size = settings['max_body_size']
+
+        self._executor = None
+        self._server = None
+        self._pending = 0
+        self._active_requests = 0
+        self._idle = None
+        self._stopping = None
+        self._closing = False
+        self._connections = {}
+
+    async def start(self):
+        """
+        Начинает принимать соединения. Фактический порт записывается в атрибут port.
+        """
+        self._executor = ThreadPoolExecutor(max_workers=self.db_workers, thread_name_prefix='api-db')
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._stopping = asyncio.Event()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port,
+                                                  backlog=self.max_pending)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """
+        Обслуживает запросы до SIGINT/SIGTERM (или вызова stop), затем корректно останавливает сервер.
+        """
+        if self._server is None:
+            await self.start()
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signal_number, self.stop)
+            except (NotImplementedError, RuntimeError):
+                # На Windows обработчики сигналов в цикле событий недоступны; там остается KeyboardInterrupt
+                pass
+        print(f"Serving film search API on http://{self.host}:{self.port}", file=sys.stderr)
+        try:
+            await self._stopping.wait()
+        finally:
+            await self.shutdown()
+
+    def stop(self):
+        """
+        Просит serve_forever завершить работу.
+        """
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def shutdown(self):
+        """
+        Корректно останавливает сервер: перестает принимать соединения, дожидается выполняемых
+        запросов (не дольше shutdown_timeout), закрывает простаивающие соединения,
+        останавливает пул потоков и записывает журнал запросов.
+        """
+        if self._closing:
+            return
+        self._closing = True
+        self._server.close()
+        try:
+            await asyncio.wait_for(self._idle.wait(), self.shutdown_timeout)
+        except asyncio.TimeoutError:
+            print(f"Shutdown timeout: {self._active_requests} requests still running", file=sys.stderr)
+        for writer in list(self._connections):
+            writer.close()
+        await self._server.wait_closed()
+
+        # Закрытие журнала дожидается записи очереди, поэтому выполняется вне цикла событий
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._executor.shutdown, True)
+        await loop.run_in_executor(None, self.query_logger.close)
+
+    async def _handle_connection(self, reader, writer):
+        """
+        Обслуживает одно соединение: запросы читаются по очереди, пока клиент держит соединение открытым.
+        """
+        self._connections[writer] = False
+        try:
+            while not self._closing:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), self.keepalive_timeout)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+
+                self._begin_request(writer)
+                try:
+                    status, payload, keep_alive = await self._process(request_line, reader)
+                finally:
+                    self._end_request(writer)
+                keep_alive = keep_alive and not self._closing
+                writer.write(self._response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.pop(writer, None)
+            writer.close()
+
+    def _begin_request(self, writer):
+        self._connections[writer] = True
+        self._active_requests += 1
+        self._idle.clear()
+
+    def _end_request(self, writer):
+        self._connections[writer] = False
+        self._active_requests -= 1
+        if self._active_requests == 0:
+            self._idle.set()
+
+    async def _process(self, request_line, reader):
+        """
+        Читает и выполняет один запрос.
+
+        Возвращает:
+        ----------
+        tuple
+            (код ответа, данные ответа, оставить ли соединение открытым).
+        """
+        keep_alive = False
+        # Пока запрос не прочитан целиком, в потоке остаются его заголовки или тело:
+        # после ошибки на этом этапе соединение закрывается, иначе они разбирались бы как следующий запрос
+        request_read = False
+        try:
+            method, target, version = self._parse_request_line(request_line)
+            headers = await asyncio.wait_for(self._read_headers(reader), self.request_timeout)
+            connection = headers.get('connection', '').lower()
+            keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+            body = await asyncio.wait_for(self._read_body(reader, headers), self.request_timeout)
+            request_read = True
+            payload = await self._dispatch(method, target, headers, body)
+            return HTTPStatus.OK, payload, keep_alive
+        except _HttpError as error:
+            return error.status, {'error': error.message}, keep_alive and request_read and error.status < 500
+        except asyncio.TimeoutError:
+            return HTTPStatus.REQUEST_TIMEOUT, {'error': 'Request was not received in time'}, False
+        except (ValueError, asyncio.LimitOverrunError):
+            return HTTPStatus.BAD_REQUEST, {'error': 'Malformed request'}, False
+
+    @staticmethod
+    def _parse_request_line(request_line):
+        parts = request_line.decode('latin-1').split()
+        if len(parts) != 3 or not parts[2].startswith('HTTP/1.'):
+            raise _HttpError(HTTPStatus.BAD_REQUEST, 'Malformed request line')
+        return parts
+
+    @staticmethod
+    async def _read_headers(reader):
+        headers = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                return headers
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        raise _HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, 'Too many headers')
+
+    async def _read_body(self, reader, headers):
+        length = int(headers.get('content-length') or 0)
+        if length < 0:
+            raise ValueError('negative Content-Length')
+        if length > self.max_body_size:
+            raise _HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, 'Request body is too large')
+        return await reader.readexactly(length) if length else b''
+
+    async def _dispatch(self, method, target, headers, body):
+        """
+        Выбирает обработчик по пути запроса и выполняет его.
+        """
+        url = urlsplit(target)
+        if method not in ('GET', 'POST'):
+            raise _HttpError(HTTPStatus.METHOD_NOT_ALLOWED, f'Method {method} is not allowed')
+
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        if body:
+            try:
+                data = json.loads(body)
+            except ValueError:
+                raise _HttpError(HTTPStatus.BAD_REQUEST, 'Request body is not valid JSON')
+            if not isinstance(data, dict):
+                raise _HttpError(HTTPStatus.BAD_REQUEST, 'Request body must be a JSON object')
+            params.update(data)
+
+        if url.path == '/health':
+            return {'status': 'stopping' if self._closing else 'ok', 'pending': self._pending}
+
+        limit = self._parse_limit(params.pop('limit', None))
+        if url.path in SEARCH_ROUTES:
+            search_type, allowed = SEARCH_ROUTES[url.path]
+            unknown = set(params) - set(allowed)
+            if unknown:
+                raise _HttpError(HTTPStatus.BAD_REQUEST, f"Unknown parameters: {', '.join(sorted(unknown))}")
+            if any(not isinstance(value, (str, int)) or isinstance(value, bool) for value in params.values()):
+                raise _HttpError(HTTPStatus.BAD_REQUEST, 'Search parameters must be strings or integers')
+            params = {name: str(value) for name, value in params.items()}
+            user_id = self._parse_user_id(headers.get('x-user-id'))
+            rows = await self._run_db(self._search, user_id, search_type, params, limit)
+            return {'search_type': search_type, 'count': len(rows), 'results': rows}
+        if url.path == '/random':
+            rows = await self._run_db(self.db_manager.get_random_movies, limit)
+            return {'count': len(rows), 'results': rows}
+        if url.path == '/popular':
+            rows = await self._run_db(self._popular, limit)
+            return {'count': len(rows), 'results': rows}
+        if url.path == '/stats':
+            stats = get_query_stats()
+            return {'slow_queries': stats.slow_queries, 'slow_query_ms': stats.slow_query_ms,
+                    'queries': stats.snapshot(limit)}
+        raise _HttpError(HTTPStatus.NOT_FOUND, f'Unknown endpoint: {url.path}')
+
+    def _parse_limit(self, value):
+        if value is None:
+            return min(10, self.max_limit)
+        try:
+            limit = int(value)
+        except (TypeError, ValueError):
+            raise _HttpError(HTTPStatus.BAD_REQUEST, 'limit must be an integer')
+        if not 0 < limit <= self.max_limit:
+            raise _HttpError(HTTPStatus.BAD_REQUEST, f'limit must be between 1 and {self.max_limit}')
+        return limit
+
+    @staticmethod
+    def _parse_user_id(value):
+        if value is None:
+            return 0
+        try:
+            return int(value)
+        except ValueError:
+            raise _HttpError(HTTPStatus.BAD_REQUEST, 'X-User-Id must be an integer')
+
+    async def _run_db(self, func, *args):
+        """
+        Выполняет обращение к базе данных в пуле потоков с учетом max_pending и request_timeout.
+        """
+        if self._pending >= self.max_pending:
+            raise _HttpError(HTTPStatus.SERVICE_UNAVAILABLE, 'Server is busy, retry later')
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            # Если время истекло, пока задача ждала свободный поток, отмена убирает ее из очереди пула;
+            # уже начатое обращение к базе данных доработает в своем потоке
+            return await asyncio.wait_for(loop.run_in_executor(self._executor, partial(func, *args)),
+                                          self.request_timeout)
+        except asyncio.TimeoutError:
+            raise _HttpError(HTTPStatus.GATEWAY_TIMEOUT, 'Database request timed out')
+        except ValueError as error:
+            raise _HttpError(HTTPStatus.BAD_REQUEST, str(error))
+        except PoolExhaustedError:
+            raise _HttpError(HTTPStatus.SERVICE_UNAVAILABLE, 'No database connection available, retry later')
+        except Exception as error:
+            print(f"Error handling API request: {error}", file=sys.stderr)
+            raise _HttpError(HTTPStatus.INTERNAL_SERVER_ERROR, 'Internal server error')
+        finally:
+            self._pending -= 1
+
+    def _search(self, user_id, search_type, params, limit):
+        """
+        Выполняет поиск и записывает запрос в журнал в том же виде, что и консольное приложение.
+        """
+        rows = execute_search(self.db_manager, search_type, params, limit)
+        mode = params.get('mode') or 'title'
+        if search_type == 'keyword':
+            self.query_logger.log_keyword_search(user_id, params.get('keywords') or '', mode)
+        elif search_type == 'multiple_criteria':
+            self.query_logger.log_multiple_criteria_search(
+                user_id, params.get('keywords') or '', params.get('genre') or '', params.get('start_year') or '',
+                params.get('end_year') or '', params.get('actor') or '', mode)
+        elif search_type == 'genre':
+            self.query_logger.log_genre_search(user_id, params.get('genre'))
+        elif search_type == 'year':
+            self.query_logger.log_year_search(user_id, params.get('year'))
+        else:
+            self.query_logger.log_actor_search(user_id, params.get('actor'))
+        return rows
+
+    def _popular(self, limit):
+        """
+        Возвращает популярные запросы с разобранными параметрами поиска.
+        """
+        return [{'search_type': search_type,
+                 'search_params': json.loads(search_params) if isinstance(search_params, str) else search_params,
+                 'query_count': query_count}
+                for search_type, search_params, query_count in self.query_logger.get_popular_search_queries(limit)]
+
+    @staticmethod
+    def _response(status, payload, keep_alive):
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+        status = HTTPStatus(status)
+        head = [f'HTTP/1.1 {status.value} {status.phrase}',
+                'Content-Type: application/json; charset=utf-8',
+                f'Content-Length: {len(body)}',
+                f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            head.append('Retry-After: 1')
+        return ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body
+
+
+def run_server(args):
+    """
+    Точка входа команды `serve`: запускает сервис и работает до SIGINT/SIGTERM.
+
+    Параметры:
+    ----------
+    args : argparse.Namespace
+        Аргументы команды: host, port, workers (None — значения из API_SERVER_CONFIG).
+    """
+    options = {name: value for name, value in (('host', args.host), ('port', args.port),
+                                               ('db_workers', args.workers)) if value is not None}
+    server = ApiServer(DatabaseManager(**DATABASE_CONFIG), QueryLogger(), **options)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close_connection_pools()
@@ -5,10 +5,13 @@ authentication/manager.py
 Этот модуль содержит класс AuthManager, который используется для управления аутентификацией пользователей.
 Он поддерживает регистрацию, вход, выход из системы и сохранение состояния пользователя.
 
+Состояние сохраняется в виде токена сессии, подписанного HMAC (см. authentication/tokens.py).
+Действующий токен проверяется при запуске локально, без запроса к базе данных.
+
 Классы:
 -------
 AuthManager
-    __init__(self, localization_manager, db_manager, state_file='user_state.json')
+    __init__(self, localization_manager, db_manager, state_file='user_state.json', validate_state=True)
         Инициализирует объект AuthManager.
 
     register_user(self, username, password)
@@ -26,9 +29,15 @@ AuthManager
     save_state(self, username, hashed_password)
         Сохраняет состояние пользователя в файл.
 
-    load_state(self)
+    load_state(self, validate=True)
         Загружает состояние пользователя из файла.
 
+    validate_session(self)
+        Проверяет по базе данных состояние, загруженное из файла.
+
+    ensure_username_index(self)
+        Создает уникальный индекс по users.username, если его нет.
+
     check_user_exists(self, username, hashed_password)
         Проверяет, существует ли пользователь с заданным именем пользователя и хэшированным паролем.
 
@@ -37,8 +46,16 @@ AuthManager
 """
 
 import hashlib
+import hmac
 import json
 import os
+import time
+
+from config import AUTH_CONFIG
+from .tokens import issue_token, load_secret, password_fingerprint, verify_token
+
+# Имя уникального индекса по users.username (см. database_scripts/Users_Table.sql)
+USERNAME_INDEX = 'uq_users_username'
 
 
 class AuthManager:
@@ -57,10 +74,12 @@ class AuthManager:
         ID текущего пользователя (0, если не залогинен).
     username : bool
         Имя текущего пользователя (False, если не залогинен).
+    secret : bytes
+        Секретный ключ для подписи токенов сессии.
 
     Методы:
     -------
-    __init__(self, localization_manager, db_manager, state_file='user_state.json')
+    __init__(self, localization_manager, db_manager, state_file='user_state.json', validate_state=True)
         Инициализирует объект AuthManager.
     register_user(username, password)
         Регистрирует нового пользователя с заданным именем пользователя и паролем.
@@ -72,15 +91,19 @@ class AuthManager:
         Выполняет выход пользователя из системы.
     save_state(username, hashed_password)
         Сохраняет состояние пользователя в файл.
-    load_state()
+    load_state(validate=True)
         Загружает состояние пользователя из файла.
+    validate_session()
+        Проверяет по базе данных состояние, загруженное из файла.
+    ensure_username_index()
+        Создает уникальный индекс по users.username, если его нет.
     check_user_exists(username, hashed_password)
         Проверяет, существует ли пользователь с заданным именем пользователя и хэшированным паролем.
     clear_state()
         Очищает состояние пользователя в файле.
     """
 
-    def __init__(self, localization_manager, db_manager, state_file='user_state.json'):
+    def __init__(self, localization_manager, db_manager, state_file='user_state.json', validate_state=True):
         """
         Инициализирует объект AuthManager.
 
@@ -92,13 +115,18 @@ class AuthManager:
             Объект для управления базой данных.
         state_file : str, optional
             Путь к файлу состояния пользователя (по умолчанию 'user_state.json').
+        validate_state : bool, optional
+            Проверять ли просроченное состояние по базе данных сразу (по умолчанию True).
+            При False проверка выполняется позже методом validate_session().
         """
         self.localization_manager = localization_manager
         self.db_manager = db_manager
         self.state_file = state_file
         self.user_id = 0
         self.username = False
-        self.load_state()
+        self.secret = load_secret(AUTH_CONFIG['secret_file'])
+        self._pending_state = None
+        self.load_state(validate=validate_state)
 
     def register_user(self, username, password):
         """
@@ -127,7 +155,11 @@ class AuthManager:
                 VALUES (%s, %s)
                 """
                 params = (username, hashed_password)
-                self.db_manager.execute_update(insert_query, params)
+                try:
+                    self.db_manager.execute_update(insert_query, params)
+                except self.db_manager.backend.IntegrityError:
+                    # Имя заняли между проверкой и вставкой (уникальный индекс uq_users_username)
+                    raise ValueError(self.localization_manager.get_localized_text('username_exists').format(username))
                 self.login_user(username, password)
                 break  # Выход из цикла при успешной регистрации
             except ValueError as e:
@@ -195,40 +227,121 @@ class AuthManager:
 
     def save_state(self, username, hashed_password):
         """
-        Сохраняет состояние пользователя в файл.
+        Сохраняет состояние пользователя в файл в виде подписанного токена сессии.
 
         Параметры:
         ----------
         username : str
             Имя пользователя.
         hashed_password : str
-            Хэшированный пароль пользователя.
+            Хэшированный пароль пользователя (в файл попадает только его отпечаток).
         """
         state = {
-            'username': username,
-            'hashed_password': hashed_password,
-            'user_id': self.user_id
+            'user_id': self.user_id,
+            'token': issue_token(self.secret, self.user_id, username, hashed_password, AUTH_CONFIG['session_ttl'])
         }
         with open(self.state_file, 'w') as f:
             json.dump(state, f)
 
-    def load_state(self):
+    def load_state(self, validate=True):
         """
         Загружает состояние пользователя из файла.
+
+        Подпись и срок действия токена проверяются локально. Действующий токен принимается
+        без запроса к базе данных, а перепроверка выполняется позже методом validate_session().
+        Просроченный токен (и состояние старого формата с хэшем пароля) принимается только
+        после проверки по базе данных.
+
+        Параметры:
+        ----------
+        validate : bool, optional
+            Проверить просроченное состояние по базе данных сразу (по умолчанию True). При False
+            пользователь считается не вошедшим, пока проверку не выполнит validate_session().
         """
-        if os.path.exists(self.state_file):
-            with open(self.state_file, 'r') as f:
-                state = json.load(f)
-                username = state.get('username')
-                hashed_password = state.get('hashed_password')
-                self.user_id = state.get('user_id', 0)
-                if username and hashed_password:
-                    if self.check_user_exists(username, hashed_password):
-                        self.user_id = state['user_id']
-                        self.username = state.get('username')
-                    else:
-                        self.user_id = 0
-                        self.clear_state()
+        if not os.path.exists(self.state_file):
+            return
+        with open(self.state_file, 'r') as f:
+            state = json.load(f)
+
+        if 'token' in state:
+            claims = verify_token(self.secret, state['token'])
+            if claims is None:
+                self.clear_state()
+                return
+            self._pending_state = claims
+            if claims['exp'] > time.time():
+                self.user_id = claims['user_id']
+                self.username = claims['username']
+        elif state.get('username') and state.get('hashed_password'):
+            self._pending_state = {'username': state['username'], 'hashed_password': state['hashed_password']}
+
+        if validate and self.user_id == 0 and self._pending_state is not None:
+            self.validate_session()
+
+    def validate_session(self):
+        """
+        Проверяет по базе данных состояние, загруженное методом load_state().
+
+        Пользователь из токена ищется по первичному ключу, а отпечаток пароля сравнивается
+        с токеном. При успешной проверке выпускается новый токен, иначе выполняется выход из системы.
+
+        Возвращает:
+        ----------
+        bool
+            True, если пользователь вошел в систему.
+        """
+        pending, self._pending_state = self._pending_state, None
+        if pending is None:
+            return self.user_id != 0
+
+        before = (self.user_id, self.username)
+        username = pending['username']
+        if 'hashed_password' in pending:
+            # Состояние старого формата: проверяем имя и хэш пароля
+            hashed_password = pending['hashed_password']
+            result = self.db_manager.execute_query(
+                "SELECT id FROM users WHERE username = %s AND password = %s", (username, hashed_password))
+            user_id = result[0]['id'] if result else 0
+        else:
+            result = self.db_manager.execute_query(
+                "SELECT username, password FROM users WHERE id = %s", (pending['user_id'],))
+            valid = bool(result) and result[0]['username'] == username and hmac.compare_digest(
+                password_fingerprint(self.secret, result[0]['password']), pending['pwd'])
+            hashed_password = result[0]['password'] if valid else None
+            user_id = pending['user_id'] if valid else 0
+
+        # Пока шла проверка, пользователь мог выйти или войти под другим именем
+        if (self.user_id, self.username) != before:
+            return self.user_id != 0
+        if not user_id:
+            self.logout_user()
+            return False
+        self.user_id = user_id
+        self.username = username
+        self.save_state(username, hashed_password)
+        return True
+
+    def ensure_username_index(self):
+        """
+        Проверяет наличие уникального индекса по users.username и создает его, если индекса нет.
+
+        С индексом вход и регистрация читают одну строку по имени пользователя,
+        а не просматривают всю таблицу.
+
+        Возвращает:
+        ----------
+        bool
+            True, если индекс есть или создан; False, если создать его не удалось
+            (например, в таблице уже есть повторяющиеся имена).
+        """
+        backend = self.db_manager.backend
+        if self.db_manager.execute_query(backend.UNIQUE_INDEX_QUERY, ('users', 'username'))[0]['count']:
+            return True
+        try:
+            self.db_manager.execute_update(f"CREATE UNIQUE INDEX {USERNAME_INDEX} ON users (username)")
+        except backend.Error:
+            return False
+        return True
 
     def check_user_exists(self, username, hashed_password):
         """
@@ -0,0 +1,164 @@
+"""
+authentication/tokens.py
+------------------------
+
+Этот модуль содержит функции для выпуска и проверки токенов сессии.
+
+Токен — это данные сессии в JSON (идентификатор и имя пользователя, срок действия, отпечаток пароля),
+закодированные в base64url и подписанные HMAC-SHA256 секретным ключом приложения.
+Подпись и срок действия проверяются локально, без запроса к базе данных.
+
+Функции:
+--------
+load_secret(path)
+    Возвращает секретный ключ для подписи токенов.
+
+password_fingerprint(secret, hashed_password)
+    Возвращает отпечаток хэша пароля для включения в токен.
+
+issue_token(secret, user_id, username, hashed_password, ttl)
+    Выпускает подписанный токен сессии.
+
+verify_token(secret, token)
+    Проверяет подпись токена и возвращает данные сессии.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+
+# Переменная окружения с секретным ключом; если она не задана, ключ хранится в файле
+SECRET_ENV_VARIABLE = 'FILM_SEARCH_SESSION_SECRET'
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def load_secret(path):
+    """
+    Возвращает секретный ключ для подписи токенов.
+
+    Ключ берется из переменной окружения FILM_SEARCH_SESSION_SECRET, иначе из файла.
+    Если файла нет, создается новый случайный ключ, доступный только владельцу.
+
+    Параметры:
+    ----------
+    path : str
+        Путь к файлу секретного ключа.
+
+    Возвращает:
+    ----------
+    bytes
+        Секретный ключ.
+    """
+    secret = os.environ.get(SECRET_ENV_VARIABLE)
+    if secret:
+        return secret.encode('utf-8')
+
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            return f.read().strip()
+
+    secret = _b64encode(os.urandom(32)).encode('ascii')
+    descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(descriptor, 'wb') as f:
+        f.write(secret)
+    return secret
+
+
+def password_fingerprint(secret, hashed_password):
+    """
+    Возвращает отпечаток хэша пароля для включения в токен.
+
+    Сам хэш пароля в токен не попадает; по отпечатку можно лишь проверить,
+    что пароль не менялся с момента выпуска токена.
+
+    Параметры:
+    ----------
+    secret : bytes
+        Секретный ключ.
+    hashed_password : str
+        Хэш пароля пользователя.
+
+    Возвращает:
+    ----------
+    str
+        Отпечаток пароля.
+    """
+    return hmac.new(secret, hashed_password.encode('utf-8'), hashlib.sha256).hexdigest()[:32]
+
+
+def issue_token(secret, user_id, username, hashed_password, ttl):
+    """
+    Выпускает подписанный токен сессии.
+
+    Параметры:
+    ----------
+    secret : bytes
+        Секретный ключ.
+    user_id : int
+        Идентификатор пользователя.
+    username : str
+        Имя пользователя.
+    hashed_password : str
+        Хэш пароля пользователя.
+    ttl : float
+        Срок действия токена в секундах.
+
+    Возвращает:
+    ----------
+    str
+        Токен вида "<данные>.<подпись>".
+    """
+    claims = {
+        'user_id': user_id,
+        'username': username,
+        'pwd': password_fingerprint(secret, hashed_password),
+        'exp': int(time.time() + ttl),
+    }
+    payload = _b64encode(json.dumps(claims, separators=(',', ':')).encode('utf-8'))
+    signature = _b64encode(hmac.new(secret, payload.encode('ascii'), hashlib.sha256).digest())
+    return f'{payload}.{signature}'
+
+
+def verify_token(secret, token):
+    """
+    Проверяет подпись токена и возвращает данные сессии.
+
+    Срок действия здесь не проверяется: данные просроченного токена нужны,
+    чтобы перепроверить сессию по базе данных и выпустить новый токен.
+
+    Параметры:
+    ----------
+    secret : bytes
+        Секретный ключ.
+    token : str
+        Токен сессии.
+
+    Возвращает:
+    ----------
+    dict or None
+        Данные сессии (user_id, username, pwd, exp) или None, если токен поврежден или подделан.
+    """
+    if not isinstance(token, str) or token.count('.') != 1:
+        return None
+    payload, signature = token.split('.')
+    try:
+        expected = _b64encode(hmac.new(secret, payload.encode('ascii'), hashlib.sha256).digest())
+        if not hmac.compare_digest(signature.encode('ascii'), expected.encode('ascii')):
+            return None
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        # Сюда попадают и ошибки декодирования: UnicodeError и binascii.Error — подклассы ValueError
+        return None
+    if not isinstance(claims, dict) or not {'user_id', 'username', 'pwd', 'exp'} <= claims.keys():
+        return None
+    return claims
@@ -0,0 +1,227 @@
+"""
+batch_runner.py
+---------------
+
+Этот файл реализует неинтерактивный пакетный запуск поиска: `python main.py batch queries.jsonl`.
+
+Входной файл — JSONL, по одному запросу в строке, в том же виде, в каком QueryLogger
+записывает запросы в таблицу user_queries:
+
+    {"search_type": "keyword", "search_params": {"keywords": "dinosaur", "mode": "natural"}}
+    {"search_type": "multiple_criteria", "search_params": {"genre": "Action", "start_year": "2006"}}
+
+Поле search_params может быть и строкой JSON (как в столбце user_queries.search_params).
+Запросы выполняются параллельно в пуле потоков с ограниченным количеством одновременно
+выполняемых запросов, а результаты выводятся в JSONL по мере готовности вместе со временем
+выполнения каждого запроса. Сводка (количество запросов, ошибки, пропускная способность,
+перцентили времени выполнения) выводится в стандартный поток ошибок.
+
+Классы:
+-------
+BatchRunner
+    __init__(self, db_manager, workers=4, limit=10)
+        Инициализирует объект BatchRunner.
+
+    run(self, queries, output)
+        Выполняет запросы и записывает результаты в поток вывода.
+
+Функции:
+--------
+read_queries(lines)
+    Разбирает строки JSONL с запросами.
+
+run_batch(args)
+    Точка входа команды `batch`.
+"""
+
+import json
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from config import DATABASE_CONFIG
+from database import DatabaseManager, close_connection_pools, execute_search
+
+
+def read_queries(lines):
+    """
+    Разбирает строки JSONL с запросами. Пустые строки пропускаются.
+
+    Параметры:
+    ----------
+    lines : iterable of str
+        Строки входного файла.
+
+    Возвращает:
+    ----------
+    generator of tuple
+        Кортежи (номер строки, запрос или None, текст ошибки разбора или None).
+    """
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            query = json.loads(line)
+            if isinstance(query.get('search_params'), str):
+                query['search_params'] = json.loads(query['search_params'])
+            if not isinstance(query.get('search_type'), str):
+                raise ValueError("search_type is required")
+        except (ValueError, AttributeError) as error:
+            yield line_number, None, f"Invalid query: {error}"
+            continue
+        yield line_number, query, None
+
+
+def _percentile(sorted_values, fraction):
+    """
+    Возвращает перцентиль отсортированного списка (ближайший ранг).
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class BatchRunner:
+    """
+    Класс для пакетного выполнения поисковых запросов.
+
+    Атрибуты:
+    ----------
+    db_manager : DatabaseManager
+        Менеджер базы данных.
+    workers : int
+        Максимальное количество одновременно выполняемых запросов.
+    limit : int
+        Максимальное количество результатов одного запроса.
+
+    Методы:
+    -------
+    run(queries, output)
+        Выполняет запросы и записывает результаты в поток вывода.
+    """
+
+    def __init__(self, db_manager, workers=4, limit=10):
+        """
+        Инициализирует объект BatchRunner.
+
+        Параметры:
+        ----------
+        db_manager : DatabaseManager
+            Менеджер базы данных.
+        workers : int, optional
+            Максимальное количество одновременно выполняемых запросов (по умолчанию 4).
+        limit : int, optional
+            Максимальное количество результатов одного запроса (по умолчанию 10).
+        """
+        self.db_manager = db_manager
+        self.workers = workers
+        self.limit = limit
+
+    def _execute(self, line_number, query):
+        """
+        Выполняет один запрос и возвращает запись результата.
+        """
+        record = {
+            'line': line_number,
+            'search_type': query['search_type'],
+            'search_params': query.get('search_params') or {},
+        }
+        started = time.perf_counter()
+        try:
+            rows = execute_search(self.db_manager, record['search_type'], record['search_params'], self.limit)
+            record['count'] = len(rows)
+            record['results'] = rows
+        except Exception as error:
+            record['error'] = f"{type(error).__name__}: {error}"
+        record['latency_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        return record
+
+    def run(self, queries, output):
+        """
+        Выполняет запросы и записывает результаты в поток вывода.
+
+        Одновременно в работе находится не больше 2 * workers запросов, поэтому входной файл
+        читается по мере выполнения и может быть сколь угодно большим.
+
+        Параметры:
+        ----------
+        queries : iterable of tuple
+            Запросы из read_queries.
+        output : file object
+            Поток для записи результатов в JSONL.
+
+        Возвращает:
+        ----------
+        dict
+            Сводка: queries, errors, elapsed_s, qps, p50_ms, p95_ms, max_ms.
+        """
+        latencies = []
+        errors = 0
+
+        def emit(record):
+            nonlocal errors
+            if 'error' in record:
+                errors += 1
+            else:
+                latencies.append(record['latency_ms'])
+            output.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='batch') as executor:
+            pending = set()
+            for line_number, query, parse_error in queries:
+                if parse_error is not None:
+                    emit({'line': line_number, 'error': parse_error, 'latency_ms': 0.0})
+                    continue
+                if len(pending) >= 2 * self.workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        emit(future.result())
+                pending.add(executor.submit(self._execute, line_number, query))
+            for future in wait(pending).done:
+                emit(future.result())
+        output.flush()
+
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+        total = len(latencies) + errors
+        return {
+            'queries': total,
+            'errors': errors,
+            'elapsed_s': round(elapsed, 3),
+            'qps': round(total / elapsed, 1) if elapsed else 0.0,
+            'p50_ms': _percentile(latencies, 0.5),
+            'p95_ms': _percentile(latencies, 0.95),
+            'max_ms': latencies[-1] if latencies else 0.0,
+        }
+
+
+def run_batch(args):
+    """
+    Точка входа команды `batch`: читает запросы из файла (или stdin при '-'),
+    выполняет их и выводит результаты и сводку.
+
+    Параметры:
+    ----------
+    args : argparse.Namespace
+        Аргументы команды: input, output, workers, limit, no_cache.
+    """
+    db_manager = DatabaseManager(**DATABASE_CONFIG)
+    if args.no_cache:
+        # Для замера пропускной способности повторяющиеся запросы не должны попадать в кэш
+        db_manager.search_cache.max_size = 0
+    runner = BatchRunner(db_manager, workers=args.workers, limit=args.limit)
+
+    source = sys.stdin if args.input == '-' else open(args.input, 'r', encoding='utf-8')
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        summary = runner.run(read_queries(source), output)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+        close_connection_pools()
+    sys.stderr.write(json.dumps(summary) + '\n')
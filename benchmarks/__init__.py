@@ -0,0 +1,20 @@
+"""
+benchmarks/__init__.py
+
+Инициализация пакета генератора синтетических данных и бенчмарков.
+
+Импортируемые модули:
+----------------------
+CatalogGenerator: Класс генератора синтетического каталога фильмов и журнала поисковых запросов.
+BenchmarkSuite: Класс набора микробенчмарков операций DatabaseManager, QueryLogger и ScreenRenderer.
+compare_results: Функция, сравнивающая результаты бенчмарков с базовыми.
+
+Примеры использования:
+----------------------
+from benchmarks import CatalogGenerator
+
+with db_manager.pool.cursor(commit=True) as cursor:
+    counts = CatalogGenerator(scale=10).populate(cursor, db_manager.backend)
+"""
+from .generator import CatalogGenerator
+from .suite import BenchmarkSuite, compare_results
@@ -0,0 +1,401 @@
+"""
+benchmarks/generator.py
+-----------------------
+
+Этот модуль содержит генератор синтетического каталога фильмов и журнала поисковых запросов
+для проверки производительности на данных больше учебной базы Sakila (1000 фильмов, 200 актеров).
+
+Каталог дополняется до scale-кратного размера: новые фильмы, актеры, роли и жанры добавляются
+с распределениями, взятыми из уже загруженных данных. Слова названий и части описаний берутся
+из фильмов Sakila с распределением Ципфа (частые слова встречаются во многих названиях),
+количество актеров в фильме — из распределения Sakila, популярность актеров и жанров
+также подчиняется закону Ципфа, а годы выпуска смещены к последним десятилетиям.
+Журнал запросов содержит те же типы поиска и параметры, что записывает QueryLogger,
+с повторяющимися популярными запросами; счетчики user_query_stats заполняются по нему.
+
+Классы:
+-------
+CatalogGenerator
+    __init__(self, scale=10, queries=None, users=None, seed=None, batch_size=None)
+        Инициализирует объект CatalogGenerator.
+
+    populate(self, cursor, backend)
+        Дополняет каталог и журнал запросов через курсор базы данных.
+
+Функции:
+--------
+run_generate(args)
+    Точка входа команды `generate`.
+"""
+
+import bisect
+import json
+import random
+import re
+import sys
+from collections import Counter
+from datetime import datetime, timedelta
+from itertools import accumulate, islice
+
+from authentication.manager import AuthManager
+from config import BENCHMARK_CONFIG, DATABASE_CONFIG
+
+# Разбор описаний Sakila: "A Epic Drama of a Feminist And a Mad Scientist who must Battle a Teacher in ..."
+_DESCRIPTION = re.compile(
+    r'^An? (\w+) ([\w ]+?) of an? ([\w ]+?) And an? ([\w ]+?) who must (\w+) an? ([\w ]+?) in (.+)$')
+
+# Доли типов поиска в журнале запросов и режимов поиска по ключевым словам
+SEARCH_TYPE_WEIGHTS = {'keyword': 35, 'genre': 20, 'year': 15, 'actor': 15, 'multiple_criteria': 15}
+KEYWORD_MODE_WEIGHTS = {'title': 70, 'natural': 20, 'boolean': 10}
+
+# Годы выпуска новых фильмов: чем ближе к последнему году, тем больше фильмов
+FIRST_YEAR = 1950
+LAST_YEAR = 2025
+YEAR_GROWTH = 1.04
+
+# Журнал запросов распределяется по этому количеству последних дней
+QUERY_LOG_DAYS = 90
+
+FILM_COLUMNS = ('film_id', 'title', 'description', 'release_year', 'language_id', 'rental_duration',
+                'rental_rate', 'length', 'replacement_cost', 'rating', 'special_features')
+
+
+class _Weighted:
+    """
+    Выборка значения из списка с заданными весами за O(log n) по накопленным весам.
+    """
+
+    def __init__(self, values, weights):
+        self.values = list(values)
+        self.cum_weights = list(accumulate(weights))
+        self.total = self.cum_weights[-1]
+
+    def __call__(self, rng):
+        return self.values[bisect.bisect_left(self.cum_weights, rng.random() * self.total)]
+
+
+def _zipf(values, rng, exponent=1.0):
+    """
+    Возвращает выборку с распределением Ципфа: значение с рангом r выбирается с вероятностью,
+    пропорциональной 1 / r ** exponent. Ранги назначаются значениям в случайном порядке.
+    """
+    values = list(values)
+    rng.shuffle(values)
+    return _Weighted(values, (1.0 / rank ** exponent for rank in range(1, len(values) + 1)))
+
+
+class CatalogGenerator:
+    """
+    Класс генератора синтетического каталога фильмов и журнала поисковых запросов.
+
+    Атрибуты:
+    ----------
+    scale : int
+        Во сколько раз каталог должен стать больше исходного (по количеству фильмов и актеров).
+    queries : int
+        Количество добавляемых записей журнала запросов.
+    users : int
+        Количество добавляемых пользователей.
+    seed : int
+        Начальное значение генератора случайных чисел (одинаковое значение дает одинаковые данные).
+    batch_size : int
+        Количество строк в одном executemany.
+
+    Методы:
+    -------
+    populate(cursor, backend)
+        Дополняет каталог и журнал запросов через курсор базы данных.
+    """
+
+    def __init__(self, scale=10, queries=None, users=None, seed=None, batch_size=None):
+        """
+        Инициализирует объект CatalogGenerator.
+
+        Параметры:
+        ----------
+        scale : int, optional
+            Во сколько раз увеличить каталог (по умолчанию 10).
+        queries : int, optional
+            Количество записей журнала запросов (по умолчанию scale * BENCHMARK_CONFIG['queries_per_scale']).
+        users : int, optional
+            Количество пользователей (по умолчанию scale * BENCHMARK_CONFIG['users_per_scale']).
+        seed : int, optional
+            Начальное значение генератора случайных чисел (по умолчанию BENCHMARK_CONFIG['seed']).
+        batch_size : int, optional
+            Количество строк в одном executemany (по умолчанию BENCHMARK_CONFIG['insert_batch_size']).
+        """
+        if scale < 1:
+            raise ValueError("scale must be at least 1")
+        self.scale = scale
+        self.queries = queries if queries is not None else scale * BENCHMARK_CONFIG['queries_per_scale']
+        self.users = users if users is not None else scale * BENCHMARK_CONFIG['users_per_scale']
+        self.seed = seed if seed is not None else BENCHMARK_CONFIG['seed']
+        self.batch_size = batch_size or BENCHMARK_CONFIG['insert_batch_size']
+        self.rng = random.Random(self.seed)
+
+    def _insert(self, cursor, table, columns, rows):
+        """
+        Вставляет строки в таблицу пачками по batch_size и возвращает их количество.
+        """
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        return self._execute_batches(cursor, query, rows)
+
+    def _execute_batches(self, cursor, query, rows):
+        """
+        Выполняет запрос для строк пачками по batch_size и возвращает количество строк.
+        """
+        rows = iter(rows)
+        total = 0
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                return total
+            cursor.executemany(query, batch)
+            total += len(batch)
+
+    @staticmethod
+    def _scalar(cursor, query):
+        cursor.execute(query)
+        value = cursor.fetchone()[0]
+        return value or 0
+
+    def _load_source(self, cursor):
+        """
+        Читает из базы данных исходные данные, по которым строятся распределения.
+        """
+        cursor.execute("SELECT title, description FROM film_text")
+        texts = cursor.fetchall()
+        cursor.execute(f"SELECT {', '.join(FILM_COLUMNS[3:])} FROM film")
+        films = cursor.fetchall()
+        cursor.execute("SELECT first_name, last_name FROM actor")
+        actors = cursor.fetchall()
+        cursor.execute("SELECT category_id, name FROM category")
+        categories = cursor.fetchall()
+        cursor.execute("SELECT COUNT(*) FROM film_actor GROUP BY film_id")
+        cast_sizes = [row[0] for row in cursor.fetchall()]
+        if not (texts and films and actors and categories and cast_sizes):
+            raise ValueError("The catalog is empty: import the Sakila dump before generating data")
+
+        slots = [[] for _ in range(5)]
+        for _, description in texts:
+            match = _DESCRIPTION.match(description or '')
+            if match:
+                adjective, kind, first, second, verb, third, place = match.groups()
+                for slot, values in zip(slots, ((adjective,), (kind,), (first, second, third), (verb,), (place,))):
+                    slot.extend(values)
+
+        rng = self.rng
+        words = [word for title, _ in texts for word in title.split()]
+        return {
+            'title_words': _zipf(Counter(words), rng),
+            'descriptions': [_zipf(Counter(slot), rng) for slot in slots] if all(slots) else None,
+            'fallback_descriptions': [description for _, description in texts],
+            'film_columns': list(zip(*films)),
+            'first_names': sorted({first for first, _ in actors}),
+            'last_names': sorted({last for _, last in actors}),
+            'categories': _zipf(categories, rng),
+            'cast_sizes': cast_sizes,
+        }
+
+    def _description(self, source):
+        """
+        Составляет описание фильма из частей описаний Sakila.
+        """
+        rng = self.rng
+        if source['descriptions'] is None:
+            return rng.choice(source['fallback_descriptions'])
+        adjective, kind, character, verb, place = source['descriptions']
+        return (f"A {adjective(rng)} {kind(rng)} of a {character(rng)} And a {character(rng)} "
+                f"who must {verb(rng)} a {character(rng)} in {place(rng)}")
+
+    def _films(self, source, first_id, count, years, language_ids):
+        """
+        Генерирует строки таблицы film.
+        """
+        rng = self.rng
+        title_word = source['title_words']
+        columns = source['film_columns']
+        for film_id in range(first_id, first_id + count):
+            title = ' '.join(title_word(rng) for _ in range(rng.choice((2, 2, 2, 3))))
+            values = [rng.choice(column) for column in columns]
+            values[0] = years(rng)
+            values[1] = language_ids(rng)
+            yield (film_id, title, self._description(source), *values)
+
+    def _film_actors(self, source, film_ids, actors):
+        """
+        Генерирует роли: количество актеров берется из распределения Sakila,
+        а сами актеры — по популярности.
+        """
+        rng = self.rng
+        cast_sizes = source['cast_sizes']
+        for film_id in film_ids:
+            size = min(rng.choice(cast_sizes), len(actors.values))
+            cast = set()
+            while len(cast) < size:
+                cast.add(actors(rng))
+            for actor_id in sorted(cast):
+                yield actor_id, film_id
+
+    def _query_params(self, source, actors, keywords):
+        """
+        Генерирует тип и параметры поискового запроса в том виде, в каком их записывает QueryLogger.
+        """
+        rng = self.rng
+        search_type = rng.choices(list(SEARCH_TYPE_WEIGHTS), weights=list(SEARCH_TYPE_WEIGHTS.values()))[0]
+        mode = rng.choices(list(KEYWORD_MODE_WEIGHTS), weights=list(KEYWORD_MODE_WEIGHTS.values()))[0]
+        year = str(rng.randint(FIRST_YEAR, LAST_YEAR))
+
+        if search_type == 'keyword':
+            params = {"keywords": keywords(rng)}
+            if mode != 'title':
+                params["mode"] = mode
+        elif search_type == 'genre':
+            params = {"genre": source['categories'](rng)[1]}
+        elif search_type == 'year':
+            params = {"year": year}
+        elif search_type == 'actor':
+            params = {"actor": actors(rng)}
+        else:
+            # Пустые критерии записываются пустыми строками, как их вводят в меню
+            params = {
+                "keywords": keywords(rng) if rng.random() < 0.5 else '',
+                "genre": source['categories'](rng)[1] if rng.random() < 0.7 else '',
+                "start_year": year if rng.random() < 0.5 else '',
+                "end_year": str(LAST_YEAR) if rng.random() < 0.3 else '',
+                "actor": actors(rng) if rng.random() < 0.3 else '',
+            }
+            if mode != 'title' and params["keywords"]:
+                params["mode"] = mode
+        return search_type, json.dumps(params)
+
+    def _query_log(self, source, user_ids, actor_names, stats):
+        """
+        Генерирует записи журнала запросов по времени от старых к новым и считает их в stats.
+        """
+        rng = self.rng
+        users = _zipf(user_ids, rng)
+        actors = _zipf(actor_names, rng)
+        words = dict.fromkeys(word.lower() for word in source['title_words'].values)
+        keywords = _zipf(words, rng, exponent=1.2)
+        started = datetime.now().replace(microsecond=0) - timedelta(days=QUERY_LOG_DAYS)
+        step = QUERY_LOG_DAYS * 86400 / max(self.queries, 1)
+        for number in range(self.queries):
+            search_type, search_params = self._query_params(source, actors, keywords)
+            stats[(search_type, search_params)] += 1
+            query_time = started + timedelta(seconds=int(number * step))
+            yield users(rng), search_type, search_params, query_time.strftime('%Y-%m-%d %H:%M:%S')
+
+    def populate(self, cursor, backend):
+        """
+        Дополняет каталог и журнал запросов через курсор базы данных.
+
+        Фильмы, актеры и пользователи получают идентификаторы после наибольших существующих,
+        поэтому данные можно добавлять в уже используемую базу. Транзакцией управляет вызывающий код.
+
+        Параметры:
+        ----------
+        cursor : cursor
+            Курсор базы данных (параметры %s).
+        backend : StorageBackend
+            Хранилище данных, из которого берется запрос обновления счетчиков user_query_stats.
+
+        Возвращает:
+        ----------
+        dict
+            Количество добавленных строк по таблицам.
+
+        Исключения:
+        -----------
+        ValueError
+            Если в базе данных нет исходного каталога.
+        """
+        rng = self.rng
+        source = self._load_source(cursor)
+        counts = {}
+
+        film_total = self._scalar(cursor, "SELECT COUNT(*) FROM film")
+        first_film = self._scalar(cursor, "SELECT MAX(film_id) FROM film") + 1
+        actor_total = self._scalar(cursor, "SELECT COUNT(*) FROM actor")
+        first_actor = self._scalar(cursor, "SELECT MAX(actor_id) FROM actor") + 1
+        new_films = film_total * (self.scale - 1)
+        new_actors = actor_total * (self.scale - 1)
+
+        counts['actor'] = self._insert(cursor, 'actor', ('actor_id', 'first_name', 'last_name'), (
+            (actor_id, rng.choice(source['first_names']), rng.choice(source['last_names']))
+            for actor_id in range(first_actor, first_actor + new_actors)))
+
+        years = _Weighted(range(FIRST_YEAR, LAST_YEAR + 1),
+                          (YEAR_GROWTH ** (year - FIRST_YEAR) for year in range(FIRST_YEAR, LAST_YEAR + 1)))
+        # Почти все фильмы на одном языке, как в Sakila
+        cursor.execute("SELECT language_id FROM language ORDER BY language_id")
+        language_ids = [row[0] for row in cursor.fetchall()]
+        language_ids = _Weighted(language_ids, (1.0 / rank ** 3 for rank in range(1, len(language_ids) + 1)))
+
+        film_rows = self._films(source, first_film, new_films, years, language_ids)
+        counts['film'] = self._insert(cursor, 'film', FILM_COLUMNS, film_rows)
+        cursor.execute("INSERT INTO film_text (film_id, title, description) "
+                       "SELECT film_id, title, description FROM film WHERE film_id >= %s", (first_film,))
+        counts['film_text'] = counts['film']
+
+        new_film_ids = range(first_film, first_film + new_films)
+        counts['film_category'] = self._insert(cursor, 'film_category', ('film_id', 'category_id'), (
+            (film_id, source['categories'](rng)[0]) for film_id in new_film_ids))
+        cursor.execute("SELECT actor_id FROM actor")
+        actors = _zipf([row[0] for row in cursor.fetchall()], rng, exponent=0.8)
+        counts['film_actor'] = self._insert(cursor, 'film_actor', ('actor_id', 'film_id'),
+                                            self._film_actors(source, new_film_ids, actors))
+
+        first_user = self._scalar(cursor, "SELECT MAX(id) FROM users") + 1
+        password = AuthManager.hash_password('password')
+        counts['users'] = self._insert(cursor, 'users', ('id', 'username', 'password'), (
+            (user_id, f"bench_user_{user_id}", password) for user_id in range(first_user, first_user + self.users)))
+
+        cursor.execute("SELECT id FROM users")
+        user_ids = [row[0] for row in cursor.fetchall()]
+        # В поиске по актеру вводят полное имя или только имя
+        cursor.execute("SELECT first_name, last_name FROM actor")
+        actor_names = [f"{first} {last}".title() if rng.random() < 0.7 else first.title()
+                       for first, last in cursor.fetchall()]
+        stats = Counter()
+        counts['user_queries'] = self._insert(
+            cursor, 'user_queries', ('user_id', 'search_type', 'search_params', 'query_time'),
+            self._query_log(source, user_ids, actor_names, stats))
+        # Счетчики увеличиваются тем же запросом, что и в QueryLogger, поэтому хеши параметров совпадают
+        counts['user_query_stats'] = self._execute_batches(cursor, backend.QUERY_STATS_UPSERT, (
+            (search_type, params, params, count) for (search_type, params), count in stats.items()))
+        return counts
+
+
+def run_generate(args):
+    """
+    Точка входа команды `generate`.
+
+    Если задан путь, собирает новую базу данных SQLite из скриптов Sakila и добавляет в нее
+    синтетические данные до создания триггеров (это быстрее всего). Иначе добавляет данные в базу
+    из DATABASE_CONFIG: film_details в этом случае обновляют триггеры базы данных.
+
+    Параметры:
+    ----------
+    args : argparse.Namespace
+        Аргументы команды: path, scale, queries, users, seed, scripts_dir.
+    """
+    generator = CatalogGenerator(scale=args.scale, queries=args.queries, users=args.users, seed=args.seed)
+    if args.path:
+        from database.sqlite_import import SCRIPTS_DIR, import_scripts
+        counts = import_scripts(args.path, args.scripts_dir or SCRIPTS_DIR, populate=generator.populate)
+        target = args.path
+    else:
+        from database import DatabaseManager, close_connection_pools
+        db_manager = DatabaseManager(**DATABASE_CONFIG)
+        db_manager.connect()
+        try:
+            with db_manager.pool.cursor(commit=True) as cursor:
+                counts = generator.populate(cursor, db_manager.backend)
+            db_manager.invalidate_caches()
+        finally:
+            close_connection_pools()
+        target = DATABASE_CONFIG.get('database')
+    for table, count in counts.items():
+        print(f"{table:<20} {count:>10}")
+    print(f"Synthetic catalog x{args.scale} (seed {generator.seed}) written to {target}.", file=sys.stderr)
@@ -0,0 +1,239 @@
+"""
+benchmarks/parity.py
+--------------------
+
+Этот модуль содержит проверку совпадения результатов движков поиска: `python main.py parity`.
+
+Движки поиска в памяти (индекс битовых карт, см. database/bitmaps.py, и столбцовый каталог,
+см. database/columnar.py) должны возвращать те же строки в том же порядке, что и запросы к базе данных. Проверка выбирает из самой базы данных жанры, имена актеров,
+слова названий и годы, составляет из них случайные наборы критериев (значения записываются в разном
+регистре: база данных сравнивает строки без учета регистра, и движки в памяти должны делать так же)
+и выполняет каждый набор всеми движками: все страницы search_movies_page вперед и назад и iter_search_movies.
+Результаты сравниваются с результатами запросов к базе данных без индекса битовых карт (движок 'sql').
+
+Кэш результатов поиска на время проверки отключается, иначе второй движок получал бы ответы первого.
+
+Функции:
+--------
+parity_criteria(db_manager, count=200, seed=None)
+    Возвращает случайные наборы критериев поиска из данных каталога.
+
+search_results(db_manager, criteria, page_size=PAGE_SIZE)
+    Возвращает все результаты поиска по критериям в виде, удобном для сравнения.
+
+check_parity(db_manager, criteria, engines=ENGINES, page_size=PAGE_SIZE)
+    Сравнивает результаты движков с результатами запросов к базе данных.
+
+run_parity(args)
+    Точка входа команды `parity`.
+"""
+
+import importlib.util
+import random
+import sys
+
+from config import BENCHMARK_CONFIG, DATABASE_CONFIG
+from database import DatabaseManager, close_connection_pools
+
+# Движки, результаты которых сравниваются; первый — эталон:
+# 'sql' — только запросы к базе данных, 'bitmap' — запросы с отбором фильмов по битовым картам,
+# 'columnar' — столбцовый каталог
+ENGINES = ('sql', 'bitmap', 'columnar')
+
+# Размер страницы: маленький, чтобы проверялись и ключи страниц
+PAGE_SIZE = 7
+
+# Способы записи строки в другом регистре
+CASE_VARIANTS = (str.lower, str.upper, str.title, str.swapcase, str)
+
+
+def use_engine(db_manager, engine):
+    """
+    Переключает DatabaseManager на движок поиска engine.
+
+    Параметры:
+    ----------
+    db_manager : DatabaseManager
+        Менеджер базы данных.
+    engine : str
+        Движок из ENGINES.
+    """
+    db_manager.search_engine = 'columnar' if engine == 'columnar' else 'sql'
+    db_manager.bitmap_index_enabled = engine == 'bitmap'
+
+
+def parity_criteria(db_manager, count=200, seed=None):
+    """
+    Возвращает случайные наборы критериев поиска из данных каталога.
+
+    Параметры:
+    ----------
+    db_manager : DatabaseManager
+        Менеджер базы данных.
+    count : int, optional
+        Количество наборов (по умолчанию 200).
+    seed : int, optional
+        Начальное значение генератора случайных чисел (по умолчанию BENCHMARK_CONFIG['seed']).
+
+    Возвращает:
+    ----------
+    list of dict
+        Аргументы search_movies_page (без page_size, cursor и direction).
+    """
+    rnd = random.Random(BENCHMARK_CONFIG['seed'] if seed is None else seed)
+    genres = list(db_manager.get_categories().values())
+    actors = db_manager.execute_query("SELECT first_name, last_name FROM actor ORDER BY actor_id LIMIT 500")
+    titles = db_manager.execute_query("SELECT title FROM film_details ORDER BY film_id LIMIT 500")
+    words = sorted({word for row in titles for word in row['title'].split()})
+    years = db_manager.execute_query("SELECT MIN(release_year) AS first, MAX(release_year) AS last FROM film")[0]
+    first, last = int(years['first']), int(years['last'])
+
+    def cased(value):
+        return rnd.choice(CASE_VARIANTS)(value)
+
+    def actor_name():
+        actor = rnd.choice(actors)
+        full_name = f"{actor['first_name']} {actor['last_name']}"
+        # Полное имя, имя, фамилия или часть имени
+        name = rnd.choice((full_name, actor['first_name'], actor['last_name'], full_name[:rnd.randint(2, 6)]))
+        return cased(name)
+
+    criteria = []
+    for _ in range(count):
+        item = {}
+        if rnd.random() < 0.6:
+            item['genre'] = cased(rnd.choice(genres))
+        if rnd.random() < 0.4:
+            item['actor_name'] = actor_name()
+        if rnd.random() < 0.4:
+            item['keywords'] = [cased(word[:rnd.randint(3, max(3, len(word)))]) for word in
+                                rnd.sample(words, rnd.randint(1, 2))]
+            item['match_all_keywords'] = rnd.random() < 0.5
+        if rnd.random() < 0.4:
+            start_year = rnd.randint(first, last)
+            item['start_year'] = start_year
+            if rnd.random() < 0.5:
+                item['end_year'] = rnd.randint(start_year, last)
+        item['sort_by'] = rnd.choice((None, 'title', 'genre', 'release_year', 'actors'))
+        item['sort_order'] = rnd.choice(("ASC", "DESC"))
+        criteria.append(item)
+    return criteria
+
+
+def search_results(db_manager, criteria, page_size=PAGE_SIZE):
+    """
+    Возвращает все результаты поиска по критериям в виде, удобном для сравнения.
+
+    Параметры:
+    ----------
+    db_manager : DatabaseManager
+        Менеджер базы данных.
+    criteria : dict
+        Аргументы search_movies_page.
+    page_size : int, optional
+        Размер страницы.
+
+    Возвращает:
+    ----------
+    dict
+        pages — страницы при переходе вперед, back — страницы при возврате назад от последней
+        (в обратном порядке), stream — все строки iter_search_movies.
+    """
+    pages = []
+    page = db_manager.search_movies_page(page_size=page_size, **criteria)
+    pages.append(page.rows)
+    while page.next_cursor is not None:
+        page = db_manager.search_movies_page(page_size=page_size, cursor=page.next_cursor, **criteria)
+        pages.append(page.rows)
+
+    back = []
+    while page.prev_cursor is not None:
+        page = db_manager.search_movies_page(page_size=page_size, cursor=page.prev_cursor, direction="prev",
+                                             **criteria)
+        back.append(page.rows)
+
+    return {'pages': pages, 'back': back, 'stream': list(db_manager.iter_search_movies(**criteria))}
+
+
+def check_parity(db_manager, criteria, engines=ENGINES, page_size=PAGE_SIZE):
+    """
+    Сравнивает результаты движков с результатами первого движка (запросов к базе данных).
+
+    Параметры:
+    ----------
+    db_manager : DatabaseManager
+        Менеджер базы данных (кэш результатов поиска должен быть отключен).
+    criteria : list of dict
+        Наборы критериев (см. parity_criteria).
+    engines : tuple of str, optional
+        Сравниваемые движки; первый — эталон.
+    page_size : int, optional
+        Размер страницы.
+
+    Возвращает:
+    ----------
+    list of dict
+        Расхождения: criteria, engine, part ('pages', 'back' или 'stream'),
+        expected и actual (идентификаторы фильмов).
+    """
+    mismatches = []
+    # После проверки менеджер остается на эталонном движке
+    for item in criteria:
+        results = {}
+        for engine in engines:
+            use_engine(db_manager, engine)
+            results[engine] = search_results(db_manager, item, page_size)
+        expected = results[engines[0]]
+        for engine in engines[1:]:
+            for part, rows in results[engine].items():
+                if rows != expected[part]:
+                    mismatches.append({
+                        'criteria': item,
+                        'engine': engine,
+                        'part': part,
+                        'expected': _film_ids(expected[part]),
+                        'actual': _film_ids(rows),
+                    })
+    use_engine(db_manager, engines[0])
+    return mismatches
+
+
+def _film_ids(rows):
+    """
+    Возвращает идентификаторы фильмов из строк или страниц строк.
+    """
+    return [_film_ids(row) if isinstance(row, list) else row['film_id'] for row in rows]
+
+
+def run_parity(args):
+    """
+    Точка входа команды `parity`: сравнивает движки поиска на базе данных из DATABASE_CONFIG.
+
+    Параметры:
+    ----------
+    args : argparse.Namespace
+        Аргументы команды: count, seed, page_size.
+
+    Исключения:
+    -----------
+    SystemExit
+        Если NumPy не установлен или результаты движков различаются (код 1).
+    """
+    if importlib.util.find_spec('numpy') is None:
+        raise SystemExit("The columnar search engine requires NumPy (pip install numpy)")
+
+    db_manager = DatabaseManager(**DATABASE_CONFIG)
+    db_manager.connect()
+    db_manager.search_cache.max_size = 0
+    try:
+        criteria = parity_criteria(db_manager, count=args.count, seed=args.seed)
+        mismatches = check_parity(db_manager, criteria, page_size=args.page_size)
+    finally:
+        close_connection_pools()
+
+    for mismatch in mismatches:
+        sys.stderr.write(f"MISMATCH {mismatch['engine']} {mismatch['part']} {mismatch['criteria']}: "
+                         f"expected {mismatch['expected']}, got {mismatch['actual']}\n")
+    sys.stderr.write(f"{len(criteria)} criteria, engines {', '.join(ENGINES)}: {len(mismatches)} mismatches\n")
+    if mismatches:
+        raise SystemExit(1)
@@ -0,0 +1,403 @@
+"""
+benchmarks/suite.py
+-------------------
+
+Этот модуль содержит набор микробенчмарков: `python main.py bench`.
+
+Каждый бенчмарк — одна операция DatabaseManager, QueryLogger или ScreenRenderer, выполненная
+несколько раз после прогрева. Параметры поиска (ключевые слова, жанры, актеры, годы) берутся
+из самой базы данных и чередуются между повторами, кэш результатов поиска отключается.
+Результаты (перцентили времени выполнения, размер каталога, окружение) записываются в файл JSON
+и сравниваются с сохраненным базовым результатом: бенчмарк, медиана которого выросла больше
+чем на regression_threshold, считается регрессией, и команда завершается с кодом 1.
+Поиск выполняется движком из SEARCH_ENGINE_CONFIG, поэтому движки сравниваются двумя запусками
+с разными настройками (движок записывается в результаты).
+
+Бенчмарки QueryLogger записывают строки в user_queries и user_query_stats (с user_id 0),
+а refresh_film_details и перестроение индексов сбрасывают кэши DatabaseManager,
+поэтому набор лучше запускать на базе, собранной командой `python main.py generate`.
+
+Классы:
+-------
+BenchmarkSuite
+    __init__(self, db_manager, query_logger, renderer, repeat=None, warmup=None)
+        Инициализирует объект BenchmarkSuite.
+
+    cases(self)
+        Возвращает список бенчмарков.
+
+    run(self, only=None, progress=None)
+        Выполняет бенчмарки и возвращает документ с результатами.
+
+    close(self)
+        Закрывает журнал запросов с синхронной записью, созданный набором.
+
+Функции:
+--------
+compare_results(results, baseline, threshold=None, min_delta_ms=None)
+    Сравнивает результаты с базовыми.
+
+run_benchmarks(args)
+    Точка входа команды `bench`.
+"""
+
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+
+from config import BENCHMARK_CONFIG, DATABASE_CONFIG
+from database import DatabaseManager, close_connection_pools
+from log_manager import QueryLogger
+from utils import ScreenRenderer, load_localization_texts_from_file
+
+# Версия формата файла результатов
+RESULTS_FORMAT = 1
+
+# Размеры каталога, которые должны совпадать для сравнения с базовыми результатами
+# (журнал запросов растет при каждом запуске бенчмарков)
+CATALOG_KEYS = ('films', 'actors')
+
+# Повторы бенчмарков, которые перестраивают индексы целиком
+REBUILD_REPEAT = 3
+
+
+class BenchmarkSuite:
+    """
+    Класс набора микробенчмарков.
+
+    Атрибуты:
+    ----------
+    db_manager : DatabaseManager
+        Менеджер базы данных.
+    query_logger : QueryLogger
+        Журнал запросов с записью в фоновом потоке.
+    renderer : ScreenRenderer
+        Объект, формирующий экраны приложения.
+    repeat : int
+        Количество измеряемых повторов каждого бенчмарка.
+    warmup : int
+        Количество повторов прогрева перед измерением.
+
+    Методы:
+    -------
+    cases()
+        Возвращает список бенчмарков.
+    run(only=None, progress=None)
+        Выполняет бенчмарки и возвращает документ с результатами.
+    close()
+        Закрывает журнал запросов с синхронной записью, созданный набором.
+    """
+
+    def __init__(self, db_manager, query_logger, renderer, repeat=None, warmup=None):
+        """
+        Инициализирует объект BenchmarkSuite.
+
+        Параметры:
+        ----------
+        db_manager : DatabaseManager
+            Менеджер базы данных.
+        query_logger : QueryLogger
+            Журнал запросов с записью в фоновом потоке.
+        renderer : ScreenRenderer
+            Объект, формирующий экраны приложения.
+        repeat : int, optional
+            Количество измеряемых повторов (по умолчанию BENCHMARK_CONFIG['repeat']).
+        warmup : int, optional
+            Количество повторов прогрева (по умолчанию BENCHMARK_CONFIG['warmup']).
+        """
+        self.db_manager = db_manager
+        self.query_logger = query_logger
+        self.renderer = renderer
+        self.repeat = repeat or BENCHMARK_CONFIG['repeat']
+        self.warmup = warmup if warmup is not None else BENCHMARK_CONFIG['warmup']
+        self._sync_logger = QueryLogger(async_mode=False)
+
+    def _catalog(self):
+        """
+        Возвращает размер каталога и журнала запросов, с которыми выполнялись бенчмарки.
+        """
+        row = self.db_manager.execute_query(
+            "SELECT (SELECT COUNT(*) FROM film) AS films, (SELECT COUNT(*) FROM actor) AS actors, "
+            "(SELECT COUNT(*) FROM user_queries) AS user_queries")[0]
+        return {key: int(value) for key, value in row.items()}
+
+    def _inputs(self):
+        """
+        Выбирает из базы данных параметры поиска, которые чередуются между повторами.
+        """
+        db = self.db_manager
+        titles = db.execute_query("SELECT title FROM film_details ORDER BY film_id LIMIT 500")
+        words = Counter(word.lower() for row in titles for word in row['title'].split())
+        actors = db.execute_query("SELECT first_name, last_name FROM actor ORDER BY actor_id LIMIT 20")
+        years = db.execute_query("SELECT MIN(release_year) AS first, MAX(release_year) AS last FROM film")[0]
+        first, last = int(years['first']), int(years['last'])
+        middle = (first + last) // 2
+        rows = db.search_movies(limit=100)
+        return {
+            'keywords': [word for word, _ in words.most_common(10)],
+            'genres': list(db.get_categories().values()),
+            'actors': [f"{row['first_name']} {row['last_name']}".title() for row in actors],
+            'years': [(str(year), str(min(year + 5, last))) for year in range(first, middle + 1)],
+            'film_id': db.execute_query("SELECT MAX(film_id) AS film_id FROM film_details")[0]['film_id'],
+            'results': rows,
+        }
+
+    def cases(self):
+        """
+        Возвращает список бенчмарков.
+
+        Возвращает:
+        ----------
+        list of tuple
+            Кортежи (имя, функция от номера повтора, количество повторов или None для repeat).
+        """
+        db = self.db_manager
+        logger = self.query_logger
+        inputs = self._inputs()
+        keywords, genres, actors, years = inputs['keywords'], inputs['genres'], inputs['actors'], inputs['years']
+
+        def pick(values, i):
+            return values[i % len(values)]
+
+        def year_range(i):
+            start_year, end_year = pick(years, i)
+            return db.search_movies(start_year=start_year, end_year=end_year)
+
+        def drain(i):
+            return sum(1 for _ in db.iter_search_movies(genre=pick(genres, i)))
+
+        def rebuild_title_index(i):
+            db.invalidate_title_index()
+            return db.get_title_index()
+
+        def rebuild_actor_index(i):
+            db.actor_index = None
+            return db.get_actor_index()
+
+        def rebuild_bitmap_index(i):
+            db.bitmap_index = None
+            return db.get_bitmap_index()
+
+        def rebuild_columnar_catalog(i):
+            db.columnar_catalog = None
+            return db.get_columnar_catalog()
+
+        cases = [
+            ('search_movies.keyword', lambda i: db.search_movies(keywords=[pick(keywords, i)]), None),
+            ('search_movies.genre', lambda i: db.search_movies(genre=pick(genres, i)), None),
+            ('search_movies.year_range', year_range, None),
+            ('search_movies.actor', lambda i: db.search_movies(actor_name=pick(actors, i)), None),
+            ('search_movies.multiple_criteria', lambda i: db.search_movies(
+                genre=pick(genres, i), start_year=pick(years, i)[0], sort_by='title'), None),
+            ('search_movies.multiple_criteria.actor', lambda i: db.search_movies(
+                actor_name=pick(actors, i), genre=pick(genres, i), start_year=pick(years, i)[0]), None),
+            ('search_movies_page.genre', lambda i: db.search_movies_page(genre=pick(genres, i)), None),
+            ('iter_search_movies.genre', drain, None),
+            ('full_text_search.natural', lambda i: db.full_text_search(pick(keywords, i)), None),
+            ('full_text_search.boolean', lambda i: db.full_text_search(
+                f"+{pick(keywords, i)} -{pick(keywords, i + 1)}*", mode='boolean'), None),
+            ('get_random_movies', lambda i: db.get_random_movies(10), None),
+            ('get_categories', lambda i: db.get_categories(), None),
+            ('query_logger.log_query.sync', lambda i: self._sync_logger.log_query(
+                0, 'genre', {"genre": pick(genres, i)}), None),
+            ('query_logger.log_query.async', lambda i: logger.log_query(
+                0, 'keyword', {"keywords": pick(keywords, i)}), None),
+            ('query_logger.get_popular_search_queries', lambda i: logger.get_popular_search_queries(10), None),
+            ('render.menu.guest', lambda i: self.renderer.render_menu(), None),
+            ('render.menu.user', lambda i: self.renderer.render_menu('bench_user'), None),
+            ('render.results.10', lambda i: self.renderer.render_results(inputs['results'][:10]), None),
+            ('render.results.100', lambda i: self.renderer.render_results(inputs['results']), None),
+            # Последними, потому что сбрасывают кэши DatabaseManager
+            ('title_index.rebuild', rebuild_title_index, REBUILD_REPEAT),
+            ('actor_index.rebuild', rebuild_actor_index, REBUILD_REPEAT),
+            ('bitmap_index.rebuild', rebuild_bitmap_index, REBUILD_REPEAT),
+            ('refresh_film_details.film', lambda i: db.refresh_film_details(inputs['film_id']), REBUILD_REPEAT),
+        ]
+        if db.search_engine == 'columnar':
+            cases.insert(-1, ('columnar_catalog.rebuild', rebuild_columnar_catalog, REBUILD_REPEAT))
+        return cases
+
+    def _measure(self, func, repeat):
+        """
+        Выполняет функцию warmup + repeat раз и возвращает статистику времени выполнения в миллисекундах.
+        """
+        for i in range(self.warmup):
+            func(i)
+        timings = []
+        for i in range(self.warmup, self.warmup + repeat):
+            started = time.perf_counter()
+            func(i)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        return {
+            'runs': repeat,
+            'mean_ms': round(statistics.fmean(timings), 4),
+            'p50_ms': round(statistics.median(timings), 4),
+            'p95_ms': round(timings[min(len(timings) - 1, int(round(0.95 * len(timings))) - 1)], 4),
+            'min_ms': round(timings[0], 4),
+            'max_ms': round(timings[-1], 4),
+        }
+
+    def run(self, only=None, progress=None):
+        """
+        Выполняет бенчмарки и возвращает документ с результатами.
+
+        Параметры:
+        ----------
+        only : list of str, optional
+            Префиксы имен бенчмарков, которые нужно выполнить (по умолчанию все).
+        progress : callable, optional
+            Функция progress(name, stats), вызываемая после каждого бенчмарка.
+
+        Возвращает:
+        ----------
+        dict
+            Документ с результатами: format, created_at, python, platform, backend, search_engine, catalog,
+            repeat, warmup и benchmarks ({имя: статистика}).
+        """
+        # Размер каталога считается до бенчмарков QueryLogger, которые дописывают журнал
+        catalog = self._catalog()
+        benchmarks = {}
+        for name, func, repeat in self.cases():
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            stats = self._measure(func, repeat or self.repeat)
+            if name.startswith('query_logger.log_query.async'):
+                self.query_logger.flush()
+            benchmarks[name] = stats
+            if progress:
+                progress(name, stats)
+        return {
+            'format': RESULTS_FORMAT,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'backend': self.db_manager.backend.name,
+            'search_engine': self.db_manager.search_engine,
+            'catalog': catalog,
+            'repeat': self.repeat,
+            'warmup': self.warmup,
+            'benchmarks': benchmarks,
+        }
+
+    def close(self):
+        """
+        Закрывает журнал запросов с синхронной записью, созданный набором.
+        """
+        self._sync_logger.close()
+
+
+def compare_results(results, baseline, threshold=None, min_delta_ms=None):
+    """
+    Сравнивает результаты с базовыми по медиане времени выполнения.
+
+    Параметры:
+    ----------
+    results : dict
+        Документ с текущими результатами (BenchmarkSuite.run).
+    baseline : dict
+        Документ с базовыми результатами.
+    threshold : float, optional
+        Допустимый относительный рост медианы (по умолчанию BENCHMARK_CONFIG['regression_threshold']).
+    min_delta_ms : float, optional
+        Рост медианы в миллисекундах, меньше которого изменение считается шумом
+        (по умолчанию BENCHMARK_CONFIG['min_regression_ms']).
+
+    Возвращает:
+    ----------
+    dict
+        baseline_created_at, catalog_changed (другое количество фильмов или актеров — сравнение неточно),
+        regressions (имена бенчмарков) и cases ({имя: baseline_p50_ms, p50_ms, change, status}),
+        где status — 'regression', 'improvement', 'unchanged' или 'new'.
+    """
+    threshold = threshold if threshold is not None else BENCHMARK_CONFIG['regression_threshold']
+    min_delta_ms = min_delta_ms if min_delta_ms is not None else BENCHMARK_CONFIG['min_regression_ms']
+    cases = {}
+    regressions = []
+    for name, stats in results['benchmarks'].items():
+        previous = baseline.get('benchmarks', {}).get(name)
+        if previous is None:
+            cases[name] = {'p50_ms': stats['p50_ms'], 'status': 'new'}
+            continue
+        before, after = previous['p50_ms'], stats['p50_ms']
+        change = (after - before) / before if before else 0.0
+        if change > threshold and after - before > min_delta_ms:
+            status = 'regression'
+            regressions.append(name)
+        elif change < -threshold and before - after > min_delta_ms:
+            status = 'improvement'
+        else:
+            status = 'unchanged'
+        cases[name] = {'baseline_p50_ms': before, 'p50_ms': after, 'change': round(change, 4), 'status': status}
+    return {
+        'baseline_created_at': baseline.get('created_at'),
+        'catalog_changed': any(baseline.get('catalog', {}).get(key) != results['catalog'][key]
+                               for key in CATALOG_KEYS),
+        'regressions': regressions,
+        'cases': cases,
+    }
+
+
+def _print_progress(name, stats):
+    sys.stderr.write(f"{name:<42} p50 {stats['p50_ms']:>10.3f} ms  p95 {stats['p95_ms']:>10.3f} ms\n")
+
+
+def run_benchmarks(args):
+    """
+    Точка входа команды `bench`: выполняет бенчмарки на базе данных из DATABASE_CONFIG,
+    записывает результаты в файл JSON и сравнивает их с базовыми.
+
+    Параметры:
+    ----------
+    args : argparse.Namespace
+        Аргументы команды: output, baseline, save_baseline, repeat, warmup, only, threshold.
+
+    Исключения:
+    -----------
+    SystemExit
+        С кодом 1, если найдены регрессии.
+    """
+    db_manager = DatabaseManager(**DATABASE_CONFIG)
+    db_manager.connect()
+    # Измеряется выполнение запросов, а не попадания в кэш результатов
+    db_manager.search_cache.max_size = 0
+    query_logger = QueryLogger()
+    renderer = ScreenRenderer(load_localization_texts_from_file())
+    suite = BenchmarkSuite(db_manager, query_logger, renderer, repeat=args.repeat, warmup=args.warmup)
+    try:
+        results = suite.run(only=args.only, progress=_print_progress)
+    finally:
+        suite.close()
+        query_logger.close()
+        close_connection_pools()
+
+    baseline_path = args.baseline or BENCHMARK_CONFIG['baseline_file']
+    comparison = None
+    if os.path.exists(baseline_path) and not args.save_baseline:
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            comparison = compare_results(results, json.load(f), threshold=args.threshold)
+        results['comparison'] = comparison
+
+    output = args.output or BENCHMARK_CONFIG['results_file']
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    sys.stderr.write(f"Results written to {output}\n")
+
+    if args.save_baseline:
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        sys.stderr.write(f"Baseline saved to {baseline_path}\n")
+    elif comparison is not None:
+        if comparison['catalog_changed']:
+            sys.stderr.write("Warning: the catalog differs from the baseline catalog, timings are not comparable\n")
+        for name in comparison['regressions']:
+            case = comparison['cases'][name]
+            sys.stderr.write(f"REGRESSION {name}: {case['baseline_p50_ms']:.3f} ms -> {case['p50_ms']:.3f} ms "
+                             f"({case['change']:+.0%})\n")
+        if comparison['regressions']:
+            raise SystemExit(1)
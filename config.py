@@ -3,39 +3,375 @@ config.py
 ---------
 
 Этот файл содержит конфигурацию для подключения к базе данных.
-Он используется для хранения параметров подключения в виде словаря `DATABASE_CONFIG`.
+Он используется для хранения параметров подключения в виде словаря `DATABASE_CONFIG`,
+настроек общего пула соединений в виде словаря `POOL_CONFIG`,
+настроек выборки случайных фильмов в виде словаря `RANDOM_SAMPLER_CONFIG`,
+настроек триграммного индекса названий в виде словаря `TRIGRAM_INDEX_CONFIG`,
+настроек кэша результатов поиска в виде словаря `SEARCH_CACHE_CONFIG`,
+настроек подготовленных выражений поиска в виде словаря `PREPARED_STATEMENT_CONFIG`,
+настроек движка поиска в виде словаря `SEARCH_ENGINE_CONFIG`,
+настроек индекса битовых карт в виде словаря `BITMAP_INDEX_CONFIG`,
+настроек измерения запросов в виде словаря `QUERY_STATS_CONFIG`,
+настроек кэша справочных таблиц в виде словаря `REFERENCE_DATA_CONFIG`,
+настроек журнала поисковых запросов в виде словаря `QUERY_LOGGER_CONFIG`,
+настроек запуска приложения в виде словаря `STARTUP_CONFIG`,
+настроек профилирования сеансов в виде словаря `PROFILING_CONFIG`,
+настроек сессий пользователей в виде словаря `AUTH_CONFIG`,
+настроек HTTP/JSON-сервиса поиска в виде словаря `API_SERVER_CONFIG`
+и настроек генератора синтетических данных и бенчмарков в виде словаря `BENCHMARK_CONFIG`.
 
 Переменные:
 -----------
 DATABASE_CONFIG : dict
     Словарь, содержащий параметры подключения к базе данных.
+POOL_CONFIG : dict
+    Словарь, содержащий настройки пула соединений.
+RANDOM_SAMPLER_CONFIG : dict
+    Словарь, содержащий настройки выборки случайных фильмов.
+TRIGRAM_INDEX_CONFIG : dict
+    Словарь, содержащий настройки триграммного индекса для поиска по ключевым словам.
+SEARCH_CACHE_CONFIG : dict
+    Словарь, содержащий настройки кэша результатов поиска.
+SEARCH_ENGINE_CONFIG : dict
+    Словарь, содержащий настройки движка поиска (запросы к базе данных или столбцовый каталог в памяти).
+BITMAP_INDEX_CONFIG : dict
+    Словарь, содержащий настройки индекса битовых карт для поиска по нескольким критериям.
+PREPARED_STATEMENT_CONFIG : dict
+    Словарь, содержащий настройки подготовленных выражений поиска.
+QUERY_STATS_CONFIG : dict
+    Словарь, содержащий настройки измерения запросов и журнала медленных запросов.
+REFERENCE_DATA_CONFIG : dict
+    Словарь, содержащий настройки кэша справочных таблиц.
+QUERY_LOGGER_CONFIG : dict
+    Словарь, содержащий настройки записи журнала поисковых запросов.
+STARTUP_CONFIG : dict
+    Словарь, содержащий настройки запуска приложения.
+PROFILING_CONFIG : dict
+    Словарь, содержащий настройки профилирования сеансов приложения.
+AUTH_CONFIG : dict
+    Словарь, содержащий настройки сессий пользователей.
+API_SERVER_CONFIG : dict
+    Словарь, содержащий настройки HTTP/JSON-сервиса поиска.
+BENCHMARK_CONFIG : dict
+    Словарь, содержащий настройки генератора синтетических данных и бенчмарков.
 
 Ключи словаря DATABASE_CONFIG:
 -------------------------------
+backend : str
+    Хранилище данных: 'mysql' или 'sqlite' (встроенная база, собранная командой
+    `python main.py import-sqlite film_search.db`; для нее нужен только ключ database).
 host : str
     Адрес хоста базы данных.
 database : str
-    Имя базы данных.
+    Имя базы данных (для SQLite — путь к файлу базы данных).
 user : str
     Имя пользователя для подключения к базе данных.
 password : str
     Пароль пользователя для подключения к базе данных.
 
+Ключи словаря POOL_CONFIG:
+---------------------------
+pool_size : int
+    Максимальное количество одновременно открытых соединений.
+idle_timeout : float
+    Время простоя соединения (в секундах), после которого оно закрывается.
+health_check_interval : float
+    Время простоя соединения (в секундах), после которого оно проверяется перед выдачей.
+acquire_timeout : float
+    Максимальное время ожидания свободного соединения (в секундах).
+
+Ключи словаря RANDOM_SAMPLER_CONFIG:
+------------------------------------
+buffer_size : int
+    Количество заранее выбранных наборов случайных фильмов (0 — выбирать при каждом вызове).
+ids_ttl : float
+    Время жизни кэша идентификаторов фильмов (в секундах).
+
+Ключи словаря TRIGRAM_INDEX_CONFIG:
+-----------------------------------
+include_description : bool
+    Искать ключевые слова не только в названии, но и в описании фильма.
+path : str or None
+    Файл, в котором сохраняется построенный индекс (None — строить индекс при каждом запуске).
+max_age : float
+    Время, после которого индекс в памяти сверяется с film_details и при изменении названий
+    строится заново (в секундах; None — только после сброса кэшей DatabaseManager).
+
+Ключи словаря SEARCH_CACHE_CONFIG:
+----------------------------------
+max_size : int
+    Максимальное количество закэшированных результатов (0 — кэш отключен).
+ttl : float
+    Время жизни закэшированного результата (в секундах).
+
+Ключи словаря SEARCH_ENGINE_CONFIG:
+-----------------------------------
+engine : str
+    Движок поиска search_movies: 'sql' — запросы к film_details (по умолчанию),
+    'columnar' — столбцовый каталог в памяти на NumPy (см. database/columnar.py; требует пакета numpy).
+max_age : float
+    Время, после которого столбцовый каталог загружается из базы данных заново (в секундах;
+    None — только после сброса кэшей DatabaseManager).
+
+Ключи словаря BITMAP_INDEX_CONFIG:
+----------------------------------
+enabled : bool
+    Пересекать ли критерии поиска вместе с актером или ключевыми словами по битовым картам жанра,
+    годов и актеров в памяти (иначе жанр и годы проверяются условиями запроса к film_details).
+max_age : float
+    Время, после которого индекс строится заново (в секундах; None — только после сброса
+    кэшей DatabaseManager).
+
+Ключи словаря PREPARED_STATEMENT_CONFIG:
+----------------------------------------
+enabled : bool
+    Выполнять ли поиск подготовленными выражениями (по одному на форму запроса и соединение).
+max_per_connection : int
+    Максимальное количество подготовленных выражений на соединение; давно не использованные закрываются.
+max_in_list : int
+    Наибольший список идентификаторов в IN для подготовленного выражения; более длинные списки
+    выполняются обычным запросом.
+
+Ключи словаря QUERY_STATS_CONFIG:
+---------------------------------
+enabled : bool
+    Измерять ли время и количество строк каждого запроса (статистика выводится командой s
+    в меню приложения и конечной точкой /stats сервиса).
+slow_query_ms : float
+    Порог медленного запроса (в миллисекундах).
+slow_query_log : str or None
+    Файл журнала медленных запросов в формате JSON Lines (None — не записывать журнал).
+explain_slow_queries : bool
+    Добавлять ли в журнал план EXPLAIN первого медленного запроса каждой формы.
+max_shapes : int
+    Наибольшее количество форм запросов в статистике.
+stats_limit : int
+    Количество форм запросов, которые показывает экран статистики.
+
+Ключи словаря REFERENCE_DATA_CONFIG:
+------------------------------------
+refresh_interval : float
+    Время (в секундах), после которого справочные таблицы (категории, языки) перечитываются из базы данных.
+
+Ключи словаря QUERY_LOGGER_CONFIG:
+----------------------------------
+async_mode : bool
+    Записывать запросы в фоновом потоке пачками (False — синхронная запись при каждом поиске).
+batch_size : int
+    Максимальное количество записей в одной пачке.
+flush_interval : float
+    Максимальное время ожидания записи в очереди до отправки (в секундах).
+max_queue_size : int
+    Максимальное количество записей в очереди.
+overflow_policy : str
+    Поведение при заполненной очереди: 'block', 'drop_newest' или 'drop_oldest'.
+block_timeout : float
+    Максимальное время ожидания места в очереди для политики 'block' (в секундах).
+flush_timeout : float
+    Максимальное время ожидания записи очереди методом flush (в секундах).
+
+Ключи словаря STARTUP_CONFIG:
+-----------------------------
+prewarm_workers : int
+    Количество потоков, параллельно загружающих данные для главного меню при запуске.
+first_frame_timeout : float
+    Максимальное время ожидания случайных фильмов перед выводом первого кадра меню (в секундах).
+
+Ключи словаря PROFILING_CONFIG:
+-------------------------------
+modes : tuple of str
+    Режимы профилирования ('cprofile', 'tracemalloc'), если они не заданы флагом `--profile`
+    или переменной окружения FILM_SEARCH_PROFILE (пустой кортеж — профилирование выключено).
+directory : str
+    Каталог, в который сохраняются профили сеансов.
+session_sample_rate : float
+    Доля сеансов, которые профилируются, когда профилирование включено (1.0 — все).
+action_sample_rate : float
+    Доля действий пользователя, которые профилирует cProfile (команда `prof` профилирует все).
+tracemalloc_frames : int
+    Глубина стека, которую tracemalloc сохраняет для каждого выделения памяти.
+top_n : int
+    Количество строк в текстовых сводках профилей.
+
+Ключи словаря AUTH_CONFIG:
+--------------------------
+secret_file : str
+    Файл с секретным ключом для подписи токенов сессии (создается автоматически;
+    ключ можно задать и переменной окружения FILM_SEARCH_SESSION_SECRET).
+session_ttl : float
+    Срок действия токена сессии (в секундах), после которого сессия перепроверяется по базе данных.
+
+Ключи словаря API_SERVER_CONFIG:
+--------------------------------
+host : str
+    Адрес, на котором сервис принимает соединения.
+port : int
+    Порт, на котором сервис принимает соединения.
+db_workers : int
+    Количество потоков, выполняющих обращения к базе данных (не больше pool_size из POOL_CONFIG).
+max_pending : int
+    Максимальное количество запросов в обработке; остальные сразу получают ответ 503.
+request_timeout : float
+    Максимальное время чтения и выполнения одного запроса (в секундах); после него возвращается 504.
+keepalive_timeout : float
+    Время ожидания следующего запроса в открытом соединении (в секундах).
+shutdown_timeout : float
+    Максимальное время ожидания выполняемых запросов при остановке сервиса (в секундах).
+max_limit : int
+    Максимальное количество результатов одного запроса.
+max_body_size : int
+    Максимальный размер тела запроса (в байтах).
+
+Ключи словаря BENCHMARK_CONFIG:
+-------------------------------
+seed : int
+    Начальное значение генератора случайных чисел (одинаковое значение дает одинаковые данные).
+queries_per_scale : int
+    Количество записей журнала запросов, которое генератор добавляет на единицу масштаба.
+users_per_scale : int
+    Количество пользователей, которое генератор добавляет на единицу масштаба.
+insert_batch_size : int
+    Количество строк в одном запросе вставки генератора.
+repeat : int
+    Количество измеряемых повторов каждого бенчмарка.
+warmup : int
+    Количество повторов прогрева перед измерением.
+regression_threshold : float
+    Допустимый относительный рост медианы времени выполнения по сравнению с базовым результатом.
+min_regression_ms : float
+    Рост медианы (в миллисекундах), меньше которого изменение считается шумом измерения.
+results_file : str
+    Путь к файлу с результатами бенчмарков.
+baseline_file : str
+    Путь к файлу с базовыми результатами, с которыми сравниваются новые.
+
 Пример использования:
 ---------------------
-import mysql.connector
 from config import DATABASE_CONFIG
+from database import get_connection_pool
 
-connection = mysql.connector.connect(**DATABASE_CONFIG)
-cursor = connection.cursor()
-# Выполнение запросов к базе данных
-cursor.close()
-connection.close()
+pool = get_connection_pool(DATABASE_CONFIG)
+with pool.cursor(dictionary=True) as cursor:
+    # Выполнение запросов к базе данных
+    cursor.execute("SELECT 1")
 """
 
 DATABASE_CONFIG = {
+    'backend': 'mysql',
     'host': '127.0.0.1',
     'database': 'project_220424_oskolkov',
     'user': 'root',
     'password': 'password'
 }
+
+# Встроенная база данных SQLite без сервера MySQL:
+# DATABASE_CONFIG = {
+#     'backend': 'sqlite',
+#     'database': 'film_search.db'
+# }
+
+POOL_CONFIG = {
+    'pool_size': 5,
+    'idle_timeout': 300,
+    'health_check_interval': 30,
+    'acquire_timeout': 10
+}
+
+RANDOM_SAMPLER_CONFIG = {
+    'buffer_size': 8,
+    'ids_ttl': 600
+}
+
+TRIGRAM_INDEX_CONFIG = {
+    'include_description': False,
+    'path': 'title_index.json',
+    'max_age': 300
+}
+
+SEARCH_CACHE_CONFIG = {
+    'max_size': 256,
+    'ttl': 300
+}
+
+SEARCH_ENGINE_CONFIG = {
+    'engine': 'sql',
+    'max_age': 300
+}
+
+BITMAP_INDEX_CONFIG = {
+    'enabled': True,
+    'max_age': 300
+}
+
+PREPARED_STATEMENT_CONFIG = {
+    'enabled': True,
+    'max_per_connection': 64,
+    'max_in_list': 1024
+}
+
+QUERY_STATS_CONFIG = {
+    'enabled': True,
+    'slow_query_ms': 100,
+    'slow_query_log': 'slow_queries.log',
+    'explain_slow_queries': True,
+    'max_shapes': 500,
+    'stats_limit': 15
+}
+
+REFERENCE_DATA_CONFIG = {
+    'refresh_interval': 3600
+}
+
+QUERY_LOGGER_CONFIG = {
+    'async_mode': True,
+    'batch_size': 50,
+    'flush_interval': 1.0,
+    'max_queue_size': 1000,
+    'overflow_policy': 'block',
+    'block_timeout': 0.5,
+    'flush_timeout': 5.0
+}
+
+STARTUP_CONFIG = {
+    'prewarm_workers': 4,
+    'first_frame_timeout': 0.05
+}
+
+PROFILING_CONFIG = {
+    'modes': (),
+    'directory': 'profiles',
+    'session_sample_rate': 1.0,
+    'action_sample_rate': 1.0,
+    'tracemalloc_frames': 1,
+    'top_n': 25
+}
+
+AUTH_CONFIG = {
+    'secret_file': 'session_secret.key',
+    'session_ttl': 7 * 24 * 3600
+}
+
+API_SERVER_CONFIG = {
+    'host': '127.0.0.1',
+    'port': 8080,
+    'db_workers': POOL_CONFIG['pool_size'],
+    'max_pending': 512,
+    'request_timeout': 5.0,
+    'keepalive_timeout': 15.0,
+    'shutdown_timeout': 10.0,
+    'max_limit': 100,
+    'max_body_size': 65536
+}
+
+BENCHMARK_CONFIG = {
+    'seed': 42,
+    'queries_per_scale': 1000,
+    'users_per_scale': 100,
+    'insert_batch_size': 5000,
+    'repeat': 20,
+    'warmup': 2,
+    'regression_threshold': 0.25,
+    'min_regression_ms': 0.05,
+    'results_file': 'benchmark_results.json',
+    'baseline_file': 'benchmark_baseline.json'
+}
@@ -6,6 +6,12 @@ database/__init__.py
 Импортируемые модули:
 ----------------------
 DatabaseManager: Класс для управления базой данных.
+ConnectionPool: Класс общего пула соединений с базой данных.
+get_connection_pool: Функция, возвращающая общий пул для заданной конфигурации подключения.
+close_connection_pools: Функция, закрывающая все созданные пулы соединений.
+execute_search: Функция, выполняющая поиск по критериям в формате журнала запросов.
+get_backend: Функция, возвращающая хранилище данных (MySQL или SQLite) для конфигурации подключения.
+get_query_stats: Функция, возвращающая статистику времени выполнения запросов к базе данных.
 
 Примеры использования:
 ----------------------
@@ -15,3 +21,7 @@ db_manager = DatabaseManager(db_config)
 # Использование объекта db_manager для выполнения операций с базой данных.
 """
 from .manager import DatabaseManager
+from .pool import ConnectionPool, get_connection_pool, close_connection_pools
+from .criteria import execute_search
+from .backends import get_backend
+from .instrumentation import get_query_stats
@@ -0,0 +1,70 @@
+"""
+database/actors.py
+------------------
+
+Этот модуль содержит класс ActorIndex — индекс имен актеров в памяти, по которому поиск по актеру
+сначала находит идентификаторы актеров, а уже затем — фильмы через таблицу film_actor.
+
+Имена сравниваются без учета регистра и диакритики. Введенная строка ищется как подстрока
+полного имени актера (как раньше делал `actors LIKE %name%`), поэтому совпадения с полным именем,
+именем или фамилией входят в результат вместе с частичными: 'HARRIS' находит и HARRIS, и HARRISON.
+Подстрока ищется по триграммному индексу полных имен (см. database/trigram.py), а не перебором всех актеров.
+
+Классы:
+-------
+ActorIndex
+    __init__(self, rows=())
+        Инициализирует индекс по строкам таблицы actor.
+
+    resolve(self, name)
+        Возвращает идентификаторы актеров, подходящих под введенное имя.
+"""
+
+from .trigram import TrigramIndex, normalize_text
+
+
+class ActorIndex:
+    """
+    Индекс имен актеров в памяти.
+
+    Методы:
+    -------
+    resolve(name)
+        Возвращает идентификаторы актеров, подходящих под введенное имя.
+    """
+
+    def __init__(self, rows=()):
+        """
+        Инициализирует индекс по строкам таблицы actor.
+
+        Параметры:
+        ----------
+        rows : iterable of dict, optional
+            Строки с ключами actor_id, first_name и last_name.
+        """
+        # Триграммный индекс хранит документы под ключом film_id, здесь это идентификатор актера
+        self._names = TrigramIndex().build(
+            {'film_id': row['actor_id'], 'title': f"{row['first_name']} {row['last_name']}"} for row in rows)
+
+    def __len__(self):
+        return len(self._names)
+
+    def resolve(self, name):
+        """
+        Возвращает идентификаторы актеров, подходящих под введенное имя.
+
+        Параметры:
+        ----------
+        name : str
+            Полное имя, имя, фамилия или часть имени актера.
+
+        Возвращает:
+        ----------
+        set of int
+            Идентификаторы актеров.
+        """
+        needle = ' '.join(normalize_text(name).split())
+        if not needle:
+            return set()
+
+        return self._names.search(needle)
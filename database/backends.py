@@ -0,0 +1,624 @@
+"""
+database/backends.py
+--------------------
+
+Этот модуль содержит хранилища данных (backends), с которыми работает общий пул соединений:
+MySQL (основное) и встроенную базу данных SQLite, собранную из дампа Sakila
+(см. database/sqlite_import.py).
+
+Хранилище выбирается ключом 'backend' в параметрах подключения (DATABASE_CONFIG).
+Весь остальной код пишет запросы с параметрами %s на общем для обеих баз подмножестве SQL,
+а то, что в диалектах различается, берет у хранилища: полнотекстовый поиск, пересчет film_details,
+проверку уникального индекса и увеличение счетчиков популярных запросов.
+Для SQLite функции MySQL, которые используют запросы приложения (CRC32, BIT_XOR, CONCAT_WS, SHA2),
+регистрируются в каждом соединении.
+
+Классы:
+-------
+StorageBackend
+    Базовый класс хранилища данных.
+
+MySQLBackend
+    Хранилище MySQL (драйвер mysql.connector).
+
+SQLiteBackend
+    Встроенное хранилище SQLite (модуль sqlite3 стандартной библиотеки).
+
+SQLiteConnection
+    Соединение SQLite с интерфейсом соединения mysql.connector, которым пользуется пул.
+
+SQLiteCursor
+    Курсор SQLite с интерфейсом курсора mysql.connector.
+
+Функции:
+--------
+mysql_connector()
+    Возвращает модуль mysql.connector, импортируя его при первом обращении.
+
+get_backend(db_config)
+    Возвращает хранилище для заданных параметров подключения.
+
+normalize_db_config(db_config)
+    Приводит параметры подключения к виду, по которому различаются пулы соединений.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import zlib
+from functools import lru_cache
+
+# Хранилище по умолчанию для параметров подключения без ключа 'backend'
+DEFAULT_BACKEND = 'mysql'
+
+
+def mysql_connector():
+    """
+    Возвращает модуль mysql.connector, импортируя его при первом обращении.
+
+    Импорт драйвера занимает заметную часть времени запуска приложения, поэтому он
+    откладывается до открытия первого соединения. Выражение в `except backend.Error`
+    вычисляется только при возникновении исключения, поэтому не вызывает импорт заранее.
+
+    Возвращает:
+    ----------
+    module
+        Модуль mysql.connector.
+    """
+    import mysql.connector
+    return mysql.connector
+
+
+class StorageBackend:
+    """
+    Базовый класс хранилища данных.
+
+    Атрибуты:
+    ----------
+    name : str
+        Название хранилища (значение ключа 'backend' в параметрах подключения).
+    UNIQUE_INDEX_QUERY : str
+        Запрос с параметрами (таблица, столбец), возвращающий строку со столбцом count —
+        количеством уникальных индексов, которые начинаются с этого столбца.
+    QUERY_STATS_UPSERT : str
+        Запрос с параметрами (search_type, search_params, search_params, query_count),
+        увеличивающий счетчик запроса в user_query_stats.
+    EXPLAIN_PREFIX : str
+        Префикс, превращающий запрос SELECT в запрос его плана (см. database/instrumentation.py).
+    CASE_INSENSITIVE_COLLATION : bool
+        Сравниваются ли строки без учета регистра и диакритики (см. database/columnar.py).
+
+    Методы:
+    -------
+    connect(db_config)
+        Открывает соединение с базой данных.
+    full_text_clause(query, mode)
+        Возвращает части полнотекстового запроса к film_text.
+    film_details_refresh(film_id=None)
+        Возвращает запросы, пересчитывающие film_details.
+    prepared_cursor(connection)
+        Возвращает курсор, выполняющий запрос подготовленным выражением.
+    """
+
+    name = None
+    UNIQUE_INDEX_QUERY = None
+    QUERY_STATS_UPSERT = None
+    EXPLAIN_PREFIX = None
+    CASE_INSENSITIVE_COLLATION = False
+
+    @property
+    def Error(self):
+        """
+        Базовый класс ошибок драйвера базы данных.
+        """
+        raise NotImplementedError
+
+    @property
+    def IntegrityError(self):
+        """
+        Класс ошибок нарушения ограничений (например, уникального индекса).
+        """
+        raise NotImplementedError
+
+    def connect(self, db_config):
+        """
+        Открывает соединение с базой данных.
+
+        Параметры:
+        ----------
+        db_config : dict
+            Параметры подключения (ключ 'backend' игнорируется).
+
+        Возвращает:
+        ----------
+        object
+            Соединение с интерфейсом mysql.connector: cursor, commit, rollback, start_transaction,
+            ping, is_connected, close и свойство autocommit.
+        """
+        raise NotImplementedError
+
+    def full_text_clause(self, query, mode):
+        """
+        Возвращает части полнотекстового запроса к film_text.
+
+        Параметры:
+        ----------
+        query : str
+            Поисковая строка в синтаксисе MySQL (в режиме 'boolean' — с операторами +, -, * и кавычками).
+        mode : str
+            Режим поиска: 'natural' или 'boolean'.
+
+        Возвращает:
+        ----------
+        tuple of (str, str, str, list) or None
+            Источник строк (с film_details под псевдонимом fd), выражение релевантности, условие WHERE
+            и параметры к ним в порядке появления в запросе; None, если в строке нет слов для поиска.
+        """
+        raise NotImplementedError
+
+    def film_details_refresh(self, film_id=None):
+        """
+        Возвращает запросы, пересчитывающие film_details.
+
+        Параметры:
+        ----------
+        film_id : int, optional
+            ID фильма для пересчета. Если не задан, таблица перестраивается полностью.
+
+        Возвращает:
+        ----------
+        list of tuple
+            Пары (запрос, параметры), которые выполняются в одной транзакции.
+        """
+        raise NotImplementedError
+
+    def prepared_cursor(self, connection):
+        """
+        Возвращает курсор, выполняющий запрос подготовленным выражением.
+
+        Курсор хранится в кэше подготовленных выражений (database/statements.py) и выполняет
+        один и тот же текст запроса с разными параметрами. Строки он возвращает кортежами.
+
+        Параметры:
+        ----------
+        connection : object
+            Соединение, открытое методом connect.
+
+        Возвращает:
+        ----------
+        object
+            Курсор с методами execute, fetchall, close и свойством description.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def connection_params(db_config):
+        """
+        Возвращает параметры подключения без ключа 'backend'.
+        """
+        return {key: value for key, value in db_config.items() if key != 'backend'}
+
+
+class MySQLBackend(StorageBackend):
+    """
+    Хранилище MySQL (драйвер mysql.connector).
+
+    Полнотекстовый поиск выполняется по индексу FULLTEXT idx_title_description таблицы film_text,
+    а film_details пересчитывают хранимые процедуры из database_scripts/Film_Details_Table.sql.
+    """
+
+    name = 'mysql'
+
+    # Модификаторы MATCH ... AGAINST для режимов полнотекстового поиска
+    FULL_TEXT_MODIFIERS = {
+        'natural': 'IN NATURAL LANGUAGE MODE',
+        'boolean': 'IN BOOLEAN MODE',
+    }
+
+    UNIQUE_INDEX_QUERY = """
+    SELECT COUNT(*) AS count
+    FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = %s
+      AND column_name = %s AND seq_in_index = 1 AND non_unique = 0
+    """
+
+    # Хеш считается от канонического вида JSON в MySQL, как и при первичном заполнении таблицы
+    QUERY_STATS_UPSERT = """
+    INSERT INTO user_query_stats (search_type, params_hash, search_params, query_count)
+    VALUES (%s, SHA2(CAST(CAST(%s AS JSON) AS CHAR), 256), %s, %s)
+    ON DUPLICATE KEY UPDATE query_count = query_count + VALUES(query_count)
+    """
+
+    EXPLAIN_PREFIX = "EXPLAIN "
+
+    # Таблицы Sakila используют сопоставление utf8mb4_0900_ai_ci
+    CASE_INSENSITIVE_COLLATION = True
+
+    @property
+    def Error(self):
+        return mysql_connector().Error
+
+    @property
+    def IntegrityError(self):
+        return mysql_connector().IntegrityError
+
+    def connect(self, db_config):
+        return mysql_connector().connect(**self.connection_params(db_config))
+
+    def full_text_clause(self, query, mode):
+        match = f"MATCH(ft.title, ft.description) AGAINST (%s {self.FULL_TEXT_MODIFIERS[mode]})"
+        source = "film_text ft\nJOIN film_details fd ON fd.film_id = ft.film_id"
+        return source, match, match, [query, query]
+
+    def film_details_refresh(self, film_id=None):
+        if film_id is None:
+            return [("CALL rebuild_film_details()", None)]
+        return [("CALL refresh_film_details(%s)", (film_id,))]
+
+    def prepared_cursor(self, connection):
+        # Курсор готовит выражение на сервере при первом execute и повторно использует его,
+        # пока ему передается тот же объект строки запроса
+        return connection.cursor(prepared=True)
+
+
+@lru_cache(maxsize=256)
+def _sqlite_query(query):
+    """
+    Заменяет параметры %s на параметры ? модуля sqlite3.
+
+    В запросах приложения %s не встречается внутри строковых литералов, поэтому замена выполняется по всему тексту.
+    """
+    return query.replace('%s', '?')
+
+
+class SQLiteCursor:
+    """
+    Курсор SQLite с интерфейсом курсора mysql.connector: параметры %s и строки в виде кортежей или словарей.
+    """
+
+    def __init__(self, cursor, dictionary=False):
+        self._cursor = cursor
+        self._dictionary = dictionary
+
+    def execute(self, query, params=None):
+        self._cursor.execute(_sqlite_query(query), tuple(params or ()))
+
+    def executemany(self, query, seq_of_params):
+        self._cursor.executemany(_sqlite_query(query), [tuple(params) for params in seq_of_params])
+
+    def _convert(self, rows):
+        if not self._dictionary:
+            return rows
+        names = [column[0] for column in self._cursor.description]
+        return [dict(zip(names, row)) for row in rows]
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        return row if row is None else self._convert([row])[0]
+
+    def fetchmany(self, size=1):
+        return self._convert(self._cursor.fetchmany(size))
+
+    def fetchall(self):
+        return self._convert(self._cursor.fetchall())
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """
+    Соединение SQLite с интерфейсом соединения mysql.connector, которым пользуется пул.
+
+    Соединение открыто в режиме autocommit (isolation_level=None), явные транзакции
+    начинаются с BEGIN IMMEDIATE, чтобы блокировка записи бралась сразу, а не при первой записи.
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+        self._open = True
+
+    @property
+    def autocommit(self):
+        return self._connection.isolation_level is None
+
+    @autocommit.setter
+    def autocommit(self, value):
+        self._connection.isolation_level = None if value else 'DEFERRED'
+
+    def cursor(self, dictionary=False, buffered=True):
+        # Курсор sqlite3 всегда читает строки по мере выборки, поэтому buffered не влияет на работу
+        return SQLiteCursor(self._connection.cursor(), dictionary=dictionary)
+
+    def start_transaction(self):
+        self._connection.execute("BEGIN IMMEDIATE")
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    def ping(self, reconnect=False):
+        self._connection.execute("SELECT 1")
+
+    def is_connected(self):
+        return self._open
+
+    def close(self):
+        self._open = False
+        self._connection.close()
+
+
+class _BitXor:
+    """
+    Агрегатная функция BIT_XOR для SQLite.
+    """
+
+    def __init__(self):
+        self.value = 0
+
+    def step(self, value):
+        if value is not None:
+            self.value ^= int(value)
+
+    def finalize(self):
+        return self.value
+
+
+def _concat_ws(separator, *values):
+    return separator.join(str(value) for value in values if value is not None)
+
+
+def _crc32(value):
+    if value is None:
+        return None
+    return zlib.crc32(value if isinstance(value, bytes) else str(value).encode('utf-8'))
+
+
+def _sha2(value, bits):
+    if value is None or bits != 256:
+        return None
+    return hashlib.sha256(str(value).encode('utf-8')).hexdigest()
+
+
+def _json_canonical(value):
+    # Как CAST(... AS JSON) в MySQL: ключи упорядочены, поэтому порядок ключей не влияет на хеш
+    return json.dumps(json.loads(value), sort_keys=True, ensure_ascii=False)
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    Встроенное хранилище SQLite (модуль sqlite3 стандартной библиотеки).
+
+    Параметр подключения 'database' — путь к файлу базы данных, созданному database/sqlite_import.py.
+    Полнотекстовый поиск выполняется по виртуальной таблице FTS5 film_text_fts, а film_details
+    пересчитывается обычными запросами (в самой базе ее поддерживают триггеры, созданные при импорте).
+    """
+
+    name = 'sqlite'
+
+    # Время ожидания блокировки базы данных другим соединением (в секундах)
+    BUSY_TIMEOUT = 10
+
+    UNIQUE_INDEX_QUERY = """
+    SELECT COUNT(*) AS count
+    FROM pragma_index_list(%s) AS il
+    JOIN pragma_index_info(il.name) AS ii
+    WHERE il."unique" = 1 AND ii.seqno = 0 AND ii.name = %s
+    """
+
+    QUERY_STATS_UPSERT = """
+    INSERT INTO user_query_stats (search_type, params_hash, search_params, query_count)
+    VALUES (%s, SHA2(JSON_CANONICAL(%s), 256), %s, %s)
+    ON CONFLICT (search_type, params_hash)
+    DO UPDATE SET query_count = query_count + excluded.query_count, last_query_time = CURRENT_TIMESTAMP
+    """
+
+    EXPLAIN_PREFIX = "EXPLAIN QUERY PLAN "
+
+    # database/sqlite_import.py создает строковые столбцы с COLLATE NOCASE, как сопоставление MySQL
+    # (NOCASE не различает регистр только латинских букв, но названия жанров и имена актеров Sakila латинские)
+    CASE_INSENSITIVE_COLLATION = True
+
+    # Строка film_details для фильмов, выбранных условием {condition}; списки собираются
+    # подзапросами, так как group_concat в SQLite не принимает DISTINCT вместе с разделителем
+    FILM_DETAILS_SELECT = """
+    SELECT
+        f.film_id,
+        f.title,
+        f.description,
+        (SELECT group_concat(name, ', ') FROM (
+            SELECT DISTINCT c.name FROM film_category fc
+            JOIN category c ON fc.category_id = c.category_id
+            WHERE fc.film_id = f.film_id ORDER BY c.name)),
+        f.release_year,
+        (SELECT group_concat(full_name, ', ') FROM (
+            SELECT DISTINCT a.first_name || ' ' || a.last_name AS full_name FROM film_actor fa
+            JOIN actor a ON fa.actor_id = a.actor_id
+            WHERE fa.film_id = f.film_id ORDER BY a.actor_id))
+    FROM film f
+    WHERE {condition}
+    """
+
+    FILM_DETAILS_INSERT = "INSERT INTO film_details (film_id, title, description, genre, release_year, actors)"
+
+    # Слова поисковой строки и операторы логического режима MySQL
+    _BOOLEAN_TOKEN = re.compile(r'([+\-~<>]*)("([^"]*)"|[\w\']+\*?)')
+    _WORD = re.compile(r'\w+')
+
+    @property
+    def Error(self):
+        return sqlite3.Error
+
+    @property
+    def IntegrityError(self):
+        return sqlite3.IntegrityError
+
+    def connect(self, db_config):
+        path = db_config['database']
+        if not os.path.exists(path):
+            raise sqlite3.OperationalError(
+                f"SQLite database '{path}' does not exist; create it with `python main.py import-sqlite {path}`")
+        connection = sqlite3.connect(path, timeout=self.BUSY_TIMEOUT, isolation_level=None,
+                                     check_same_thread=False)
+        self.register_functions(connection)
+        return SQLiteConnection(connection)
+
+    @staticmethod
+    def register_functions(connection):
+        """
+        Регистрирует в соединении sqlite3 функции MySQL, которые используют запросы приложения.
+
+        Параметры:
+        ----------
+        connection : sqlite3.Connection
+            Соединение SQLite.
+        """
+        connection.create_function('CRC32', 1, _crc32, deterministic=True)
+        connection.create_function('CONCAT_WS', -1, _concat_ws, deterministic=True)
+        connection.create_function('SHA2', 2, _sha2, deterministic=True)
+        connection.create_function('JSON_CANONICAL', 1, _json_canonical, deterministic=True)
+        connection.create_aggregate('BIT_XOR', 1, _BitXor)
+
+    @staticmethod
+    def _fts_term(word, prefix=False):
+        return '"' + word.replace('"', '""') + '"' + ('*' if prefix else '')
+
+    def fts_query(self, query, mode):
+        """
+        Переводит поисковую строку MySQL в запрос FTS5.
+
+        В режиме 'natural' достаточно совпадения любого слова. В режиме 'boolean' слова с '+'
+        обязательны, слова с '-' исключают строку, '*' ищет по началу слова, кавычки задают фразу;
+        необязательные слова учитываются, только если обязательных нет.
+
+        Параметры:
+        ----------
+        query : str
+            Поисковая строка.
+        mode : str
+            Режим поиска: 'natural' или 'boolean'.
+
+        Возвращает:
+        ----------
+        str or None
+            Запрос FTS5 или None, если в строке нет слов для поиска.
+        """
+        if mode == 'natural':
+            words = self._WORD.findall(query)
+            return ' OR '.join(self._fts_term(word) for word in words) or None
+
+        required, optional, excluded = [], [], []
+        for operators, token, phrase in self._BOOLEAN_TOKEN.findall(query):
+            if phrase:
+                words = self._WORD.findall(phrase)
+                term = self._fts_term(' '.join(words)) if words else None
+            else:
+                words = self._WORD.findall(token)
+                term = ' AND '.join(self._fts_term(word, token.endswith('*') and word == words[-1])
+                                    for word in words) if words else None
+            if term is None:
+                continue
+            if '-' in operators:
+                excluded.append(term)
+            elif '+' in operators:
+                required.append(term)
+            else:
+                optional.append(term)
+
+        if required:
+            positive = ' AND '.join(required)
+        elif optional:
+            positive = '(' + ' OR '.join(optional) + ')'
+        else:
+            return None
+        for term in excluded:
+            positive += f' NOT {term}'
+        return positive
+
+    def full_text_clause(self, query, mode):
+        fts_query = self.fts_query(query, mode)
+        if fts_query is None:
+            return None
+        source = "film_text_fts\nJOIN film_details fd ON fd.film_id = film_text_fts.rowid"
+        # bm25 меньше для более релевантных строк, поэтому знак меняется
+        return source, "-bm25(film_text_fts)", "film_text_fts MATCH %s", [fts_query]
+
+    def film_details_refresh(self, film_id=None):
+        if film_id is None:
+            return [("DELETE FROM film_details", None),
+                    (self.FILM_DETAILS_INSERT + self.FILM_DETAILS_SELECT.format(condition="1=1"), None)]
+        return [("DELETE FROM film_details WHERE film_id = %s", (film_id,)),
+                (self.FILM_DETAILS_INSERT + self.FILM_DETAILS_SELECT.format(condition="f.film_id = %s"),
+                 (film_id,))]
+
+    def prepared_cursor(self, connection):
+        # sqlite3 кэширует скомпилированные выражения соединения по тексту запроса
+        return connection.cursor()
+
+
+BACKENDS = {
+    MySQLBackend.name: MySQLBackend(),
+    SQLiteBackend.name: SQLiteBackend(),
+}
+
+
+def normalize_db_config(db_config):
+    """
+    Приводит параметры подключения к виду, по которому различаются пулы соединений:
+    добавляет хранилище по умолчанию и убирает незаданные параметры.
+
+    Параметры:
+    ----------
+    db_config : dict
+        Параметры подключения.
+
+    Возвращает:
+    ----------
+    dict
+        Параметры подключения с ключом 'backend'.
+    """
+    config = {key: value for key, value in db_config.items() if value is not None}
+    config.setdefault('backend', DEFAULT_BACKEND)
+    return config
+
+
+def get_backend(db_config):
+    """
+    Возвращает хранилище для заданных параметров подключения.
+
+    Параметры:
+    ----------
+    db_config : dict
+        Параметры подключения; хранилище задается ключом 'backend' (по умолчанию 'mysql').
+
+    Возвращает:
+    ----------
+    StorageBackend
+        Хранилище данных.
+
+    Исключения:
+    -----------
+    ValueError
+        Если хранилище не поддерживается.
+    """
+    name = db_config.get('backend') or DEFAULT_BACKEND
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unsupported database backend: {name}") from None
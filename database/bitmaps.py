@@ -0,0 +1,383 @@
+"""
+database/bitmaps.py
+-------------------
+
+Этот модуль содержит сжатые битовые карты (в духе Roaring) и индекс битовых карт по жанру,
+году выпуска и актеру, по которому поиск по нескольким критериям находит подходящие фильмы
+пересечением множеств в памяти, а из базы данных загружает только итоговые фильмы.
+
+Битовая карта делит идентификатор на старшие и младшие 16 бит. Для каждого значения старших бит
+хранится контейнер младших: множество (frozenset), если в нем не больше ARRAY_CONTAINER_LIMIT значений,
+или битовая маска на 65536 бит (int), если значений больше. Поэтому и редкие множества (фильмы актера),
+и плотные (фильмы жанра или года) занимают мало памяти, а пересечение и объединение плотных
+контейнеров — одна операция над целыми числами.
+
+Годы выпуска хранятся нарастающими итогами (range encoding): для каждого года — карта фильмов
+этого и более ранних лет, поэтому диапазон лет — разность двух карт, а не объединение карт всех его лет.
+
+Критерии пересекаются в порядке возрастания количества фильмов, поэтому самые избирательные
+критерии применяются первыми, а пересечение прекращается, как только результат стал пустым.
+Найденные по ключевым словам фильмы в карту не превращаются: если их больше, чем уже найдено
+по другим критериям, найденные фильмы просто проверяются по этому множеству.
+
+Классы:
+-------
+RoaringBitmap
+    __init__(self, values=())
+        Инициализирует битовую карту по идентификаторам.
+
+    union(cls, bitmaps)
+        Возвращает объединение битовых карт.
+
+    select(self, predicate)
+        Возвращает битовую карту значений, для которых predicate(value) истинно.
+
+BitmapIndex
+    __init__(self, rows, film_actor_rows, film_genre_rows, case_insensitive=False)
+        Инициализирует индекс по строкам film_details, film_actor и жанрам фильмов.
+
+    filter(self, genre=None, start_year=None, end_year=None, film_ids=None, actor_ids=None)
+        Возвращает битовую карту фильмов, подходящих под все критерии.
+"""
+
+import bisect
+import operator
+import re
+import time
+from functools import reduce
+
+from .trigram import normalize_text
+
+# Наибольшее количество значений в контейнере-множестве; больше — контейнер хранится битовой маской.
+# В Roaring это 4096 (двухбайтовые значения массива занимают столько же, сколько маска на 8 КБ),
+# а элемент frozenset в CPython занимает десятки байт, поэтому маска выгоднее уже с нескольких сотен значений;
+# операции над масками к тому же выполняются целиком в C
+ARRAY_CONTAINER_LIMIT = 256
+
+# Размер контейнера битовой маски в байтах (2 ** 16 бит)
+BITMAP_CONTAINER_BYTES = 8192
+
+# Номера установленных битов для каждого значения байта
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256))
+
+# Ненулевые байты битовой маски (поиск по ним выполняется в C, а не циклом по всем байтам)
+_NONZERO_BYTES = re.compile(b'[^\x00]')
+
+
+def _to_mask(container):
+    """
+    Возвращает контейнер в виде битовой маски.
+    """
+    if isinstance(container, int):
+        return container
+    data = bytearray(BITMAP_CONTAINER_BYTES)
+    for low in container:
+        data[low >> 3] |= 1 << (low & 7)
+    return int.from_bytes(data, 'little')
+
+
+def _mask_values(mask):
+    """
+    Возвращает генератор установленных битов маски по возрастанию.
+    """
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, 'little')
+    for match in _NONZERO_BYTES.finditer(data):
+        position = match.start()
+        base = position << 3
+        for bit in _BYTE_BITS[data[position]]:
+            yield base | bit
+
+
+def _container(lows):
+    """
+    Создает контейнер для множества младших 16 бит.
+    """
+    return frozenset(lows) if len(lows) <= ARRAY_CONTAINER_LIMIT else _to_mask(lows)
+
+
+def _cardinality(container):
+    """
+    Возвращает количество значений в контейнере.
+    """
+    return container.bit_count() if isinstance(container, int) else len(container)
+
+
+def _intersect(first, second):
+    """
+    Возвращает пересечение двух контейнеров.
+    """
+    if isinstance(first, int) and isinstance(second, int):
+        return first & second
+    if isinstance(first, int):
+        first, second = second, first
+    if isinstance(second, int):
+        data = second.to_bytes(BITMAP_CONTAINER_BYTES, 'little')
+        return frozenset(low for low in first if data[low >> 3] >> (low & 7) & 1)
+    return first & second
+
+
+def _subtract(first, second):
+    """
+    Возвращает разность двух контейнеров.
+    """
+    if isinstance(first, int):
+        return first & ~_to_mask(second)
+    if isinstance(second, int):
+        data = second.to_bytes(BITMAP_CONTAINER_BYTES, 'little')
+        return frozenset(low for low in first if not data[low >> 3] >> (low & 7) & 1)
+    return first - second
+
+
+def _unite(containers):
+    """
+    Возвращает объединение контейнеров: множества объединяются одним вызовом,
+    а в маску превращаются, только если результат не помещается в контейнер-множество.
+    """
+    masks = [container for container in containers if isinstance(container, int)]
+    values = frozenset().union(*(container for container in containers if not isinstance(container, int)))
+    if not masks:
+        return _container(values)
+    mask = reduce(operator.or_, masks)
+    return mask | _to_mask(values) if values else mask
+
+
+class RoaringBitmap:
+    """
+    Сжатая битовая карта неотрицательных целых чисел (идентификаторов фильмов).
+
+    Поддерживает len(), in, перебор значений по возрастанию, пересечение (&), объединение (|) и разность (-).
+
+    Методы:
+    -------
+    union(bitmaps)
+        Возвращает объединение битовых карт.
+    select(predicate)
+        Возвращает битовую карту значений, для которых predicate(value) истинно.
+    """
+
+    __slots__ = ('_containers',)
+
+    def __init__(self, values=()):
+        """
+        Инициализирует битовую карту по идентификаторам.
+
+        Параметры:
+        ----------
+        values : iterable of int, optional
+            Неотрицательные целые числа.
+        """
+        chunks = {}
+        for value in values:
+            chunks.setdefault(value >> 16, set()).add(value & 0xFFFF)
+        self._containers = {high: _container(lows) for high, lows in chunks.items()}
+
+    @classmethod
+    def _from_containers(cls, containers):
+        """
+        Создает битовую карту из контейнеров, отбрасывая пустые.
+        """
+        bitmap = cls()
+        bitmap._containers = {high: container for high, container in containers.items() if container}
+        return bitmap
+
+    def __len__(self):
+        return sum(_cardinality(container) for container in self._containers.values())
+
+    def __bool__(self):
+        return bool(self._containers)
+
+    def __contains__(self, value):
+        container = self._containers.get(value >> 16)
+        if container is None:
+            return False
+        low = value & 0xFFFF
+        return bool(container >> low & 1) if isinstance(container, int) else low in container
+
+    def __iter__(self):
+        for high in sorted(self._containers):
+            container = self._containers[high]
+            base = high << 16
+            for low in (_mask_values(container) if isinstance(container, int) else sorted(container)):
+                yield base | low
+
+    def __and__(self, other):
+        smaller, larger = sorted((self, other), key=lambda bitmap: len(bitmap._containers))
+        return self._from_containers({
+            high: _intersect(container, larger._containers[high])
+            for high, container in smaller._containers.items() if high in larger._containers
+        })
+
+    def __or__(self, other):
+        return self.union((self, other))
+
+    def __sub__(self, other):
+        return self._from_containers({
+            high: _subtract(container, other._containers[high]) if high in other._containers else container
+            for high, container in self._containers.items()
+        })
+
+    def select(self, predicate):
+        """
+        Возвращает битовую карту значений, для которых predicate(value) истинно.
+
+        Параметры:
+        ----------
+        predicate : callable
+            Функция от значения (например, метод __contains__ множества).
+
+        Возвращает:
+        ----------
+        RoaringBitmap
+            Отобранные значения.
+        """
+        return RoaringBitmap(value for value in self if predicate(value))
+
+    @classmethod
+    def union(cls, bitmaps):
+        """
+        Возвращает объединение битовых карт.
+
+        Параметры:
+        ----------
+        bitmaps : iterable of RoaringBitmap
+            Битовые карты.
+
+        Возвращает:
+        ----------
+        RoaringBitmap
+            Объединение (пустая карта, если карт нет).
+        """
+        chunks = {}
+        for bitmap in bitmaps:
+            for high, container in bitmap._containers.items():
+                chunks.setdefault(high, []).append(container)
+        return cls._from_containers({high: _unite(containers) for high, containers in chunks.items()})
+
+
+class BitmapIndex:
+    """
+    Индекс битовых карт фильмов по жанру, году выпуска и актеру.
+
+    Атрибуты:
+    ----------
+    loaded_at : float
+        Момент построения индекса (time.monotonic()).
+
+    Методы:
+    -------
+    filter(genre=None, start_year=None, end_year=None, film_ids=None, actor_ids=None)
+        Возвращает битовую карту фильмов, подходящих под все критерии.
+    """
+
+    def __init__(self, rows, film_actor_rows, film_genre_rows, case_insensitive=False):
+        """
+        Инициализирует индекс по строкам film_details, film_actor и жанрам фильмов.
+
+        Параметры:
+        ----------
+        rows : iterable of dict
+            Строки film_details с ключами film_id и release_year.
+        film_actor_rows : iterable of dict
+            Строки film_actor с ключами actor_id и film_id.
+        film_genre_rows : iterable of dict
+            Жанры фильмов (film_category и category) с ключами film_id и genre:
+            у фильма может быть несколько жанров, и он входит в карту каждого из них.
+        case_insensitive : bool, optional
+            Сравнивает ли база данных строки без учета регистра и диакритики
+            (тогда так же сравнивается и жанр; по умолчанию False).
+        """
+        self.loaded_at = time.monotonic()
+        self._case_insensitive = case_insensitive
+        genres, years, actors = {}, {}, {}
+        for row in rows:
+            if row['release_year'] is not None:
+                years.setdefault(int(row['release_year']), []).append(row['film_id'])
+        for row in film_actor_rows:
+            actors.setdefault(row['actor_id'], []).append(row['film_id'])
+        for row in film_genre_rows:
+            if row['genre'] is not None:
+                genres.setdefault(self._text_key(row['genre']), []).append(row['film_id'])
+
+        self._genres = {genre: RoaringBitmap(film_ids) for genre, film_ids in genres.items()}
+        self._actors = {actor_id: RoaringBitmap(film_ids) for actor_id, film_ids in actors.items()}
+
+        # Нарастающие итоги по годам: _years_until[i] — фильмы годов _year_list[0..i]
+        self._year_list = sorted(years)
+        self._years_until = []
+        until = RoaringBitmap()
+        for year in self._year_list:
+            until = until | RoaringBitmap(years[year])
+            self._years_until.append(until)
+
+    def _text_key(self, value):
+        """
+        Приводит строку к виду, в котором ее сравнивает база данных.
+        """
+        return normalize_text(value) if self._case_insensitive else value
+
+    def filter(self, genre=None, start_year=None, end_year=None, film_ids=None, actor_ids=None):
+        """
+        Возвращает битовую карту фильмов, подходящих под все критерии.
+
+        Критерии (фильмы жанра, диапазона лет, любого из актеров и найденные по ключевым словам)
+        пересекаются в порядке возрастания количества фильмов.
+
+        Параметры:
+        ----------
+        genre : str, optional
+            Жанр фильма (фильм подходит, если это один из его жанров, как в запросе поиска).
+        start_year, end_year : int or str, optional
+            Границы годов выпуска.
+        film_ids : iterable of int, optional
+            Идентификаторы фильмов, найденные по ключевым словам (None — без ограничения).
+        actor_ids : iterable of int, optional
+            Идентификаторы актеров (None — без ограничения).
+
+        Возвращает:
+        ----------
+        RoaringBitmap or None
+            Подходящие фильмы или None, если критерии не заданы или год не является числом.
+        """
+        # Критерии — пары (количество фильмов, RoaringBitmap или множество идентификаторов)
+        criteria = []
+        if film_ids is not None:
+            film_ids = film_ids if isinstance(film_ids, (set, frozenset)) else set(film_ids)
+            criteria.append((len(film_ids), film_ids))
+        if actor_ids is not None:
+            bitmap = RoaringBitmap.union(self._actors[actor_id] for actor_id in actor_ids if actor_id in self._actors)
+            criteria.append((len(bitmap), bitmap))
+        if genre:
+            bitmap = self._genres.get(self._text_key(genre), RoaringBitmap())
+            criteria.append((len(bitmap), bitmap))
+        if start_year or end_year:
+            try:
+                bitmap = self._year_range(start_year, end_year)
+            except (TypeError, ValueError):
+                return None
+            criteria.append((len(bitmap), bitmap))
+        if not criteria:
+            return None
+
+        criteria.sort(key=lambda criterion: criterion[0])
+        result = None
+        for _, values in criteria:
+            if result is None:
+                result = values if isinstance(values, RoaringBitmap) else RoaringBitmap(values)
+            elif isinstance(values, RoaringBitmap):
+                result = result & values
+            else:
+                result = result.select(values.__contains__)
+            if not result:
+                break
+        return result
+
+    def _year_range(self, start_year=None, end_year=None):
+        """
+        Возвращает битовую карту фильмов с годом выпуска в диапазоне (как разность нарастающих итогов).
+        """
+        first = bisect.bisect_left(self._year_list, int(start_year)) if start_year else 0
+        last = bisect.bisect_right(self._year_list, int(end_year)) if end_year else len(self._year_list)
+        if first >= last:
+            return RoaringBitmap()
+        bitmap = self._years_until[last - 1]
+        return bitmap - self._years_until[first - 1] if first else bitmap
@@ -0,0 +1,226 @@
+"""
+database/cache.py
+-----------------
+
+Этот модуль содержит класс SearchCache — кэш результатов поиска с вытеснением давно
+не использованных записей (LRU) и ограниченным временем жизни записей (TTL).
+
+Ключ кэша — каноническая форма критериев поиска: ключевые слова приводятся к нижнему регистру,
+очищаются от повторов и сортируются, годы, записанные цифрами, приводятся к числам, порядок сортировки — к "ASC"/"DESC".
+Поэтому одинаковые по смыслу запросы, введенные по-разному, попадают в одну запись.
+
+Классы:
+-------
+SearchCache
+    __init__(self, max_size=256, ttl=300)
+        Инициализирует пустой кэш.
+
+    get(self, key)
+        Возвращает значение из кэша.
+
+    put(self, key, value)
+        Сохраняет значение в кэше.
+
+    clear(self)
+        Удаляет все записи кэша.
+
+    stats(self)
+        Возвращает счетчики попаданий и промахов.
+
+Функции:
+--------
+normalize_search_criteria(**criteria)
+    Возвращает каноническую форму критериев поиска для использования в качестве ключа кэша.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from .pagination import normalize_sort_order, sort_expression
+from .trigram import normalize_text
+
+_MISSING = object()
+
+
+def _normalize_year(value):
+    """
+    Приводит год, записанный цифрами без пробелов и ведущих нулей, к числу, а пустую строку — к None.
+
+    Остальные значения не изменяются: в запрос они передаются как есть, и базы данных сравнивают
+    их с годом по-разному, поэтому, например, ' 2000 ' и '2000' попадают в разные записи.
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, str) and value.isascii() and value.isdigit() and value == str(int(value)):
+        return int(value)
+    return value
+
+
+def _normalize_words(value):
+    """
+    Приводит строку к нижнему регистру и схлопывает пробелы; пустое значение — к None.
+    """
+    if not value:
+        return None
+    return ' '.join(normalize_text(str(value)).split()) or None
+
+
+def normalize_search_criteria(**criteria):
+    """
+    Возвращает каноническую форму критериев поиска для использования в качестве ключа кэша.
+
+    Параметры:
+    ----------
+    **criteria
+        Именованные аргументы метода поиска (keywords, genre, start_year, end_year, actor_name,
+        sort_by, sort_order и любые другие, например page_size или cursor).
+
+    Возвращает:
+    ----------
+    tuple
+        Неизменяемый ключ кэша.
+    """
+    normalized = dict(criteria)
+
+    keywords = criteria.get('keywords')
+    if isinstance(keywords, str):
+        keywords = keywords.split()
+    normalized['keywords'] = tuple(sorted({normalize_text(keyword) for keyword in keywords or ()})) or None
+
+    for key in ('genre', 'actor_name', 'query'):
+        if key in criteria:
+            normalized[key] = _normalize_words(criteria[key])
+
+    for key in ('start_year', 'end_year'):
+        normalized[key] = _normalize_year(criteria.get(key))
+
+    if 'sort_by' in criteria or 'sort_order' in criteria:
+        sort_by = (criteria.get('sort_by') or '').lower()
+        normalized['sort_by'] = sort_by if sort_expression(sort_by) else None
+        normalized['sort_order'] = normalize_sort_order(criteria.get('sort_order'))
+
+    return tuple(sorted(normalized.items()))
+
+
+class SearchCache:
+    """
+    Кэш результатов поиска с вытеснением LRU и временем жизни записей.
+
+    Значения возвращаются без копирования, поэтому вызывающий код не должен их изменять.
+
+    Атрибуты:
+    ----------
+    max_size : int
+        Максимальное количество записей.
+    ttl : float
+        Время жизни записи в секундах.
+    hits : int
+        Количество попаданий.
+    misses : int
+        Количество промахов.
+
+    Методы:
+    -------
+    get(key)
+        Возвращает значение из кэша.
+    put(key, value)
+        Сохраняет значение в кэше.
+    clear()
+        Удаляет все записи кэша.
+    stats()
+        Возвращает счетчики попаданий и промахов.
+    """
+
+    def __init__(self, max_size=256, ttl=300):
+        """
+        Инициализирует пустой кэш.
+
+        Параметры:
+        ----------
+        max_size : int, optional
+            Максимальное количество записей (по умолчанию 256, 0 — кэш отключен).
+        ttl : float, optional
+            Время жизни записи в секундах (по умолчанию 300).
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """
+        Возвращает значение из кэша.
+
+        Параметры:
+        ----------
+        key : tuple
+            Ключ, полученный из normalize_search_criteria.
+        default : object, optional
+            Значение, возвращаемое при промахе (по умолчанию None).
+
+        Возвращает:
+        ----------
+        object
+            Сохраненное значение или default.
+        """
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        """
+        Сохраняет значение в кэше, вытесняя давно не использованные записи при переполнении.
+
+        Параметры:
+        ----------
+        key : tuple
+            Ключ, полученный из normalize_search_criteria.
+        value : object
+            Значение для сохранения.
+        """
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Удаляет все записи кэша. Счетчики попаданий и промахов сохраняются.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Возвращает счетчики попаданий и промахов.
+
+        Возвращает:
+        ----------
+        dict
+            Ключи: hits, misses, size, hit_rate.
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'hit_rate': self.hits / total if total else 0.0,
+            }
@@ -0,0 +1,256 @@
+"""
+database/columnar.py
+--------------------
+
+Этот модуль содержит столбцовый каталог фильмов в памяти — необязательный движок поиска,
+который отвечает на фильтры search_movies без запросов к базе данных (см. SEARCH_ENGINE_CONFIG).
+
+Каталог один раз загружает film_details, film_actor и жанры фильмов (film_category и category)
+и хранит их в столбцах NumPy:
+
+- год выпуска — массив целых чисел (-1 для NULL);
+- жанры — позиции фильмов каждого жанра (у фильма может быть несколько жанров, поэтому жанр проверяется
+  принадлежностью, как и в запросе поиска, а не сравнением со списком film_details.genre);
+- актеры — фильмы каждого актера в формате CSR: позиции фильмов film_actor, упорядоченные по actor_id,
+  и массив смещений, по которому фильмы актера — срез actor_films[offsets[a]:offsets[a + 1]];
+- сортировка — порядок фильмов для каждого столбца сортировки и ранг каждого фильма в нем.
+
+Фильтры превращаются в логические маски над всем каталогом, а страница результата — в выборку
+из маски в порядке сортировки, начиная с ранга фильма из ключа страницы. Порядок сортировки
+не вычисляется в Python, а читается из базы данных запросом с тем же выражением ORDER BY,
+что и у запроса поиска, поэтому он совпадает с порядком SQL при любом сопоставлении строк.
+Строки результатов — те же строки film_details, что возвращает запрос поиска.
+
+Если критерий нельзя выразить маской (например, год не является числом) или фильма из ключа
+страницы нет в каталоге, search возвращает None, и поиск выполняется запросом к базе данных.
+
+Требует пакета numpy; модуль импортируется только при выборе движка 'columnar'.
+
+Классы:
+-------
+ColumnarCatalog
+    __init__(self, rows, film_actor_rows, film_genre_rows, sort_rows, case_insensitive=False)
+        Инициализирует каталог по строкам film_details, film_actor, жанрам фильмов и порядкам сортировки.
+
+    search(self, genre=None, start_year=None, end_year=None, film_ids=None, actor_ids=None,
+           sort_by=None, sort_order="ASC", cursor=None, direction="next", limit=None)
+        Возвращает строки результата поиска в порядке запроса поиска.
+"""
+
+import time
+
+import numpy as np
+
+from .trigram import normalize_text
+
+
+class ColumnarCatalog:
+    """
+    Столбцовый каталог фильмов в памяти.
+
+    Атрибуты:
+    ----------
+    loaded_at : float
+        Момент загрузки каталога (time.monotonic()).
+
+    Методы:
+    -------
+    search(genre=None, start_year=None, end_year=None, film_ids=None, actor_ids=None,
+           sort_by=None, sort_order="ASC", cursor=None, direction="next", limit=None)
+        Возвращает строки результата поиска в порядке запроса поиска.
+    """
+
+    def __init__(self, rows, film_actor_rows, film_genre_rows, sort_rows, case_insensitive=False):
+        """
+        Инициализирует каталог по строкам film_details, film_actor, жанрам фильмов и порядкам сортировки.
+
+        Параметры:
+        ----------
+        rows : list of dict
+            Строки film_details (film_id, title, description, genre, release_year, actors).
+        film_actor_rows : iterable of dict
+            Строки film_actor с ключами actor_id и film_id.
+        film_genre_rows : iterable of dict
+            Жанры фильмов (film_category и category) с ключами film_id и genre.
+        sort_rows : dict
+            Для каждого столбца сортировки — строки film_id и sort_key в порядке
+            ORDER BY sort_key, film_id запроса поиска.
+        case_insensitive : bool, optional
+            Сравнивает ли база данных строки без учета регистра и диакритики
+            (тогда так же сравнивается и жанр; по умолчанию False).
+        """
+        self.loaded_at = time.monotonic()
+        self._rows = list(rows)
+        self._case_insensitive = case_insensitive
+        count = len(self._rows)
+
+        film_ids = np.fromiter((row['film_id'] for row in self._rows), dtype=np.int64, count=count)
+        self._positions = np.full(int(film_ids.max()) + 1 if count else 1, -1, dtype=np.int64)
+        self._positions[film_ids] = np.arange(count)
+
+        self._years = np.fromiter(
+            (-1 if row['release_year'] is None else int(row['release_year']) for row in self._rows),
+            dtype=np.int64, count=count)
+
+        # Позиции фильмов каждого жанра
+        genre_positions = {}
+        for row in film_genre_rows:
+            position = self._position(row['film_id'])
+            if position is not None and row['genre'] is not None:
+                genre_positions.setdefault(self._text_key(row['genre']), []).append(position)
+        self._genre_films = {genre: np.array(positions, dtype=np.int64)
+                             for genre, positions in genre_positions.items()}
+
+        # Фильмы актеров в формате CSR: пары (actor_id, позиция фильма), упорядоченные по актеру
+        pairs = np.array([(row['actor_id'], row['film_id']) for row in film_actor_rows], dtype=np.int64)
+        pairs = pairs.reshape(-1, 2)
+        pairs = pairs[pairs[:, 1] < len(self._positions)]
+        positions = self._positions[pairs[:, 1]]
+        pairs, positions = pairs[positions >= 0], positions[positions >= 0]
+        by_actor = np.argsort(pairs[:, 0], kind='stable')
+        actor_ids = pairs[by_actor, 0]
+        self._actor_films = positions[by_actor]
+        self._actor_offsets = np.searchsorted(
+            actor_ids, np.arange(int(actor_ids.max()) + 2 if len(actor_ids) else 1))
+
+        # Порядок без сортировки — по film_id, то есть порядок самих строк
+        self._orders = {None: np.arange(count)}
+        self._sort_keys = {}
+        for sort_by, ordered_rows in sort_rows.items():
+            ordered_ids = np.fromiter((row['film_id'] for row in ordered_rows), dtype=np.int64,
+                                      count=len(ordered_rows))
+            order = self._positions[ordered_ids]
+            self._orders[sort_by] = order
+            keys = [None] * count
+            for position, row in zip(order.tolist(), ordered_rows):
+                keys[position] = row['sort_key']
+            self._sort_keys[sort_by] = keys
+        self._ranks = {}
+        for sort_by, order in self._orders.items():
+            rank = np.empty(count, dtype=np.int64)
+            rank[order] = np.arange(count)
+            self._ranks[sort_by] = rank
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _text_key(self, value):
+        """
+        Приводит строку к виду, в котором ее сравнивает база данных.
+        """
+        return normalize_text(value) if self._case_insensitive else value
+
+    def _position(self, film_id):
+        """
+        Возвращает позицию фильма в каталоге или None, если фильма в каталоге нет.
+        """
+        if not isinstance(film_id, int) or not 0 <= film_id < len(self._positions):
+            return None
+        position = int(self._positions[film_id])
+        return position if position >= 0 else None
+
+    def _mask(self, genre, start_year, end_year, film_ids, actor_ids):
+        """
+        Возвращает логическую маску фильмов, подходящих под критерии, или None для всего каталога.
+        """
+        mask = None
+
+        def combine(condition):
+            return condition if mask is None else mask & condition
+
+        if film_ids is not None:
+            film_ids = np.fromiter(film_ids, dtype=np.int64)
+            film_ids = film_ids[(film_ids >= 0) & (film_ids < len(self._positions))]
+            positions = self._positions[film_ids]
+            condition = np.zeros(len(self._rows), dtype=bool)
+            condition[positions[positions >= 0]] = True
+            mask = combine(condition)
+
+        if actor_ids is not None:
+            condition = np.zeros(len(self._rows), dtype=bool)
+            offsets = self._actor_offsets
+            for actor_id in actor_ids:
+                if 0 <= actor_id < len(offsets) - 1:
+                    condition[self._actor_films[offsets[actor_id]:offsets[actor_id + 1]]] = True
+            mask = combine(condition)
+
+        if genre:
+            condition = np.zeros(len(self._rows), dtype=bool)
+            positions = self._genre_films.get(self._text_key(genre))
+            if positions is not None:
+                condition[positions] = True
+            mask = combine(condition)
+
+        if start_year:
+            mask = combine(self._years >= int(start_year))
+
+        if end_year:
+            mask = combine((self._years >= 0) & (self._years <= int(end_year)))
+
+        return mask
+
+    def search(self, genre=None, start_year=None, end_year=None, film_ids=None, actor_ids=None,
+               sort_by=None, sort_order="ASC", cursor=None, direction="next", limit=None):
+        """
+        Возвращает строки результата поиска в порядке запроса поиска (см. SearchQueryBuilder.build).
+
+        Параметры:
+        ----------
+        genre, start_year, end_year : optional
+            Жанр и границы годов выпуска.
+        film_ids : iterable of int, optional
+            Идентификаторы фильмов, найденные по ключевым словам (None — без ограничения).
+        actor_ids : iterable of int, optional
+            Идентификаторы актеров (None — без ограничения).
+        sort_by, sort_order : str
+            Сортировка, проверенная validate_sort.
+        cursor : tuple, optional
+            Ключ страницы (None — с начала выдачи).
+        direction : str, optional
+            "next" или "prev" — направление чтения от ключа.
+        limit : int, optional
+            Максимальное количество строк (None — все строки).
+
+        Возвращает:
+        ----------
+        list of dict or None
+            Строки в порядке чтения (для "prev" — от ключа к началу выдачи, как у запроса поиска)
+            или None, если запрос нужно выполнить в базе данных.
+        """
+        try:
+            mask = self._mask(genre, start_year, end_year, film_ids, actor_ids)
+        except (TypeError, ValueError):
+            return None
+
+        order = self._orders.get(sort_by)
+        if order is None:
+            return None
+        selected = np.ones(len(self._rows), dtype=bool) if mask is None else mask[order]
+
+        descending = (sort_order == "DESC") != (cursor is not None and direction == "prev")
+        if cursor is not None:
+            sort_value, film_id = cursor
+            position = self._position(film_id)
+            # Ключ из другой версии каталога — сравнение по рангу не совпало бы с запросом
+            if position is None or (sort_by is not None and self._sort_keys[sort_by][position] != sort_value):
+                return None
+            rank = int(self._ranks[sort_by][position])
+            if descending:
+                selected[rank:] = False
+            else:
+                selected[:rank + 1] = False
+
+        ranks = np.flatnonzero(selected)
+        if descending:
+            ranks = ranks[::-1]
+        if limit is not None:
+            ranks = ranks[:limit]
+
+        rows = []
+        sort_keys = self._sort_keys.get(sort_by)
+        for position in order[ranks].tolist():
+            row = dict(self._rows[position])
+            if sort_keys is not None:
+                row['sort_key'] = sort_keys[position]
+            rows.append(row)
+        return rows
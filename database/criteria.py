@@ -0,0 +1,93 @@
+"""
+database/criteria.py
+--------------------
+
+Этот модуль сопоставляет критерии поиска в том виде, в каком их записывает QueryLogger
+(тип поиска и словарь параметров), с вызовами методов DatabaseManager.
+Его используют неинтерактивные точки входа (пакетный запуск), которым нужен
+тот же поиск, что и в меню приложения.
+
+Функции:
+--------
+execute_search(db_manager, search_type, search_params, limit=10)
+    Выполняет поиск по критериям из журнала запросов.
+"""
+
+from .manager import FULL_TEXT_MODES
+
+# Типы поиска, которые записывает QueryLogger
+SEARCH_TYPES = ('keyword', 'genre', 'year', 'actor', 'multiple_criteria')
+
+
+def _optional(value):
+    """
+    Приводит пустое значение критерия к None, как это делает меню приложения.
+    """
+    if isinstance(value, str):
+        value = value.strip()
+    return value if value not in ('', None) else None
+
+
+def execute_search(db_manager, search_type, search_params, limit=10):
+    """
+    Выполняет поиск по критериям из журнала запросов.
+
+    Параметры:
+    ----------
+    db_manager : DatabaseManager
+        Менеджер базы данных.
+    search_type : str
+        Тип поиска: 'keyword', 'genre', 'year', 'actor' или 'multiple_criteria'.
+    search_params : dict
+        Параметры поиска в формате QueryLogger: keywords, mode, genre, year, actor,
+        start_year, end_year, а для 'multiple_criteria' дополнительно sort_by и sort_order.
+    limit : int, optional
+        Максимальное количество результатов (по умолчанию 10).
+
+    Возвращает:
+    ----------
+    list of dict
+        Найденные фильмы.
+
+    Исключения:
+    -----------
+    ValueError
+        Если тип поиска или режим поиска не поддерживается.
+    """
+    params = search_params or {}
+    mode = params.get('mode') or 'title'
+    if mode != 'title' and mode not in FULL_TEXT_MODES:
+        raise ValueError(f"Unsupported search mode: {mode}")
+
+    if search_type == 'keyword':
+        keywords = params.get('keywords') or ''
+        if mode != 'title':
+            return db_manager.full_text_search(keywords, mode=mode, limit=limit)
+        return db_manager.search_movies(keywords=keywords.split(), limit=limit)
+
+    if search_type == 'genre':
+        return db_manager.search_movies(genre=params.get('genre'), limit=limit)
+
+    if search_type == 'year':
+        year = params.get('year')
+        return db_manager.search_movies(start_year=year, end_year=year, limit=limit)
+
+    if search_type == 'actor':
+        return db_manager.search_movies(actor_name=params.get('actor'), limit=limit)
+
+    if search_type == 'multiple_criteria':
+        keywords = params.get('keywords') or ''
+        filters = {
+            'genre': _optional(params.get('genre')),
+            'start_year': _optional(params.get('start_year')),
+            'end_year': _optional(params.get('end_year')),
+            'actor_name': _optional(params.get('actor')),
+        }
+        if mode != 'title' and keywords.strip():
+            return db_manager.full_text_search(keywords, mode=mode, limit=limit, **filters)
+        return db_manager.search_movies(keywords=keywords.split() or None,
+                                        sort_by=_optional(params.get('sort_by')),
+                                        sort_order=params.get('sort_order') or 'ASC',
+                                        limit=limit, **filters)
+
+    raise ValueError(f"Unsupported search type: {search_type}")
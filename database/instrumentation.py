@@ -0,0 +1,547 @@
+"""
+database/instrumentation.py
+---------------------------
+
+Этот модуль содержит средства измерения запросов к базе данных: время выполнения и количество строк
+каждого запроса, гистограммы длительности по формам запросов и журнал медленных запросов с планом EXPLAIN.
+
+Пул соединений (см. database/pool.py) оборачивает каждое открытое соединение в InstrumentedConnection,
+поэтому измеряются все запросы DatabaseManager, QueryLogger, AuthManager и LocalizationManager
+без изменений в их коде. Время запроса складывается из execute и чтения строк (fetch*):
+sqlite3 и небуферизованные курсоры MySQL выполняют большую часть работы при чтении.
+
+Форма запроса — текст запроса, в котором литералы и параметры заменены на ?, а списки IN свернуты,
+поэтому одинаковые запросы с разными значениями попадают в одну гистограмму.
+
+Классы:
+-------
+LatencyHistogram
+    __init__(self)
+        Инициализирует пустую гистограмму.
+
+    add(self, duration_ms, rows=0)
+        Добавляет измерение.
+
+    percentile(self, fraction)
+        Возвращает оценку перцентиля длительности.
+
+QueryStats
+    __init__(self, slow_query_ms=100, slow_query_log='slow_queries.log', explain_slow_queries=True,
+             max_shapes=500)
+        Инициализирует статистику запросов.
+
+    record(self, query, duration, rows, params=None, explain=None)
+        Учитывает выполненный запрос.
+
+    snapshot(self, limit=None)
+        Возвращает сводку по формам запросов.
+
+    reset(self)
+        Сбрасывает накопленную статистику.
+
+    flush(self)
+        Дожидается записи журнала медленных запросов.
+
+InstrumentedConnection
+    __init__(self, connection, stats, explain=None)
+        Оборачивает соединение.
+
+    cursor(self, *args, **kwargs)
+        Возвращает измеряемый курсор.
+
+InstrumentedCursor
+    __init__(self, cursor, stats, explain=None)
+        Оборачивает курсор.
+
+Функции:
+--------
+query_shape(query)
+    Возвращает форму запроса.
+
+get_query_stats()
+    Возвращает общую статистику запросов процесса.
+
+flush_query_stats()
+    Дожидается записи журнала медленных запросов, если статистика уже создана.
+"""
+
+import json
+import queue
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+from functools import lru_cache
+
+from config import QUERY_STATS_CONFIG
+
+# Верхние границы корзин гистограммы (в миллисекундах): от 10 мкс с шагом sqrt(2) до ~2 минут.
+# Оценка перцентиля — граница корзины, поэтому ее погрешность не превышает 41%
+BUCKET_BOUNDS_MS = tuple(0.01 * 2 ** (i / 2) for i in range(48))
+
+# Литералы, параметры и списки IN, которые не входят в форму запроса
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])\d+(?:\.\d+)?\b")
+_PARAMETER = re.compile(r"%s|\?")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.I)
+_WHITESPACE = re.compile(r"\s+")
+# Условие-заглушка WHERE 1=1, к которому построители запросов добавляют фильтры через AND
+_TRIVIAL_WHERE = re.compile(r"\bWHERE\s+1\s*=\s*1(?:\s+AND\b|(?=\s+(?:ORDER|GROUP|LIMIT)\b|\s*$))", re.I)
+
+# Запросы, для которых можно получить план EXPLAIN без их выполнения
+_EXPLAINABLE = ('SELECT', 'WITH')
+
+
+@lru_cache(maxsize=1024)
+def query_shape(query):
+    """
+    Возвращает форму запроса: текст без значений, одинаковый для запросов с разными параметрами.
+
+    Параметры:
+    ----------
+    query : str
+        Текст запроса.
+
+    Возвращает:
+    ----------
+    str
+        Текст запроса в одну строку, где литералы и параметры заменены на ?, а списки IN — на IN (...).
+    """
+    shape = _TRIVIAL_WHERE.sub(lambda match: 'WHERE' if match.group(0).upper().endswith('AND') else '', query)
+    shape = _STRING_LITERAL.sub('?', shape)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _PARAMETER.sub('?', shape)
+    shape = _IN_LIST.sub('IN (...)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+class LatencyHistogram:
+    """
+    Гистограмма длительности запросов одной формы с корзинами фиксированных границ.
+
+    Атрибуты:
+    ----------
+    count : int
+        Количество измерений.
+    total_ms : float
+        Суммарная длительность (в миллисекундах).
+    max_ms : float
+        Наибольшая длительность (в миллисекундах).
+    rows : int
+        Суммарное количество прочитанных или измененных строк.
+
+    Методы:
+    -------
+    add(duration_ms, rows=0)
+        Добавляет измерение.
+    percentile(fraction)
+        Возвращает оценку перцентиля длительности.
+    """
+
+    def __init__(self):
+        """
+        Инициализирует пустую гистограмму.
+        """
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+
+    def add(self, duration_ms, rows=0):
+        """
+        Добавляет измерение.
+
+        Параметры:
+        ----------
+        duration_ms : float
+            Длительность запроса (в миллисекундах).
+        rows : int, optional
+            Количество строк запроса.
+        """
+        self.buckets[bisect_left(BUCKET_BOUNDS_MS, duration_ms)] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.rows += rows
+
+    def percentile(self, fraction):
+        """
+        Возвращает оценку перцентиля длительности: верхнюю границу корзины,
+        в которую попадает перцентиль, но не больше наибольшего измерения.
+
+        Параметры:
+        ----------
+        fraction : float
+            Доля измерений (например, 0.95 для p95).
+
+        Возвращает:
+        ----------
+        float
+            Оценка перцентиля (в миллисекундах); 0.0 для пустой гистограммы.
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, round(fraction * self.count))
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                bound = BUCKET_BOUNDS_MS[index] if index < len(BUCKET_BOUNDS_MS) else self.max_ms
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+
+class QueryStats:
+    """
+    Статистика запросов процесса: гистограммы по формам запросов и журнал медленных запросов.
+
+    Запросы дольше slow_query_ms записываются в файл slow_query_log строками JSON. Для первого
+    медленного запроса каждой формы в запись добавляется план EXPLAIN. План и запись файла
+    выполняются в фоновом потоке, поэтому не задерживают сам запрос; значения параметров
+    в журнал не попадают.
+
+    Атрибуты:
+    ----------
+    slow_query_ms : float
+        Порог медленного запроса (в миллисекундах).
+    slow_query_log : str or None
+        Файл журнала медленных запросов (None — не записывать).
+    explain_slow_queries : bool
+        Добавлять ли в журнал план EXPLAIN.
+    max_shapes : int
+        Наибольшее количество форм; запросы новых форм сверх него учитываются в форме '(other)'.
+    slow_queries : int
+        Количество медленных запросов.
+
+    Методы:
+    -------
+    record(query, duration, rows, params=None, explain=None)
+        Учитывает выполненный запрос.
+    snapshot(limit=None)
+        Возвращает сводку по формам запросов.
+    reset()
+        Сбрасывает накопленную статистику.
+    flush()
+        Дожидается записи журнала медленных запросов.
+    """
+
+    OTHER_SHAPE = '(other)'
+
+    def __init__(self, slow_query_ms=100, slow_query_log='slow_queries.log', explain_slow_queries=True,
+                 max_shapes=500):
+        """
+        Инициализирует статистику запросов.
+
+        Параметры:
+        ----------
+        slow_query_ms : float, optional
+            Порог медленного запроса в миллисекундах (по умолчанию 100).
+        slow_query_log : str or None, optional
+            Файл журнала медленных запросов (по умолчанию 'slow_queries.log').
+        explain_slow_queries : bool, optional
+            Добавлять ли в журнал план EXPLAIN (по умолчанию True).
+        max_shapes : int, optional
+            Наибольшее количество форм запросов (по умолчанию 500).
+        """
+        self.slow_query_ms = slow_query_ms
+        self.slow_query_log = slow_query_log
+        self.explain_slow_queries = explain_slow_queries
+        self.max_shapes = max_shapes
+        self.slow_queries = 0
+        self._histograms = {}
+        self._explained = set()
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=1000)
+        self._writer = None
+
+    def record(self, query, duration, rows, params=None, explain=None):
+        """
+        Учитывает выполненный запрос.
+
+        Параметры:
+        ----------
+        query : str
+            Текст запроса.
+        duration : float
+            Длительность запроса (в секундах).
+        rows : int
+            Количество прочитанных или измененных строк.
+        params : sequence, optional
+            Параметры запроса (нужны только для плана EXPLAIN).
+        explain : callable, optional
+            Функция explain(query, params), возвращающая план запроса.
+        """
+        shape = query_shape(query)
+        duration_ms = duration * 1000
+        slow = duration_ms >= self.slow_query_ms
+        with self._lock:
+            histogram = self._histograms.get(shape)
+            if histogram is None:
+                if len(self._histograms) >= self.max_shapes:
+                    shape = self.OTHER_SHAPE
+                histogram = self._histograms.setdefault(shape, LatencyHistogram())
+            histogram.add(duration_ms, rows)
+            if not slow:
+                return
+            self.slow_queries += 1
+            want_plan = (self.explain_slow_queries and explain is not None and shape not in self._explained
+                         and shape.upper().startswith(_EXPLAINABLE))
+            if want_plan:
+                self._explained.add(shape)
+
+        if self.slow_query_log:
+            entry = {'time': datetime.now().isoformat(timespec='seconds'), 'duration_ms': round(duration_ms, 3),
+                     'rows': rows, 'shape': shape}
+            try:
+                self._queue.put_nowait((entry, query, params, explain if want_plan else None))
+            except queue.Full:
+                # Журнал медленных запросов не должен задерживать запросы: при переполнении запись теряется
+                return
+            self._ensure_writer()
+
+    def snapshot(self, limit=None):
+        """
+        Возвращает сводку по формам запросов, упорядоченную по суммарному времени.
+
+        Параметры:
+        ----------
+        limit : int, optional
+            Наибольшее количество форм в сводке (None — все).
+
+        Возвращает:
+        ----------
+        list of dict
+            Ключи: shape, calls, rows, total_ms, p50_ms, p95_ms, p99_ms, max_ms.
+        """
+        with self._lock:
+            summary = [{
+                'shape': shape,
+                'calls': histogram.count,
+                'rows': histogram.rows,
+                'total_ms': round(histogram.total_ms, 3),
+                'p50_ms': round(histogram.percentile(0.50), 3),
+                'p95_ms': round(histogram.percentile(0.95), 3),
+                'p99_ms': round(histogram.percentile(0.99), 3),
+                'max_ms': round(histogram.max_ms, 3),
+            } for shape, histogram in self._histograms.items()]
+        summary.sort(key=lambda item: item['total_ms'], reverse=True)
+        return summary if limit is None else summary[:limit]
+
+    def reset(self):
+        """
+        Сбрасывает накопленную статистику (журнал медленных запросов не очищается).
+        """
+        with self._lock:
+            self._histograms.clear()
+            self._explained.clear()
+            self.slow_queries = 0
+
+    def flush(self):
+        """
+        Дожидается записи журнала медленных запросов.
+        """
+        if self._writer is not None:
+            self._queue.join()
+
+    def _ensure_writer(self):
+        """
+        Запускает фоновый поток записи журнала медленных запросов, если он еще не запущен.
+        """
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._writer_loop, name='slow-query-log', daemon=True)
+                    self._writer.start()
+
+    def _writer_loop(self):
+        """
+        Записывает медленные запросы в журнал и получает для них планы EXPLAIN.
+        """
+        while True:
+            entry, query, params, explain = self._queue.get()
+            try:
+                if explain is not None:
+                    try:
+                        entry['explain'] = explain(query, params)
+                    except Exception as error:
+                        entry['explain_error'] = str(error)
+                with open(self.slow_query_log, 'a', encoding='utf-8') as file:
+                    file.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+            except OSError as error:
+                print(f"Error writing slow query log: {error}", file=sys.stderr)
+            finally:
+                self._queue.task_done()
+
+
+class InstrumentedCursor:
+    """
+    Курсор, который измеряет время выполнения запроса и чтения его строк.
+
+    Запрос учитывается, когда его строки прочитаны полностью, курсор выполняет следующий запрос
+    или закрывается. Остальные атрибуты и методы передаются исходному курсору.
+    """
+
+    def __init__(self, cursor, stats, explain=None):
+        """
+        Оборачивает курсор.
+
+        Параметры:
+        ----------
+        cursor : object
+            Курсор драйвера (или SQLiteCursor).
+        stats : QueryStats
+            Статистика, в которую записываются измерения.
+        explain : callable, optional
+            Функция explain(query, params) для плана медленных запросов.
+        """
+        self._cursor = cursor
+        self._stats = stats
+        self._explain = explain
+        self._query = None
+        self._params = None
+        self._elapsed = 0.0
+        self._rows = 0
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def _finish(self, rows=None):
+        """
+        Записывает измерение текущего запроса.
+        """
+        if self._query is not None:
+            self._stats.record(self._query, self._elapsed, self._rows if rows is None else rows,
+                               self._params, self._explain)
+            self._query = None
+
+    def _timed(self, method, *args):
+        started = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            self._elapsed += time.perf_counter() - started
+
+    def execute(self, query, params=None):
+        self._finish()
+        self._elapsed = 0.0
+        self._rows = 0
+        result = self._timed(self._cursor.execute, query, params)
+        self._query, self._params = query, params
+        if self._cursor.description is None:
+            # Запрос без строк результата (INSERT, UPDATE, DDL) учитывается сразу
+            self._finish(max(self._cursor.rowcount, 0))
+        return result
+
+    def executemany(self, query, seq_of_params):
+        self._finish()
+        self._elapsed = 0.0
+        result = self._timed(self._cursor.executemany, query, seq_of_params)
+        self._query, self._params = query, None
+        self._finish(max(self._cursor.rowcount, 0))
+        return result
+
+    def fetchone(self):
+        row = self._timed(self._cursor.fetchone)
+        if row is None:
+            self._finish()
+        else:
+            self._rows += 1
+        return row
+
+    def fetchmany(self, size=1):
+        rows = self._timed(self._cursor.fetchmany, size)
+        self._rows += len(rows)
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(self._cursor.fetchall)
+        self._rows += len(rows)
+        self._finish()
+        return rows
+
+    def close(self):
+        self._finish()
+        self._cursor.close()
+
+
+class InstrumentedConnection:
+    """
+    Соединение, курсоры которого измеряют запросы. Остальные атрибуты и методы
+    передаются исходному соединению.
+
+    Атрибуты:
+    ----------
+    raw : object
+        Исходное соединение (его курсоры не измеряются; через него выполняется EXPLAIN).
+    """
+
+    def __init__(self, connection, stats, explain=None):
+        """
+        Оборачивает соединение.
+
+        Параметры:
+        ----------
+        connection : object
+            Соединение, открытое хранилищем.
+        stats : QueryStats
+            Статистика, в которую записываются измерения.
+        explain : callable, optional
+            Функция explain(query, params) для плана медленных запросов.
+        """
+        self.raw = connection
+        self._stats = stats
+        self._explain = explain
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+    @property
+    def autocommit(self):
+        return self.raw.autocommit
+
+    @autocommit.setter
+    def autocommit(self, value):
+        self.raw.autocommit = value
+
+    def cursor(self, *args, **kwargs):
+        """
+        Возвращает измеряемый курсор (аргументы передаются методу cursor исходного соединения).
+        """
+        return InstrumentedCursor(self.raw.cursor(*args, **kwargs), self._stats, self._explain)
+
+
+_query_stats = None
+_query_stats_lock = threading.Lock()
+
+
+def get_query_stats():
+    """
+    Возвращает общую статистику запросов процесса (создается при первом вызове по QUERY_STATS_CONFIG).
+
+    Возвращает:
+    ----------
+    QueryStats
+        Статистика запросов.
+    """
+    global _query_stats
+    with _query_stats_lock:
+        if _query_stats is None:
+            _query_stats = QueryStats(
+                slow_query_ms=QUERY_STATS_CONFIG['slow_query_ms'],
+                slow_query_log=QUERY_STATS_CONFIG['slow_query_log'],
+                explain_slow_queries=QUERY_STATS_CONFIG['explain_slow_queries'],
+                max_shapes=QUERY_STATS_CONFIG['max_shapes'])
+        return _query_stats
+
+
+def flush_query_stats():
+    """
+    Дожидается записи журнала медленных запросов, если статистика уже создана.
+    """
+    if _query_stats is not None:
+        _query_stats.flush()
@@ -2,20 +2,21 @@
 database/manager.py
 --------------------
 
-Этот модуль содержит класс DatabaseManager, который используется для управления подключением к базе данных MySQL
-и выполнения различных SQL-запросов для поиска фильмов.
+Этот модуль содержит класс DatabaseManager, который используется для управления подключением к базе данных
+(MySQL или встроенной SQLite, см. database/backends.py) и выполнения различных SQL-запросов для поиска фильмов.
+Соединения берутся из общего пула (см. database/pool.py) на время каждого вызова.
 
 Класс:
 ------
 DatabaseManager
-    __init__(self, host, user, password, database)
+    __init__(self, host=None, user=None, password=None, database=None, backend='mysql')
         Инициализирует объект DatabaseManager.
 
     connect(self)
-        Устанавливает соединение с базой данных.
+        Подключается к общему пулу соединений.
 
     disconnect(self)
-        Закрывает соединение с базой данных.
+        Отключается от общего пула соединений.
 
     get_random_movies(self, limit=10)
         Возвращает случайные фильмы из базы данных.
@@ -26,20 +27,112 @@ DatabaseManager
     fetch_column(self, table_name, column_name)
         Возвращает все значения указанного столбца из указанной таблицы.
 
+    get_categories(self)
+        Возвращает словарь идентификаторов и названий категорий фильмов.
+
+    get_language_catalog(self)
+        Возвращает список доступных языков интерфейса.
+
     execute_update(self, query, params=None)
         Выполняет SQL-запрос на обновление данных.
 
     search_movies(self, keywords=None, genre=None, start_year=None,
                   end_year=None, actor_name=None, sort_by=None, sort_order="ASC")
         Ищет фильмы в базе данных по заданным критериям.
+
+    search_movies_page(self, ..., page_size=10, cursor=None, direction="next")
+        Возвращает страницу результатов поиска с постраничной навигацией по ключу.
+
+    iter_search_movies(self, ..., chunk_size=500)
+        Возвращает генератор всех результатов поиска, читающий их порциями.
+
+    full_text_search(self, query, mode="natural", limit=10, offset=0, genre=None,
+                     start_year=None, end_year=None, actor_name=None)
+        Ищет фильмы по полнотекстовому индексу film_text с ранжированием по релевантности.
+
+    full_text_search_page(self, query, mode="natural", page_size=10, cursor=None, ...)
+        Возвращает страницу результатов полнотекстового поиска.
+
+    refresh_film_details(self, film_id=None)
+        Пересчитывает материализованную таблицу film_details.
+
+    get_title_index(self)
+        Возвращает триграммный индекс названий фильмов.
+
+    invalidate_title_index(self)
+        Сбрасывает триграммный индекс названий фильмов.
+
+    get_actor_index(self)
+        Возвращает индекс имен актеров.
+
+    get_columnar_catalog(self)
+        Возвращает столбцовый каталог фильмов, если выбран движок поиска 'columnar'.
+
+    get_bitmap_index(self)
+        Возвращает индекс битовых карт по жанру, году выпуска и актеру.
+
+    find_films_by_actor(self, actor_name)
+        Возвращает идентификаторы фильмов с участием подходящих актеров.
+
+    invalidate_caches(self)
+        Сбрасывает все кэши, построенные по данным о фильмах.
+
+Поиск и выборка случайных фильмов читают материализованную таблицу film_details
+(см. database_scripts/Film_Details_Table.sql), которую триггеры обновляют построчно
+при изменении таблиц film, film_actor, film_category, actor и category.
+Поиск по ключевым словам выполняется по триграммному индексу (см. database/trigram.py),
+а из базы данных загружаются только найденные фильмы.
+Поиск по актеру сначала находит актеров по индексу имен (см. database/actors.py),
+затем их фильмы через первичный ключ film_actor, и только после этого загружает данные фильмов.
+Поиск по актеру или по ключевым словам вместе с другими критериями пересекает битовые карты жанра,
+годов и актеров в памяти (см. database/bitmaps.py) и загружает из film_details только итоговые фильмы
+по первичному ключу.
+Полнотекстовый поиск использует индекс FULLTEXT idx_title_description таблицы film_text
+(в SQLite — виртуальную таблицу FTS5 film_text_fts).
+Результаты поиска кэшируются (см. database/cache.py) по канонической форме критериев.
+Если в SEARCH_ENGINE_CONFIG выбран движок 'columnar', поиск search_movies выполняется по столбцовому
+каталогу в памяти (см. database/columnar.py), а запросы к базе данных нужны только для его загрузки.
+Фильтры поиска записываются условиями на индексированные столбцы film_details (см. database/query_builder.py).
+Текст запроса поиска собирается один раз для каждой формы запроса (набора заданных фильтров и сортировки)
+и выполняется подготовленным выражением соединения пула (см. database/statements.py).
+Справочные таблицы category и language_pack загружаются одним запросом и хранятся в памяти
+(см. database/reference.py).
 """
 
-import mysql.connector
+import importlib.util
+import os
+import threading
+import time
+
+from config import (BITMAP_INDEX_CONFIG, PREPARED_STATEMENT_CONFIG, RANDOM_SAMPLER_CONFIG, REFERENCE_DATA_CONFIG,
+                    SEARCH_CACHE_CONFIG, SEARCH_ENGINE_CONFIG, TRIGRAM_INDEX_CONFIG)
+from .actors import ActorIndex
+from .bitmaps import BitmapIndex
+from .cache import SearchCache, normalize_search_criteria
+from .pagination import SORT_EXPRESSIONS, SearchPage, row_cursor, sort_expression, strip_sort_key, validate_sort
+from .backends import get_backend, normalize_db_config
+from .pool import get_connection_pool
+from .query_builder import SearchQueryBuilder
+from .reference import ReferenceDataCache
+from .sampler import RandomFilmSampler
+from .statements import QueryShapes, SearchShape, id_list_bucket, pad_ids
+from .trigram import TrigramIndex
+
+# Режимы полнотекстового поиска (запрос для каждого режима строит хранилище, см. database/backends.py)
+FULL_TEXT_MODES = ('natural', 'boolean')
+
+# Движки поиска search_movies (см. SEARCH_ENGINE_CONFIG)
+SEARCH_ENGINES = ('sql', 'columnar')
+
+# Жанры фильмов для индексов в памяти: у фильма может быть несколько жанров,
+# а film_details.genre — только их список для вывода
+FILM_GENRES_QUERY = ("SELECT fc.film_id, c.name AS genre FROM film_category fc "
+                     "JOIN category c ON c.category_id = fc.category_id")
 
 
 class DatabaseManager:
     """
-    Класс для управления базой данных MySQL.
+    Класс для управления базой данных.
 
     Атрибуты:
     ----------
@@ -50,78 +143,160 @@ class DatabaseManager:
     password : str
         Пароль для подключения к базе данных.
     database : str
-        Название базы данных.
-    connection : mysql.connector.connection.MySQLConnection
-        Объект подключения к базе данных.
-    cursor : mysql.connector.cursor.MySQLCursor
-        Объект курсора для выполнения SQL-запросов.
+        Название базы данных (для SQLite — путь к файлу базы данных).
+    db_config : dict
+        Параметры подключения к общему пулу.
+    backend : StorageBackend
+        Хранилище данных (MySQL или SQLite).
+    pool : ConnectionPool
+        Общий пул соединений с базой данных.
+    random_sampler : RandomFilmSampler
+        Объект для выборки случайных фильмов.
+    title_index : TrigramIndex
+        Триграммный индекс названий фильмов (строится при первом поиске по ключевым словам).
+    actor_index : ActorIndex
+        Индекс имен актеров (строится при первом поиске по актеру).
+    search_engine : str
+        Движок поиска search_movies: 'sql' или 'columnar'.
+    columnar_catalog : ColumnarCatalog
+        Столбцовый каталог фильмов (загружается при первом поиске, если выбран движок 'columnar').
+    bitmap_index : BitmapIndex
+        Индекс битовых карт по жанру, году выпуска и актеру (строится при первом поиске по актеру
+        или по нескольким критериям).
+    bitmap_index_enabled : bool
+        Используется ли индекс битовых карт (по умолчанию BITMAP_INDEX_CONFIG['enabled']).
+    search_cache : SearchCache
+        Кэш результатов поиска.
+    query_builder : SearchQueryBuilder
+        Построитель запросов поиска к film_details.
+    reference_data : ReferenceDataCache
+        Кэш справочных таблиц (категории, каталог языков).
 
     Методы:
     -------
     connect()
-        Устанавливает соединение с базой данных.
+        Подключается к общему пулу соединений.
     disconnect()
-        Закрывает соединение с базой данных.
+        Отключается от общего пула соединений.
     get_random_movies(limit=10)
         Возвращает случайные фильмы из базы данных.
     execute_query(query, params=None)
         Выполняет SQL-запрос и возвращает результаты.
     fetch_column(table_name, column_name)
         Возвращает все значения указанного столбца из указанной таблицы.
+    get_categories()
+        Возвращает словарь идентификаторов и названий категорий фильмов.
+    get_language_catalog()
+        Возвращает список доступных языков интерфейса.
     execute_update(query, params=None)
         Выполняет SQL-запрос на обновление данных.
     search_movies(keywords=None, genre=None, start_year=None, end_year=None,
                   actor_name=None, sort_by=None, sort_order="ASC")
         Ищет фильмы в базе данных по заданным критериям.
+    search_movies_page(..., page_size=10, cursor=None, direction="next")
+        Возвращает страницу результатов поиска с постраничной навигацией по ключу.
+    iter_search_movies(..., chunk_size=500)
+        Возвращает генератор всех результатов поиска, читающий их порциями.
+    full_text_search(query, mode="natural", limit=10, offset=0, genre=None,
+                     start_year=None, end_year=None, actor_name=None)
+        Ищет фильмы по полнотекстовому индексу film_text с ранжированием по релевантности.
+    full_text_search_page(query, mode="natural", page_size=10, cursor=None, ...)
+        Возвращает страницу результатов полнотекстового поиска.
+    refresh_film_details(film_id=None)
+        Пересчитывает материализованную таблицу film_details.
+    get_title_index()
+        Возвращает триграммный индекс названий фильмов.
+    invalidate_title_index()
+        Сбрасывает триграммный индекс названий фильмов.
+    get_actor_index()
+        Возвращает индекс имен актеров.
+    get_columnar_catalog()
+        Возвращает столбцовый каталог фильмов, если выбран движок поиска 'columnar'.
+    get_bitmap_index()
+        Возвращает индекс битовых карт по жанру, году выпуска и актеру.
+    find_films_by_actor(actor_name)
+        Возвращает идентификаторы фильмов с участием подходящих актеров.
+    invalidate_caches()
+        Сбрасывает все кэши, построенные по данным о фильмах.
     """
 
-    def __init__(self, host, user, password, database):
+    def __init__(self, host=None, user=None, password=None, database=None, backend='mysql'):
         """
         Инициализирует объект DatabaseManager.
 
         Параметры:
         ----------
-        host : str
-            Адрес хоста базы данных.
-        user : str
-            Имя пользователя для подключения к базе данных.
-        password : str
-            Пароль для подключения к базе данных.
+        host : str, optional
+            Адрес хоста базы данных (для SQLite не используется).
+        user : str, optional
+            Имя пользователя для подключения к базе данных (для SQLite не используется).
+        password : str, optional
+            Пароль для подключения к базе данных (для SQLite не используется).
         database : str
-            Название базы данных.
+            Название базы данных (для SQLite — путь к файлу базы данных).
+        backend : str, optional
+            Хранилище данных: 'mysql' (по умолчанию) или 'sqlite'.
+
+        Исключения:
+        -----------
+        ValueError
+            Если в SEARCH_ENGINE_CONFIG указан неизвестный движок поиска.
+        ImportError
+            Если выбран движок 'columnar', а пакет numpy не установлен.
         """
-        self.cursor = None
         self.host = host
         self.user = user
         self.password = password
         self.database = database
-        self.connection = None
+        self.db_config = normalize_db_config({
+            'backend': backend,
+            'host': host,
+            'user': user,
+            'password': password,
+            'database': database
+        })
+        self.backend = get_backend(self.db_config)
+        self.pool = None
+        self.random_sampler = RandomFilmSampler(self, **RANDOM_SAMPLER_CONFIG)
+        self.title_index = None
+        self._title_index_lock = threading.Lock()
+        self.actor_index = None
+        self.search_engine = SEARCH_ENGINE_CONFIG['engine']
+        if self.search_engine not in SEARCH_ENGINES:
+            raise ValueError(f"Unsupported search engine: {self.search_engine}")
+        # numpy импортируется только при загрузке каталога, но его отсутствие лучше обнаружить при запуске
+        if self.search_engine == 'columnar' and importlib.util.find_spec('numpy') is None:
+            raise ImportError("The columnar search engine requires NumPy (pip install numpy)")
+        self.columnar_catalog = None
+        self._columnar_lock = threading.Lock()
+        self.bitmap_index = None
+        self.bitmap_index_enabled = BITMAP_INDEX_CONFIG['enabled']
+        self._bitmap_lock = threading.Lock()
+        self.search_cache = SearchCache(**SEARCH_CACHE_CONFIG)
+        self.query_builder = SearchQueryBuilder()
+        self.search_queries = QueryShapes(self.query_builder.build)
+        self.reference_data = ReferenceDataCache(self, **REFERENCE_DATA_CONFIG)
 
     def connect(self):
         """
-        Устанавливает соединение с базой данных.
+        Подключается к общему пулу соединений.
         """
-        self.connection = mysql.connector.connect(
-            host=self.host,
-            user=self.user,
-            password=self.password,
-            database=self.database
-        )
-        self.cursor = self.connection.cursor(dictionary=True)
+        self.pool = get_connection_pool(self.db_config)
 
     def disconnect(self):
         """
-        Закрывает соединение с базой данных.
+        Отключается от общего пула соединений.
+        Сами соединения остаются в пуле и закрываются функцией close_connection_pools().
         """
-        if self.cursor:
-            self.cursor.close()
-        if self.connection:
-            self.connection.close()
+        self.pool = None
 
     def get_random_movies(self, limit=10):
         """
         Возвращает случайные фильмы из базы данных.
 
+        Фильмы выбираются через RandomFilmSampler по кэшированному массиву идентификаторов,
+        без сортировки всего каталога.
+
         Параметры:
         ----------
         limit : int, optional
@@ -132,25 +307,7 @@ class DatabaseManager:
         list of dict
             Список случайных фильмов.
         """
-        query = """WITH film_details AS (
-    SELECT 
-        f.title AS title,
-        f.description AS description,
-        c.name AS genre,
-        f.release_year AS release_year,
-        GROUP_CONCAT(DISTINCT CONCAT(a.first_name, ' ', a.last_name) SEPARATOR ', ') AS actors
-    FROM film f
-    LEFT JOIN film_category fc ON f.film_id = fc.film_id
-    LEFT JOIN category c ON fc.category_id = c.category_id
-    LEFT JOIN film_actor fa ON f.film_id = fa.film_id
-    LEFT JOIN actor a ON fa.actor_id = a.actor_id
-    GROUP BY f.film_id, f.title, f.description, c.name, f.release_year
-)
-SELECT *
-FROM film_details
-ORDER BY RAND() LIMIT %s"""
-        params = (limit,)
-        return self.execute_query(query, params)
+        return self.random_sampler.get_random_movies(limit)
 
     def execute_query(self, query, params=None):
         """
@@ -168,13 +325,19 @@ ORDER BY RAND() LIMIT %s"""
         list of dict
             Результаты выполнения SQL-запроса.
         """
-        self.cursor.execute(query, params)
-        return self.cursor.fetchall()
+        if not self.pool:
+            self.connect()
+
+        with self.pool.cursor(dictionary=True) as cursor:
+            cursor.execute(query, params)
+            return cursor.fetchall()
 
     def fetch_column(self, table_name, column_name):
         """
         Возвращает все значения указанного столбца из указанной таблицы.
 
+        Столбцы справочных таблиц (см. database/reference.py) возвращаются из кэша без запроса к базе данных.
+
         Параметры:
         ----------
         table_name : str
@@ -187,15 +350,43 @@ ORDER BY RAND() LIMIT %s"""
         list
             Список значений указанного столбца.
         """
+        if self.reference_data.covers(table_name, column_name):
+            return self.reference_data.column(table_name, column_name)
+
+        if not self.pool:
+            self.connect()
+
         column = []
-        cursor = self.connection.cursor()
         query = f"SELECT {column_name} FROM {table_name}"
-        cursor.execute(query)
-        rows = cursor.fetchall()
+        with self.pool.cursor() as cursor:
+            cursor.execute(query)
+            rows = cursor.fetchall()
         for row in rows:
             column.append(row[0])
         return column
 
+    def get_categories(self):
+        """
+        Возвращает словарь идентификаторов и названий категорий фильмов из кэша справочных таблиц.
+
+        Возвращает:
+        ----------
+        dict
+            Словарь {category_id: name}, упорядоченный по идентификатору.
+        """
+        return self.reference_data.id_map('category')
+
+    def get_language_catalog(self):
+        """
+        Возвращает список доступных языков интерфейса из кэша справочных таблиц.
+
+        Возвращает:
+        ----------
+        list of dict
+            Строки с ключами language_id, language_code и language_name.
+        """
+        return self.reference_data.rows('language_pack')
+
     def execute_update(self, query, params=None):
         """
         Выполняет SQL-запрос на обновление данных.
@@ -207,11 +398,14 @@ ORDER BY RAND() LIMIT %s"""
         params : tuple, optional
             Параметры для SQL-запроса.
         """
-        self.cursor.execute(query, params)
-        self.connection.commit()
+        if not self.pool:
+            self.connect()
+
+        with self.pool.cursor(commit=True) as cursor:
+            cursor.execute(query, params)
 
     def search_movies(self, keywords=None, genre=None, start_year=None, end_year=None,
-                      actor_name=None, sort_by=None, sort_order="ASC"):
+                      actor_name=None, sort_by=None, sort_order="ASC", match_all_keywords=False, limit=10):
         """
         Ищет фильмы в базе данных по заданным критериям.
 
@@ -228,60 +422,611 @@ ORDER BY RAND() LIMIT %s"""
         actor_name : str, optional
             Имя актера для поиска.
         sort_by : str, optional
-            Поле для сортировки результатов.
+            Поле для сортировки результатов ('title', 'genre', 'release_year' или 'actors').
         sort_order : str, optional
             Порядок сортировки ("ASC" или "DESC").
+        match_all_keywords : bool, optional
+            True — название должно содержать все ключевые слова,
+            False — хотя бы одно (по умолчанию).
+        limit : int, optional
+            Максимальное количество результатов (по умолчанию 10).
 
         Возвращает:
         ----------
         list of dict
+            Результаты поиска фильмов (первая страница search_movies_page).
+        """
+        return self.search_movies_page(keywords=keywords, genre=genre, start_year=start_year, end_year=end_year,
+                                       actor_name=actor_name, sort_by=sort_by, sort_order=sort_order,
+                                       match_all_keywords=match_all_keywords, page_size=limit).rows
+
+    def search_movies_page(self, keywords=None, genre=None, start_year=None, end_year=None, actor_name=None,
+                           sort_by=None, sort_order="ASC", match_all_keywords=False, page_size=10,
+                           cursor=None, direction="next"):
+        """
+        Возвращает страницу результатов поиска с постраничной навигацией по ключу.
+
+        Результаты упорядочены по столбцу сортировки и film_id, поэтому ключ
+        (значение сортировки, film_id) однозначно задает место страницы в выдаче.
+
+        Параметры:
+        ----------
+        keywords, genre, start_year, end_year, actor_name, match_all_keywords
+            Критерии поиска, как в search_movies.
+        sort_by : str, optional
+            Поле для сортировки результатов ('title', 'genre', 'release_year' или 'actors').
+        sort_order : str, optional
+            Порядок сортировки ("ASC" или "DESC").
+        page_size : int, optional
+            Количество строк на странице (по умолчанию 10).
+        cursor : tuple, optional
+            Ключ из next_cursor или prev_cursor предыдущей страницы (None — первая страница).
+        direction : str, optional
+            "next" — страница после ключа, "prev" — страница перед ключом.
+
+        Возвращает:
+        ----------
+        SearchPage
+            Страница результатов с ключами соседних страниц.
+
+        Исключения:
+        -----------
+        ValueError
+            Если столбец или порядок сортировки не разрешен.
+        """
+        sort_by, sort_order = validate_sort(sort_by, sort_order)
+        key = normalize_search_criteria(
+            method='search_movies_page', keywords=keywords, genre=genre, start_year=start_year,
+            end_year=end_year, actor_name=actor_name, sort_by=sort_by, sort_order=sort_order,
+            match_all_keywords=match_all_keywords, page_size=page_size, cursor=cursor, direction=direction)
+        page = self.search_cache.get(key)
+        if page is None:
+            page = self._fetch_search_page(keywords, genre, start_year, end_year, actor_name, sort_by,
+                                           sort_order, match_all_keywords, page_size, cursor, direction)
+            self.search_cache.put(key, page)
+        return page
+
+    def _fetch_search_page(self, keywords, genre, start_year, end_year, actor_name, sort_by, sort_order,
+                           match_all_keywords, page_size, cursor, direction):
+        """
+        Выполняет запрос страницы результатов поиска в обход кэша (см. search_movies_page).
+        """
+        # Одна лишняя строка показывает, есть ли страница дальше в направлении чтения
+        rows = self._columnar_search(keywords, genre, start_year, end_year, actor_name, match_all_keywords,
+                                     sort_by, sort_order, cursor, direction, limit=page_size + 1)
+        if rows is None:
+            search_query = self._search_query(keywords, genre, start_year, end_year, actor_name,
+                                              match_all_keywords, sort_by, sort_order, cursor, direction,
+                                              limit=page_size + 1)
+            if search_query is None:
+                return SearchPage([])
+            shape, query, params = search_query
+
+            if not self.pool:
+                self.connect()
+            rows = self.pool.execute_prepared(shape, query, params)
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        if cursor is not None and direction == "prev":
+            rows.reverse()
+            prev_cursor = row_cursor(rows[0]) if has_more else None
+            next_cursor = row_cursor(rows[-1]) if rows else cursor
+        else:
+            next_cursor = row_cursor(rows[-1]) if has_more else None
+            prev_cursor = row_cursor(rows[0]) if cursor is not None and rows else None
+        return SearchPage(strip_sort_key(rows), next_cursor, prev_cursor)
+
+    def iter_search_movies(self, keywords=None, genre=None, start_year=None, end_year=None, actor_name=None,
+                           sort_by=None, sort_order="ASC", match_all_keywords=False, chunk_size=500):
+        """
+        Возвращает генератор всех результатов поиска, читающий их порциями из небуферизованного курсора.
+
+        Соединение занято, пока генератор не исчерпан или не закрыт. Если чтение прервано
+        раньше, соединение закрывается, а не возвращается в пул с непрочитанным результатом.
+
+        Параметры:
+        ----------
+        keywords, genre, start_year, end_year, actor_name, sort_by, sort_order, match_all_keywords
+            Критерии поиска и сортировка, как в search_movies.
+        chunk_size : int, optional
+            Количество строк, читаемых из курсора за один раз (по умолчанию 500).
+
+        Возвращает:
+        ----------
+        generator of dict
             Результаты поиска фильмов.
+
+        Исключения:
+        -----------
+        ValueError
+            Если столбец или порядок сортировки не разрешен (при первом чтении из генератора).
+        """
+        sort_by, sort_order = validate_sort(sort_by, sort_order)
+        rows = self._columnar_search(keywords, genre, start_year, end_year, actor_name, match_all_keywords,
+                                     sort_by, sort_order)
+        if rows is not None:
+            yield from strip_sort_key(rows)
+            return
+
+        search_query = self._search_query(keywords, genre, start_year, end_year, actor_name,
+                                          match_all_keywords, sort_by, sort_order)
+        if search_query is None:
+            return
+        # Результаты читаются порциями из небуферизованного курсора, поэтому подготовленное выражение
+        # здесь не используется; текст запроса все равно берется из реестра форм
+        _, query, params = search_query
+
+        if not self.pool:
+            self.connect()
+
+        connection = self.pool.acquire()
+        exhausted = False
+        try:
+            cursor = connection.cursor(dictionary=True, buffered=False)
+            try:
+                cursor.execute(query, params)
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield from strip_sort_key(rows)
+                exhausted = True
+            finally:
+                if exhausted:
+                    cursor.close()
+        finally:
+            self.pool.release(connection, discard=not exhausted)
+
+    def _search_query(self, keywords=None, genre=None, start_year=None, end_year=None, actor_name=None,
+                      match_all_keywords=False, sort_by=None, sort_order="ASC", cursor=None, direction="next",
+                      limit=None):
+        """
+        Выбирает форму запроса поиска к film_details и собирает параметры к ней.
+
+        Параметры:
+        ----------
+        keywords, genre, start_year, end_year, actor_name, match_all_keywords
+            Критерии поиска, как в search_movies.
+        sort_by, sort_order : str
+            Сортировка, проверенная validate_sort.
+        cursor : tuple, optional
+            Ключ страницы (None — с начала выдачи).
+        direction : str, optional
+            "next" или "prev" — направление чтения от ключа.
+        limit : int, optional
+            Максимальное количество строк (None — все строки).
+
+        Возвращает:
+        ----------
+        tuple of (SearchShape or None, str, list) or None
+            Форма, текст запроса и параметры, либо None, если по ключевым словам или актеру
+            ничего не найдено и запрос выполнять не нужно. Форма равна None, если запрос
+            выполняется без подготовленного выражения (отключены или слишком длинный список IN).
+        """
+        film_ids = self._bitmap_film_ids(keywords, match_all_keywords, genre, start_year, end_year, actor_name)
+        if film_ids is not None:
+            # Жанр и годы уже учтены пересечением битовых карт, фильмы загружаются по первичному ключу
+            genre = start_year = end_year = None
+        else:
+            film_ids = self._candidate_film_ids(keywords, match_all_keywords, actor_name)
+        if film_ids is not None and not film_ids:
+            return None
+
+        prepared = PREPARED_STATEMENT_CONFIG['enabled']
+        ids = None
+        if film_ids is not None:
+            ids = id_list_bucket(len(film_ids), PREPARED_STATEMENT_CONFIG['max_in_list'])
+            if ids is None:
+                ids, prepared = len(film_ids), False
+            film_ids = pad_ids(film_ids, ids)
+
+        shape = SearchShape(ids, bool(genre), bool(start_year), bool(end_year), sort_by, sort_order,
+                            None if cursor is None else direction, limit is not None)
+        # Формы со списком IN необычной длины в реестр не попадают, чтобы он оставался ограниченным
+        query = self.search_queries.query(shape) if prepared else self.query_builder.build(shape)
+        params = self.query_builder.params(genre, start_year, end_year, film_ids, sort_by, sort_order,
+                                           cursor, direction, limit)
+        return (shape if prepared else None), query, params
+
+    def _columnar_search(self, keywords=None, genre=None, start_year=None, end_year=None, actor_name=None,
+                         match_all_keywords=False, sort_by=None, sort_order="ASC", cursor=None, direction="next",
+                         limit=None):
+        """
+        Выполняет поиск по столбцовому каталогу, если выбран движок 'columnar'.
+
+        Ключевые слова и актер находятся по тем же индексам в памяти, что и в запросе к базе данных,
+        остальные критерии и сортировка применяются к столбцам каталога.
+
+        Параметры:
+        ----------
+        keywords, genre, start_year, end_year, actor_name, match_all_keywords
+            Критерии поиска, как в search_movies.
+        sort_by, sort_order : str
+            Сортировка, проверенная validate_sort.
+        cursor : tuple, optional
+            Ключ страницы (None — с начала выдачи).
+        direction : str, optional
+            "next" или "prev" — направление чтения от ключа.
+        limit : int, optional
+            Максимальное количество строк (None — все строки).
+
+        Возвращает:
+        ----------
+        list of dict or None
+            Строки в том же порядке, в каком их вернул бы запрос _search_query,
+            или None, если поиск нужно выполнить запросом к базе данных.
+        """
+        catalog = self.get_columnar_catalog()
+        if catalog is None:
+            return None
+
+        film_ids = None
+        if keywords:
+            film_ids = self.get_title_index().search_keywords(keywords, match_all=match_all_keywords)
+        actor_ids = self.get_actor_index().resolve(actor_name) if actor_name else None
+        return catalog.search(genre, start_year, end_year, film_ids, actor_ids, sort_by, sort_order,
+                              cursor, direction, limit)
+
+    def _bitmap_film_ids(self, keywords=None, match_all_keywords=False, genre=None, start_year=None, end_year=None,
+                         actor_name=None):
+        """
+        Находит идентификаторы фильмов пересечением битовых карт по всем критериям поиска.
+
+        Используется, если задан актер или ключевые слова вместе с другими критериями.
+        Жанр и годы без них быстрее выполняются составными индексами film_details,
+        а одни ключевые слова не с чем пересекать.
+
+        Параметры:
+        ----------
+        keywords, match_all_keywords, genre, start_year, end_year, actor_name
+            Критерии поиска, как в search_movies.
+
+        Возвращает:
+        ----------
+        list of int or None
+            Отсортированный список идентификаторов или None, если поиск нужно выполнить
+            условиями запроса (индекс отключен или критерий не выражается битовой картой).
+        """
+        if not self.bitmap_index_enabled:
+            return None
+        if not (actor_name or (keywords and (genre or start_year or end_year))):
+            return None
+
+        film_ids = None
+        if keywords:
+            film_ids = self.get_title_index().search_keywords(keywords, match_all=match_all_keywords)
+        actor_ids = self.get_actor_index().resolve(actor_name) if actor_name else None
+        bitmap = self.get_bitmap_index().filter(genre, start_year, end_year, film_ids, actor_ids)
+        return None if bitmap is None else list(bitmap)
+
+    def _candidate_film_ids(self, keywords=None, match_all_keywords=False, actor_name=None):
+        """
+        Находит идентификаторы фильмов по ключевым словам и актеру без обращения к film_details.
+
+        Параметры:
+        ----------
+        keywords : list of str, optional
+            Ключевые слова для поиска по названию фильма.
+        match_all_keywords : bool, optional
+            Требовать ли совпадения всех ключевых слов.
+        actor_name : str, optional
+            Имя актера для поиска.
+
+        Возвращает:
+        ----------
+        list of int or None
+            Отсортированный список идентификаторов или None, если эти критерии не заданы.
         """
-        base_query = """WITH film_details AS (
-    SELECT 
-        f.title AS title,
-        f.description AS description,
-        c.name AS genre,
-        f.release_year AS release_year,
-        GROUP_CONCAT(DISTINCT CONCAT(a.first_name, ' ', a.last_name) SEPARATOR ', ') AS actors
-    FROM film f
-    LEFT JOIN film_category fc ON f.film_id = fc.film_id
-    LEFT JOIN category c ON fc.category_id = c.category_id
-    LEFT JOIN film_actor fa ON f.film_id = fa.film_id
-    LEFT JOIN actor a ON fa.actor_id = a.actor_id
-    GROUP BY f.film_id, f.title, f.description, c.name, f.release_year
-)
-SELECT *
-FROM film_details
-WHERE 1=1"""
-        params = []
+        film_ids = None
 
         if keywords:
-            keyword_conditions = " OR ".join(["title LIKE %s"] * len(keywords))
-            base_query += f" AND ({keyword_conditions})"
-            for keyword in keywords:
-                params.append(f"%{keyword}%")
+            film_ids = set(self.get_title_index().search_keywords(keywords, match_all=match_all_keywords))
 
-        if genre:
-            base_query += " AND genre = %s"
-            params.append(genre)
+        if actor_name and film_ids != set():
+            actor_film_ids = self.find_films_by_actor(actor_name)
+            film_ids = actor_film_ids if film_ids is None else film_ids & actor_film_ids
 
-        if start_year:
-            base_query += " AND release_year >= %s"
-            params.append(start_year)
+        return None if film_ids is None else sorted(film_ids)
 
-        if end_year:
-            base_query += " AND release_year <= %s"
-            params.append(end_year)
+    def full_text_search(self, query, mode="natural", limit=10, offset=0, genre=None,
+                         start_year=None, end_year=None, actor_name=None):
+        """
+        Ищет фильмы по полнотекстовому индексу film_text с ранжированием по релевантности.
 
-        if actor_name:
-            base_query += " AND actors LIKE %s"
-            params.append(f"%{actor_name}%")
+        Параметры:
+        ----------
+        query : str
+            Поисковая строка (в режиме "boolean" допускаются операторы +, -, * и кавычки).
+        mode : str, optional
+            Режим поиска: "natural" (по умолчанию) или "boolean".
+        limit : int, optional
+            Максимальное количество результатов (по умолчанию 10).
+        offset : int, optional
+            Количество пропускаемых результатов (по умолчанию 0).
+        genre : str, optional
+            Жанр фильма.
+        start_year : int, optional
+            Начальный год выпуска фильма.
+        end_year : int, optional
+            Конечный год выпуска фильма.
+        actor_name : str, optional
+            Имя актера для поиска.
 
-        if sort_by:
-            base_query += f" ORDER BY {sort_by} {sort_order}"
+        Возвращает:
+        ----------
+        list of dict
+            Результаты поиска, отсортированные по убыванию релевантности (ключ 'relevance').
+        """
+        if mode not in FULL_TEXT_MODES:
+            raise ValueError(f"Unknown full-text search mode: {mode}")
+
+        key = normalize_search_criteria(
+            method='full_text_search', query=query, mode=mode, limit=limit, offset=offset, genre=genre,
+            start_year=start_year, end_year=end_year, actor_name=actor_name)
+        rows = self.search_cache.get(key)
+        if rows is None:
+            rows = self._fetch_full_text(query, mode, limit, offset, genre, start_year, end_year, actor_name)
+            self.search_cache.put(key, rows)
+        return rows
+
+    def _fetch_full_text(self, query, mode, limit, offset, genre, start_year, end_year, actor_name):
+        """
+        Выполняет полнотекстовый запрос в обход кэша (см. full_text_search).
+        """
+        clause = self.backend.full_text_clause(query, mode)
+        if clause is None:
+            return []
+        source, relevance, match, params = clause
+        base_query = f"""SELECT fd.film_id, fd.title, fd.description, fd.genre, fd.release_year, fd.actors,
+    {relevance} AS relevance
+FROM {source}
+WHERE {match}"""
+
+        film_ids = self._candidate_film_ids(actor_name=actor_name)
+        if film_ids is not None and not film_ids:
+            return []
+
+        conditions, filter_params = self.query_builder.filter_conditions(
+            genre, start_year, end_year, film_ids, alias='fd.')
+        for condition in conditions:
+            base_query += f" AND {condition}"
+        params.extend(filter_params)
+
+        base_query += " ORDER BY relevance DESC, fd.film_id LIMIT %s OFFSET %s"
+        params.extend([limit, offset])
+
+        return self.execute_query(base_query, params)
+
+    def full_text_search_page(self, query, mode="natural", page_size=10, cursor=None, direction="next",
+                              genre=None, start_year=None, end_year=None, actor_name=None):
+        """
+        Возвращает страницу результатов полнотекстового поиска.
+
+        Релевантность вычисляется при каждом запросе и не подходит для ключа страницы,
+        поэтому здесь ключом служит смещение начала страницы.
 
-        base_query += f" LIMIT 10"
+        Параметры:
+        ----------
+        query, mode, genre, start_year, end_year, actor_name
+            Параметры поиска, как в full_text_search.
+        page_size : int, optional
+            Количество строк на странице (по умолчанию 10).
+        cursor : int, optional
+            Смещение начала страницы из next_cursor или prev_cursor (None — первая страница).
+        direction : str, optional
+            Не используется: смещение уже указывает на нужную страницу.
+            Параметр оставлен для совместимости с search_movies_page.
+
+        Возвращает:
+        ----------
+        SearchPage
+            Страница результатов со смещениями соседних страниц.
+        """
+        offset = cursor or 0
+        rows = self.full_text_search(query, mode=mode, limit=page_size + 1, offset=offset, genre=genre,
+                                     start_year=start_year, end_year=end_year, actor_name=actor_name)
+        next_cursor = offset + page_size if len(rows) > page_size else None
+        prev_cursor = max(offset - page_size, 0) if offset > 0 else None
+        return SearchPage(rows[:page_size], next_cursor, prev_cursor)
+
+    def refresh_film_details(self, film_id=None):
+        """
+        Пересчитывает материализованную таблицу film_details.
+
+        Обычно таблицу поддерживают триггеры, этот метод нужен после массовой загрузки данных
+        в обход триггеров или для принудительного пересчета одного фильма.
+        Запросы пересчета берутся у хранилища и выполняются в одной транзакции.
+
+        Параметры:
+        ----------
+        film_id : int, optional
+            ID фильма для пересчета. Если не задан, таблица перестраивается полностью.
+        """
+        if not self.pool:
+            self.connect()
 
-        self.cursor.execute(base_query, params)
-        return self.cursor.fetchall()
+        with self.pool.cursor(commit=True) as cursor:
+            for query, params in self.backend.film_details_refresh(film_id):
+                cursor.execute(query, params)
+        self.invalidate_caches()
+
+    def invalidate_caches(self):
+        """
+        Сбрасывает все кэши, построенные по данным о фильмах: результаты поиска,
+        идентификаторы для случайной выборки, триграммный индекс, индекс актеров,
+        индекс битовых карт, столбцовый каталог и справочные таблицы.
+
+        Вызывается после изменения данных о фильмах в обход приложения
+        (например, после массовой загрузки) или из refresh_film_details.
+        """
+        self.search_cache.clear()
+        self.random_sampler.invalidate()
+        self.invalidate_title_index()
+        self.actor_index = None
+        with self._columnar_lock:
+            self.columnar_catalog = None
+        with self._bitmap_lock:
+            self.bitmap_index = None
+        self.reference_data.invalidate()
+
+    def get_title_index(self):
+        """
+        Возвращает триграммный индекс названий фильмов.
+
+        При первом обращении индекс загружается из файла TRIGRAM_INDEX_CONFIG['path'],
+        если файл построен по тем же данным, иначе строится по film_details и сохраняется.
+        Индекс старше TRIGRAM_INDEX_CONFIG['max_age'] загружается так же заново.
+
+        Возвращает:
+        ----------
+        TrigramIndex
+            Триграммный индекс названий фильмов.
+        """
+        max_age = TRIGRAM_INDEX_CONFIG['max_age']
+        with self._title_index_lock:
+            index = self.title_index
+            if index is None or (max_age is not None and time.monotonic() - index.loaded_at > max_age):
+                index = self.title_index = self._load_title_index()
+            return index
+
+    def _load_title_index(self):
+        """
+        Загружает триграммный индекс из файла или строит его по film_details.
+        """
+        include_description = TRIGRAM_INDEX_CONFIG['include_description']
+        path = TRIGRAM_INDEX_CONFIG['path']
+        # Контрольная сумма индексируемых столбцов не зависит от порядка строк и меняется
+        # при переименовании фильма, которое не меняет ни количество фильмов, ни MAX(film_id)
+        checksum_columns = "film_id, title, description" if include_description else "film_id, title"
+        signature = self.execute_query(
+            f"SELECT COUNT(*) AS films, MAX(film_id) AS max_film_id, "
+            f"COALESCE(BIT_XOR(CRC32(CONCAT_WS(CHAR(31), {checksum_columns}))), 0) AS checksum "
+            f"FROM film_details")[0]
+        signature = {key: None if value is None else int(value) for key, value in signature.items()}
+
+        if path and os.path.exists(path):
+            index = TrigramIndex.load(path)
+            if index and index.signature == signature and index.include_description == include_description:
+                return index
+
+        columns = "film_id, title, description" if include_description else "film_id, title"
+        rows = self.execute_query(f"SELECT {columns} FROM film_details")
+        index = TrigramIndex(include_description=include_description).build(rows)
+        if path:
+            try:
+                index.save(path, signature)
+            except OSError as e:
+                print(f"Error saving title index to file: {e}")
+        return index
+
+    def invalidate_title_index(self):
+        """
+        Сбрасывает триграммный индекс названий фильмов вместе с его файлом.
+        Индекс будет построен заново при следующем поиске по ключевым словам.
+        """
+        with self._title_index_lock:
+            self.title_index = None
+            path = TRIGRAM_INDEX_CONFIG['path']
+            if path and os.path.exists(path):
+                os.remove(path)
+
+    def get_actor_index(self):
+        """
+        Возвращает индекс имен актеров, загружая таблицу actor при первом обращении.
+
+        Возвращает:
+        ----------
+        ActorIndex
+            Индекс имен актеров.
+        """
+        if self.actor_index is None:
+            self.actor_index = ActorIndex(self.execute_query(
+                "SELECT actor_id, first_name, last_name FROM actor"))
+        return self.actor_index
+
+    def get_columnar_catalog(self):
+        """
+        Возвращает столбцовый каталог фильмов, если выбран движок поиска 'columnar'.
+
+        Каталог загружается при первом обращении и заново, когда он старше SEARCH_ENGINE_CONFIG['max_age'].
+
+        Возвращает:
+        ----------
+        ColumnarCatalog or None
+            Столбцовый каталог или None, если поиск выполняется запросами к базе данных.
+        """
+        if self.search_engine != 'columnar':
+            return None
+        max_age = SEARCH_ENGINE_CONFIG['max_age']
+        with self._columnar_lock:
+            catalog = self.columnar_catalog
+            if catalog is None or (max_age is not None and time.monotonic() - catalog.loaded_at > max_age):
+                catalog = self.columnar_catalog = self._load_columnar_catalog()
+            return catalog
+
+    def _load_columnar_catalog(self):
+        """
+        Загружает film_details, film_actor, жанры фильмов и порядок фильмов по каждому столбцу сортировки.
+
+        Порядок читается запросом с тем же выражением ORDER BY, что и у запроса поиска,
+        поэтому он совпадает с порядком, который задает сопоставление строк базы данных.
+        """
+        from .columnar import ColumnarCatalog
+
+        rows = self.execute_query(f"SELECT {self.query_builder.COLUMNS} FROM film_details ORDER BY film_id")
+        film_actor_rows = self.execute_query("SELECT actor_id, film_id FROM film_actor")
+        film_genre_rows = self.execute_query(FILM_GENRES_QUERY)
+        sort_rows = {
+            sort_by: self.execute_query(
+                f"SELECT film_id, {sort_expression(sort_by)} AS sort_key FROM film_details ORDER BY sort_key, film_id")
+            for sort_by in SORT_EXPRESSIONS
+        }
+        return ColumnarCatalog(rows, film_actor_rows, film_genre_rows, sort_rows,
+                               self.backend.CASE_INSENSITIVE_COLLATION)
+
+    def get_bitmap_index(self):
+        """
+        Возвращает индекс битовых карт по жанру, году выпуска и актеру.
+
+        Индекс строится по film_details, film_actor и жанрам фильмов при первом обращении и заново,
+        когда он старше BITMAP_INDEX_CONFIG['max_age'].
+
+        Возвращает:
+        ----------
+        BitmapIndex
+            Индекс битовых карт.
+        """
+        max_age = BITMAP_INDEX_CONFIG['max_age']
+        with self._bitmap_lock:
+            index = self.bitmap_index
+            if index is None or (max_age is not None and time.monotonic() - index.loaded_at > max_age):
+                index = self.bitmap_index = BitmapIndex(
+                    self.execute_query("SELECT film_id, release_year FROM film_details"),
+                    self.execute_query("SELECT actor_id, film_id FROM film_actor"),
+                    self.execute_query(FILM_GENRES_QUERY),
+                    self.backend.CASE_INSENSITIVE_COLLATION)
+            return index
+
+    def find_films_by_actor(self, actor_name):
+        """
+        Возвращает идентификаторы фильмов с участием подходящих актеров.
+
+        Актеры находятся по индексу имен, а их фильмы — по первичному ключу (actor_id, film_id)
+        таблицы film_actor.
+
+        Параметры:
+        ----------
+        actor_name : str
+            Полное имя, имя, фамилия или часть имени актера.
+
+        Возвращает:
+        ----------
+        set of int
+            Идентификаторы фильмов.
+        """
+        actor_ids = sorted(self.get_actor_index().resolve(actor_name))
+        if not actor_ids:
+            return set()
+        query = f"SELECT DISTINCT film_id FROM film_actor WHERE actor_id IN ({', '.join(['%s'] * len(actor_ids))})"
+        return {row['film_id'] for row in self.execute_query(query, actor_ids)}
@@ -0,0 +1,229 @@
+"""
+database/pagination.py
+----------------------
+
+Этот модуль содержит вспомогательные средства постраничного поиска по ключу (keyset pagination).
+
+Страница определяется не смещением, а ключом последней (или первой) показанной строки —
+парой (значение столбца сортировки, film_id). Поэтому переход на следующую страницу
+читает только строки после ключа и не зависит от номера страницы.
+
+Классы:
+-------
+SearchPage
+    __init__(self, rows, next_cursor=None, prev_cursor=None)
+        Инициализирует страницу результатов поиска.
+
+Функции:
+--------
+sort_expression(sort_by)
+    Возвращает SQL-выражение сортировки для разрешенного столбца.
+
+normalize_sort_order(sort_order)
+    Приводит порядок сортировки к "ASC" или "DESC".
+
+validate_sort(sort_by, sort_order)
+    Проверяет столбец и порядок сортировки по белому списку.
+
+keyset_condition(expression, sort_order, cursor, direction, alias='')
+    Собирает условие WHERE для строк после (или перед) ключом.
+
+    Условие сравнивает пару (значение сортировки, film_id) с ключом целиком: оно равносильно
+    «значение больше, или равно и film_id больше», но, в отличие от записи через OR, выполняется
+    диапазоном индекса, который начинается со столбца сортировки.
+
+row_cursor(row)
+    Возвращает ключ строки для постраничной навигации.
+
+strip_sort_key(rows)
+    Возвращает строки без служебного столбца sort_key.
+"""
+
+# Разрешенные столбцы сортировки. NULL заменяется значением, которое сравнивается
+# обычным образом, иначе условие "после ключа" теряло бы строки без жанра или года.
+SORT_EXPRESSIONS = {
+    'title': "{alias}title",
+    'genre': "COALESCE({alias}genre, '')",
+    'release_year': "COALESCE({alias}release_year, 0)",
+    'actors': "COALESCE({alias}actors, '')",
+}
+
+# Разрешенные порядки сортировки
+SORT_ORDERS = ("ASC", "DESC")
+
+
+class SearchPage:
+    """
+    Страница результатов поиска.
+
+    Атрибуты:
+    ----------
+    rows : list of dict
+        Строки страницы.
+    next_cursor : tuple or int or None
+        Ключ для перехода на следующую страницу (None — следующей страницы нет).
+    prev_cursor : tuple or int or None
+        Ключ для перехода на предыдущую страницу (None — это первая страница).
+    """
+
+    def __init__(self, rows, next_cursor=None, prev_cursor=None):
+        """
+        Инициализирует страницу результатов поиска.
+
+        Параметры:
+        ----------
+        rows : list of dict
+            Строки страницы.
+        next_cursor : tuple or int, optional
+            Ключ для перехода на следующую страницу.
+        prev_cursor : tuple or int, optional
+            Ключ для перехода на предыдущую страницу.
+        """
+        self.rows = rows
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+
+def sort_expression(sort_by, alias=''):
+    """
+    Возвращает SQL-выражение сортировки для разрешенного столбца.
+
+    Параметры:
+    ----------
+    sort_by : str or None
+        Имя столбца сортировки.
+    alias : str, optional
+        Псевдоним таблицы film_details в запросе (например, 'fd.').
+
+    Возвращает:
+    ----------
+    str or None
+        SQL-выражение или None, если столбец не задан или не разрешен
+        (тогда результаты упорядочиваются только по film_id).
+    """
+    template = SORT_EXPRESSIONS.get((sort_by or '').lower())
+    return template.format(alias=alias) if template else None
+
+
+def normalize_sort_order(sort_order):
+    """
+    Приводит порядок сортировки к "ASC" или "DESC".
+
+    Параметры:
+    ----------
+    sort_order : str or None
+        Порядок сортировки, введенный пользователем.
+
+    Возвращает:
+    ----------
+    str
+        "DESC", если передано "DESC" в любом регистре, иначе "ASC".
+    """
+    return "DESC" if (sort_order or '').strip().upper() == "DESC" else "ASC"
+
+
+def validate_sort(sort_by, sort_order):
+    """
+    Проверяет столбец и порядок сортировки по белому списку.
+
+    В отличие от sort_expression и normalize_sort_order, неизвестные значения не заменяются
+    значениями по умолчанию: из них собирается текст запроса, поэтому они отклоняются.
+
+    Параметры:
+    ----------
+    sort_by : str or None
+        Имя столбца сортировки (пустое значение — сортировка только по film_id).
+    sort_order : str or None
+        Порядок сортировки (пустое значение — "ASC").
+
+    Возвращает:
+    ----------
+    tuple of (str or None, str)
+        Столбец сортировки в нижнем регистре (или None) и "ASC" или "DESC".
+
+    Исключения:
+    -----------
+    ValueError
+        Если столбец или порядок сортировки не разрешен.
+    """
+    column = (sort_by or '').strip().lower() or None
+    if column is not None and column not in SORT_EXPRESSIONS:
+        raise ValueError(f"Unsupported sort column: {sort_by}")
+    order = (sort_order or '').strip().upper() or "ASC"
+    if order not in SORT_ORDERS:
+        raise ValueError(f"Unsupported sort order: {sort_order}")
+    return column, order
+
+
+def keyset_condition(expression, sort_order, cursor, direction, alias=''):
+    """
+    Собирает условие WHERE для строк после (или перед) ключом.
+
+    Параметры:
+    ----------
+    expression : str or None
+        SQL-выражение сортировки (None — сортировка только по film_id).
+    sort_order : str
+        "ASC" или "DESC".
+    cursor : tuple
+        Ключ (значение сортировки, film_id).
+    direction : str
+        "next" — строки после ключа, "prev" — строки перед ключом.
+    alias : str, optional
+        Псевдоним таблицы film_details в запросе.
+
+    Возвращает:
+    ----------
+    tuple of (str, list)
+        Условие и параметры к нему.
+    """
+    forward = (sort_order == "ASC") == (direction == "next")
+    operator = ">" if forward else "<"
+    sort_value, film_id = cursor
+    if expression is None:
+        return f"{alias}film_id {operator} %s", [film_id]
+    return f"({expression}, {alias}film_id) {operator} (%s, %s)", [sort_value, film_id]
+
+
+def row_cursor(row):
+    """
+    Возвращает ключ строки для постраничной навигации.
+
+    Параметры:
+    ----------
+    row : dict
+        Строка результата с ключами sort_key и film_id.
+
+    Возвращает:
+    ----------
+    tuple
+        Ключ (значение сортировки, film_id).
+    """
+    return row.get('sort_key'), row['film_id']
+
+
+def strip_sort_key(rows):
+    """
+    Возвращает строки без служебного столбца sort_key.
+
+    Запрос поиска выбирает sort_key только для ключей страниц, поэтому ключи строятся
+    до вызова этой функции, а вызывающему коду строки возвращаются без него.
+
+    Параметры:
+    ----------
+    rows : list of dict
+        Строки результата поиска.
+
+    Возвращает:
+    ----------
+    list of dict
+        Те же строки (или их копии без sort_key).
+    """
+    return [{key: value for key, value in row.items() if key != 'sort_key'} if 'sort_key' in row else row
+            for row in rows]
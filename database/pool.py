@@ -0,0 +1,428 @@
+"""
+database/pool.py
+----------------
+
+Этот модуль содержит класс ConnectionPool — общий пул соединений с базой данных,
+которым пользуются DatabaseManager, QueryLogger и LocalizationManager вместо отдельных соединений.
+Соединения открывает хранилище, заданное в параметрах подключения (MySQL или SQLite, см. database/backends.py).
+
+Пул ограничен по размеру, проверяет соединения перед выдачей (health check),
+закрывает соединения, простаивающие дольше заданного времени, и выдает курсоры на время одного вызова.
+Если включено измерение запросов (QUERY_STATS_CONFIG), открытые соединения оборачиваются так,
+чтобы каждый запрос учитывался в статистике (см. database/instrumentation.py).
+
+Классы:
+-------
+PoolError
+    Базовое исключение пула соединений.
+
+PoolExhaustedError
+    Исключение, возникающее, если свободное соединение не удалось получить за отведенное время.
+
+ConnectionPool
+    __init__(self, db_config, pool_size=5, idle_timeout=300, health_check_interval=30, acquire_timeout=10)
+        Инициализирует пул соединений.
+
+    acquire(self)
+        Выдает соединение из пула.
+
+    release(self, connection, discard=False)
+        Возвращает соединение в пул.
+
+    connection(self)
+        Контекстный менеджер для получения соединения на время одного вызова.
+
+    cursor(self, dictionary=False, commit=False)
+        Контекстный менеджер для получения курсора на время одного вызова.
+
+    execute_prepared(self, shape, query, params)
+        Выполняет запрос подготовленным выражением формы запроса.
+
+    explain(self, query, params=None)
+        Возвращает план выполнения запроса.
+
+    evict_idle(self)
+        Закрывает соединения, простаивающие дольше idle_timeout.
+
+    close(self)
+        Закрывает все соединения пула.
+
+Функции:
+--------
+get_connection_pool(db_config)
+    Возвращает общий пул для заданной конфигурации подключения.
+
+close_connection_pools()
+    Закрывает все созданные пулы соединений.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from config import POOL_CONFIG, PREPARED_STATEMENT_CONFIG, QUERY_STATS_CONFIG
+from .backends import get_backend, normalize_db_config
+from .instrumentation import InstrumentedConnection, flush_query_stats, get_query_stats
+from .statements import StatementCache
+
+
+class PoolError(Exception):
+    """
+    Базовое исключение пула соединений.
+    """
+
+
+class PoolExhaustedError(PoolError):
+    """
+    Исключение, возникающее, если свободное соединение не удалось получить за отведенное время.
+    """
+
+
+class ConnectionPool:
+    """
+    Пул соединений с базой данных.
+
+    Атрибуты:
+    ----------
+    db_config : dict
+        Параметры подключения к базе данных.
+    backend : StorageBackend
+        Хранилище, которое открывает соединения.
+    pool_size : int
+        Максимальное количество одновременно открытых соединений.
+    idle_timeout : float
+        Время простоя (в секундах), после которого соединение закрывается.
+    health_check_interval : float
+        Время простоя (в секундах), после которого соединение проверяется перед выдачей.
+    acquire_timeout : float
+        Максимальное время ожидания свободного соединения (в секундах).
+    statements : StatementCache
+        Подготовленные выражения по формам запросов для каждого соединения пула.
+
+    Методы:
+    -------
+    acquire()
+        Выдает соединение из пула.
+    release(connection, discard=False)
+        Возвращает соединение в пул.
+    connection()
+        Контекстный менеджер для получения соединения на время одного вызова.
+    cursor(dictionary=False, commit=False)
+        Контекстный менеджер для получения курсора на время одного вызова.
+    execute_prepared(shape, query, params)
+        Выполняет запрос подготовленным выражением формы запроса.
+    explain(query, params=None)
+        Возвращает план выполнения запроса.
+    evict_idle()
+        Закрывает соединения, простаивающие дольше idle_timeout.
+    close()
+        Закрывает все соединения пула.
+    """
+
+    def __init__(self, db_config, pool_size=5, idle_timeout=300, health_check_interval=30, acquire_timeout=10):
+        """
+        Инициализирует пул соединений.
+
+        Параметры:
+        ----------
+        db_config : dict
+            Параметры подключения к базе данных (backend, host, user, password, database).
+        pool_size : int, optional
+            Максимальное количество одновременно открытых соединений (по умолчанию 5).
+        idle_timeout : float, optional
+            Время простоя в секундах, после которого соединение закрывается (по умолчанию 300).
+        health_check_interval : float, optional
+            Время простоя в секундах, после которого соединение проверяется перед выдачей (по умолчанию 30).
+        acquire_timeout : float, optional
+            Максимальное время ожидания свободного соединения в секундах (по умолчанию 10).
+        """
+        self.db_config = normalize_db_config(db_config)
+        self.backend = get_backend(self.db_config)
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+        self.statements = StatementCache(self.backend, PREPARED_STATEMENT_CONFIG['max_per_connection'])
+        self._idle = deque()
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def _create_connection(self):
+        """
+        Открывает новое соединение с базой данных.
+
+        Соединения работают в режиме autocommit, чтобы каждый вызов видел актуальные данные,
+        а не снимок транзакции, открытой предыдущим пользователем соединения.
+        """
+        connection = self.backend.connect(self.db_config)
+        if QUERY_STATS_CONFIG['enabled']:
+            connection = InstrumentedConnection(connection, get_query_stats(), self.explain)
+        connection.autocommit = True
+        return connection
+
+    def _close_connection(self, connection):
+        """
+        Закрывает соединение, игнорируя ошибки уже разорванного соединения.
+        """
+        self.statements.discard(connection)
+        try:
+            connection.close()
+        except self.backend.Error:
+            pass
+
+    def _is_healthy(self, connection, idle_time):
+        """
+        Проверяет соединение, если оно простаивало дольше health_check_interval.
+        """
+        if idle_time < self.health_check_interval:
+            return True
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except self.backend.Error:
+            return False
+
+    def _pop_expired(self):
+        """
+        Извлекает из очереди простаивающих соединений те, что простаивали дольше idle_timeout.
+        Вызывается под блокировкой.
+        """
+        expired = []
+        now = time.monotonic()
+        # Старые соединения лежат в начале очереди, свежие возвращаются в конец
+        while self._idle and now - self._idle[0][1] > self.idle_timeout:
+            expired.append(self._idle.popleft()[0])
+        self._size -= len(expired)
+        return expired
+
+    def acquire(self):
+        """
+        Выдает соединение из пула.
+
+        Сначала используются свободные соединения (последнее возвращенное — первым),
+        затем, если лимит не исчерпан, открывается новое. Иначе вызов ждет освобождения
+        соединения не дольше acquire_timeout.
+
+        Возвращает:
+        ----------
+        mysql.connector.connection.MySQLConnection or SQLiteConnection
+            Соединение с базой данных.
+        """
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            candidate = None
+            with self._condition:
+                if self._closed:
+                    raise PoolError("Connection pool is closed")
+                expired = self._pop_expired()
+                if self._idle:
+                    candidate = self._idle.pop()
+                elif self._size < self.pool_size:
+                    self._size += 1
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolExhaustedError(f"No free connection within {self.acquire_timeout} s")
+                    self._condition.wait(remaining)
+                    continue
+
+            for connection in expired:
+                self._close_connection(connection)
+
+            if candidate is None:
+                try:
+                    return self._create_connection()
+                except Exception:
+                    with self._condition:
+                        self._size -= 1
+                        self._condition.notify()
+                    raise
+
+            connection, last_used = candidate
+            if self._is_healthy(connection, time.monotonic() - last_used):
+                return connection
+            self.release(connection, discard=True)
+
+    def release(self, connection, discard=False):
+        """
+        Возвращает соединение в пул.
+
+        Параметры:
+        ----------
+        connection : mysql.connector.connection.MySQLConnection or SQLiteConnection
+            Соединение, полученное методом acquire().
+        discard : bool, optional
+            Закрыть соединение вместо возврата в пул (по умолчанию False).
+        """
+        with self._condition:
+            if discard or self._closed:
+                self._size -= 1
+            else:
+                self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+        if discard or self._closed:
+            self._close_connection(connection)
+
+    @contextmanager
+    def connection(self):
+        """
+        Контекстный менеджер для получения соединения на время одного вызова.
+
+        Соединение, разорванное во время вызова, не возвращается в пул.
+        """
+        connection = self.acquire()
+        discard = False
+        try:
+            yield connection
+        except self.backend.Error:
+            discard = not connection.is_connected()
+            raise
+        finally:
+            self.release(connection, discard=discard)
+
+    @contextmanager
+    def cursor(self, dictionary=False, commit=False):
+        """
+        Контекстный менеджер для получения курсора на время одного вызова.
+
+        Параметры:
+        ----------
+        dictionary : bool, optional
+            Возвращать строки в виде словарей (по умолчанию False).
+        commit : bool, optional
+            Выполнить вызов в явной транзакции и зафиксировать ее после успешного выполнения
+            (по умолчанию False — каждый запрос фиксируется сам в режиме autocommit).
+        """
+        with self.connection() as connection:
+            if commit:
+                connection.start_transaction()
+            cursor = connection.cursor(dictionary=dictionary)
+            try:
+                yield cursor
+                if commit:
+                    connection.commit()
+            except Exception:
+                if connection.is_connected():
+                    connection.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def execute_prepared(self, shape, query, params):
+        """
+        Выполняет запрос подготовленным выражением формы запроса на свободном соединении пула.
+
+        Параметры:
+        ----------
+        shape : tuple or None
+            Форма запроса (None — выполнить без подготовленного выражения).
+        query : str
+            Текст запроса для формы.
+        params : list
+            Параметры запроса.
+
+        Возвращает:
+        ----------
+        list of dict
+            Строки результата.
+        """
+        with self.connection() as connection:
+            return self.statements.execute(connection, shape, query, params)
+
+    def explain(self, query, params=None):
+        """
+        Возвращает план выполнения запроса (EXPLAIN) на свободном соединении пула.
+        Сам план в статистику запросов не попадает.
+
+        Параметры:
+        ----------
+        query : str
+            Текст запроса SELECT.
+        params : sequence, optional
+            Параметры запроса.
+
+        Возвращает:
+        ----------
+        list of dict
+            Строки плана в том виде, в каком их возвращает хранилище.
+        """
+        if self.backend.EXPLAIN_PREFIX is None:
+            return []
+        with self.connection() as connection:
+            cursor = getattr(connection, 'raw', connection).cursor(dictionary=True)
+            try:
+                cursor.execute(self.backend.EXPLAIN_PREFIX + query, params)
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+
+    def evict_idle(self):
+        """
+        Закрывает соединения, простаивающие дольше idle_timeout.
+        """
+        with self._condition:
+            expired = self._pop_expired()
+        for connection in expired:
+            self._close_connection(connection)
+
+    def close(self):
+        """
+        Закрывает все соединения пула. Соединения, выданные в момент закрытия,
+        закрываются при возврате.
+        """
+        with self._condition:
+            self._closed = True
+            idle = [connection for connection, _ in self._idle]
+            self._size -= len(idle)
+            self._idle.clear()
+            self._condition.notify_all()
+        for connection in idle:
+            self._close_connection(connection)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_connection_pool(db_config):
+    """
+    Возвращает общий пул для заданной конфигурации подключения.
+
+    Все модули, подключающиеся с одинаковыми параметрами, получают один и тот же пул.
+    Настройки пула берутся из POOL_CONFIG.
+
+    Параметры:
+    ----------
+    db_config : dict
+        Параметры подключения к базе данных.
+
+    Возвращает:
+    ----------
+    ConnectionPool
+        Пул соединений.
+    """
+    db_config = normalize_db_config(db_config)
+    key = tuple(sorted(db_config.items()))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(db_config, **POOL_CONFIG)
+            _pools[key] = pool
+        return pool
+
+
+def close_connection_pools():
+    """
+    Закрывает все созданные пулы соединений.
+
+    Перед закрытием дописывается журнал медленных запросов: для его записей еще может
+    понадобиться соединение, чтобы получить план EXPLAIN.
+    """
+    flush_query_stats()
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,169 @@
+"""
+database/query_builder.py
+-------------------------
+
+Этот модуль содержит построитель запросов поиска к материализованной таблице film_details.
+
+Каждый фильтр записывается условием на индексированный столбец без выражений над ним,
+чтобы сервер мог выполнить его по индексу, а не проверкой каждой строки:
+
+- идентификаторы, найденные по ключевым словам и актеру, — film_id IN (...) по первичному ключу;
+- жанр — принадлежность фильма жанру через film_category и category: film_details.genre хранит
+  список всех жанров фильма, поэтому равенство с ним теряло бы фильмы с несколькими жанрами;
+- годы выпуска — диапазон по индексу release_year;
+- ключ страницы — сравнение пар (значение сортировки, film_id), см. database/pagination.py.
+
+Поэтому поиск по жанру читает фильмы жанра по индексу film_category, а не все фильмы каталога.
+
+Класс:
+------
+SearchQueryBuilder
+    build(self, shape)
+        Собирает текст запроса поиска для формы запроса.
+
+    params(self, genre=None, start_year=None, end_year=None, film_ids=None, sort_by=None,
+           sort_order="ASC", cursor=None, direction="next", limit=None)
+        Собирает параметры запроса поиска в порядке условий build.
+
+    filter_conditions(genre=None, start_year=None, end_year=None, film_ids=None, alias='')
+        Собирает условия WHERE по жанру, годам выпуска и найденным идентификаторам.
+"""
+
+from .pagination import keyset_condition, sort_expression
+
+
+class SearchQueryBuilder:
+    """
+    Построитель запросов поиска к таблице film_details.
+
+    Текст запроса зависит только от формы запроса (SearchShape), значения фильтров
+    передаются параметрами в том же порядке, в котором build добавляет условия.
+
+    Методы:
+    -------
+    build(shape)
+        Собирает текст запроса поиска для формы запроса.
+    params(genre=None, start_year=None, end_year=None, film_ids=None, sort_by=None, sort_order="ASC",
+           cursor=None, direction="next", limit=None)
+        Собирает параметры запроса поиска в порядке условий build.
+    filter_conditions(genre=None, start_year=None, end_year=None, film_ids=None, alias='')
+        Собирает условия WHERE по жанру, годам выпуска и найденным идентификаторам.
+    """
+
+    COLUMNS = "film_id, title, description, genre, release_year, actors"
+
+    def build(self, shape):
+        """
+        Собирает текст запроса поиска для формы запроса.
+
+        Параметры:
+        ----------
+        shape : SearchShape
+            Форма запроса.
+
+        Возвращает:
+        ----------
+        str
+            Запрос с параметрами %s: значения фильтров, ключа страницы и LIMIT.
+        """
+        expression = sort_expression(shape.sort_by)
+        columns = self.COLUMNS
+        if expression:
+            columns += f", {expression} AS sort_key"
+        query = f"""SELECT {columns}
+FROM film_details
+WHERE 1=1"""
+        conditions, _ = self.filter_conditions(shape.genre, shape.start_year, shape.end_year,
+                                               [0] * shape.ids if shape.ids else None)
+        if shape.keyset is not None:
+            conditions.append(keyset_condition(expression, shape.sort_order, (None, None), shape.keyset)[0])
+        for condition in conditions:
+            query += f" AND {condition}"
+
+        order = shape.sort_order
+        if shape.keyset == "prev":
+            order = "DESC" if order == "ASC" else "ASC"
+        query += f" ORDER BY film_id {order}" if expression is None else f" ORDER BY sort_key {order}, film_id {order}"
+        if shape.limit:
+            query += " LIMIT %s"
+        return query
+
+    def params(self, genre=None, start_year=None, end_year=None, film_ids=None, sort_by=None, sort_order="ASC",
+               cursor=None, direction="next", limit=None):
+        """
+        Собирает параметры запроса поиска в порядке условий build.
+
+        Параметры:
+        ----------
+        genre, start_year, end_year : optional
+            Жанр и границы годов выпуска.
+        film_ids : list of int, optional
+            Идентификаторы фильмов, дополненные до размера списка IN формы.
+        sort_by, sort_order : str
+            Сортировка, проверенная validate_sort.
+        cursor : tuple, optional
+            Ключ страницы (None — с начала выдачи).
+        direction : str, optional
+            "next" или "prev" — направление чтения от ключа.
+        limit : int, optional
+            Максимальное количество строк (None — запрос без LIMIT).
+
+        Возвращает:
+        ----------
+        list
+            Параметры запроса.
+        """
+        _, params = self.filter_conditions(genre, start_year, end_year, film_ids)
+        if cursor is not None:
+            params.extend(keyset_condition(sort_expression(sort_by), sort_order, cursor, direction)[1])
+        if limit is not None:
+            params.append(limit)
+        return params
+
+    @staticmethod
+    def filter_conditions(genre=None, start_year=None, end_year=None, film_ids=None, alias=''):
+        """
+        Собирает условия WHERE по жанру, годам выпуска и найденным идентификаторам для таблицы film_details.
+
+        Условия сравнивают сами столбцы film_details, поэтому каждое из них выполняется по индексу.
+        Жанр проверяется подзапросом к film_category и category, а не по списку жанров film_details.genre.
+
+        Параметры:
+        ----------
+        genre : str, optional
+            Жанр фильма.
+        start_year : int, optional
+            Начальный год выпуска фильма.
+        end_year : int, optional
+            Конечный год выпуска фильма.
+        film_ids : list of int, optional
+            Идентификаторы фильмов, найденные по ключевым словам и актеру.
+        alias : str, optional
+            Псевдоним таблицы film_details в запросе (например, 'fd.').
+
+        Возвращает:
+        ----------
+        tuple of (list of str, list)
+            Условия и параметры к ним.
+        """
+        conditions = []
+        params = []
+
+        if film_ids is not None:
+            conditions.append(f"{alias}film_id IN ({', '.join(['%s'] * len(film_ids))})")
+            params.extend(film_ids)
+
+        if genre:
+            conditions.append(f"{alias}film_id IN (SELECT fc.film_id FROM film_category fc "
+                              f"JOIN category c ON c.category_id = fc.category_id WHERE c.name = %s)")
+            params.append(genre)
+
+        if start_year:
+            conditions.append(f"{alias}release_year >= %s")
+            params.append(start_year)
+
+        if end_year:
+            conditions.append(f"{alias}release_year <= %s")
+            params.append(end_year)
+
+        return conditions, params
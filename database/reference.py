@@ -0,0 +1,216 @@
+"""
+database/reference.py
+---------------------
+
+Этот модуль содержит класс ReferenceDataCache — кэш небольших, редко изменяемых справочных таблиц
+(категории фильмов, каталог языков), которые раньше перечитывались из базы данных при каждом
+показе списка жанров или выборе языка.
+
+Все справочные таблицы загружаются одним запросом (UNION ALL), хранятся в памяти
+и перечитываются по истечении refresh_interval секунд или после явного сброса.
+
+Классы:
+-------
+ReferenceDataCache
+    __init__(self, db_manager, refresh_interval=3600)
+        Инициализирует пустой кэш справочных таблиц.
+
+    load(self)
+        Загружает все справочные таблицы из базы данных одним запросом.
+
+    covers(self, table_name, column_name)
+        Проверяет, кэшируется ли столбец справочной таблицы.
+
+    rows(self, table_name)
+        Возвращает строки справочной таблицы.
+
+    column(self, table_name, column_name)
+        Возвращает значения столбца справочной таблицы.
+
+    id_map(self, table_name, column_name=None)
+        Возвращает словарь "идентификатор — значение" для справочной таблицы.
+
+    invalidate(self)
+        Сбрасывает загруженные таблицы.
+"""
+
+import threading
+import time
+
+# Справочные таблицы: столбец идентификатора, кэшируемые столбцы и столбец названия для id_map
+REFERENCE_TABLES = {
+    'category': {
+        'id': 'category_id',
+        'columns': ('name',),
+        'name': 'name',
+    },
+    'language_pack': {
+        'id': 'language_id',
+        'columns': ('language_code', 'language_name'),
+        'name': 'language_name',
+    },
+}
+
+
+class ReferenceDataCache:
+    """
+    Кэш справочных таблиц в памяти.
+
+    Атрибуты:
+    ----------
+    db_manager : DatabaseManager
+        Менеджер базы данных, через который выполняются запросы.
+    refresh_interval : float
+        Время (в секундах), после которого таблицы перечитываются из базы данных.
+
+    Методы:
+    -------
+    load()
+        Загружает все справочные таблицы из базы данных одним запросом.
+    covers(table_name, column_name)
+        Проверяет, кэшируется ли столбец справочной таблицы.
+    rows(table_name)
+        Возвращает строки справочной таблицы.
+    column(table_name, column_name)
+        Возвращает значения столбца справочной таблицы.
+    id_map(table_name, column_name=None)
+        Возвращает словарь "идентификатор — значение" для справочной таблицы.
+    invalidate()
+        Сбрасывает загруженные таблицы.
+    """
+
+    def __init__(self, db_manager, refresh_interval=3600):
+        """
+        Инициализирует пустой кэш справочных таблиц.
+
+        Параметры:
+        ----------
+        db_manager : DatabaseManager
+            Менеджер базы данных.
+        refresh_interval : float, optional
+            Время в секундах, после которого таблицы перечитываются (по умолчанию 3600).
+        """
+        self.db_manager = db_manager
+        self.refresh_interval = refresh_interval
+        self._tables = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _build_query():
+        """
+        Собирает один запрос UNION ALL по всем справочным таблицам.
+        Столбцы таблиц выравниваются по наибольшему их количеству и дополняются NULL.
+        """
+        width = max(len(spec['columns']) for spec in REFERENCE_TABLES.values())
+        selects = []
+        for table_name, spec in REFERENCE_TABLES.items():
+            values = list(spec['columns']) + ['NULL'] * (width - len(spec['columns']))
+            columns = ', '.join(f"{value} AS value_{i}" for i, value in enumerate(values))
+            selects.append(f"SELECT '{table_name}' AS table_name, {spec['id']} AS id, {columns} FROM {table_name}")
+        return '\nUNION ALL\n'.join(selects) + '\nORDER BY table_name, id'
+
+    def load(self):
+        """
+        Загружает все справочные таблицы из базы данных одним запросом.
+        """
+        tables = {table_name: [] for table_name in REFERENCE_TABLES}
+        for row in self.db_manager.execute_query(self._build_query()):
+            spec = REFERENCE_TABLES[row['table_name']]
+            record = {spec['id']: row['id']}
+            for i, column_name in enumerate(spec['columns']):
+                record[column_name] = row[f'value_{i}']
+            tables[row['table_name']].append(record)
+
+        self._tables = tables
+        self._loaded_at = time.monotonic()
+
+    def _get_tables(self):
+        """
+        Возвращает загруженные таблицы, перечитывая их при первом обращении или по истечении refresh_interval.
+        """
+        with self._lock:
+            if self._tables is None or time.monotonic() - self._loaded_at > self.refresh_interval:
+                self.load()
+            return self._tables
+
+    @staticmethod
+    def covers(table_name, column_name):
+        """
+        Проверяет, кэшируется ли столбец справочной таблицы.
+
+        Параметры:
+        ----------
+        table_name : str
+            Название таблицы.
+        column_name : str
+            Название столбца.
+
+        Возвращает:
+        ----------
+        bool
+            True, если значения столбца можно получить из кэша.
+        """
+        spec = REFERENCE_TABLES.get(table_name)
+        return spec is not None and (column_name == spec['id'] or column_name in spec['columns'])
+
+    def rows(self, table_name):
+        """
+        Возвращает строки справочной таблицы.
+
+        Параметры:
+        ----------
+        table_name : str
+            Название таблицы из REFERENCE_TABLES.
+
+        Возвращает:
+        ----------
+        list of dict
+            Строки таблицы, упорядоченные по идентификатору.
+        """
+        return self._get_tables()[table_name]
+
+    def column(self, table_name, column_name):
+        """
+        Возвращает значения столбца справочной таблицы.
+
+        Параметры:
+        ----------
+        table_name : str
+            Название таблицы из REFERENCE_TABLES.
+        column_name : str
+            Название столбца (идентификатор или один из кэшируемых столбцов).
+
+        Возвращает:
+        ----------
+        list
+            Значения столбца в порядке идентификаторов.
+        """
+        return [row[column_name] for row in self.rows(table_name)]
+
+    def id_map(self, table_name, column_name=None):
+        """
+        Возвращает словарь "идентификатор — значение" для справочной таблицы.
+
+        Параметры:
+        ----------
+        table_name : str
+            Название таблицы из REFERENCE_TABLES.
+        column_name : str, optional
+            Столбец значений (по умолчанию — столбец названия таблицы).
+
+        Возвращает:
+        ----------
+        dict
+            Словарь идентификаторов и значений.
+        """
+        spec = REFERENCE_TABLES[table_name]
+        column_name = column_name or spec['name']
+        return {row[spec['id']]: row[column_name] for row in self.rows(table_name)}
+
+    def invalidate(self):
+        """
+        Сбрасывает загруженные таблицы; при следующем обращении они будут перечитаны.
+        """
+        with self._lock:
+            self._tables = None
@@ -0,0 +1,248 @@
+"""
+database/sampler.py
+-------------------
+
+Этот модуль содержит класс RandomFilmSampler, который выбирает случайные фильмы без `ORDER BY RAND()`.
+
+Сэмплер держит в памяти массив идентификаторов фильмов, выбирает из него `limit` различных
+идентификаторов за O(limit) и загружает из film_details только эти строки. Дополнительно
+он может держать буфер заранее выбранных наборов, чтобы обновление баннера главного меню
+не обращалось к базе данных.
+
+Наборы в буфере выбираются по наибольшему из запрошенных limit, а вызов с меньшим limit
+берет начало набора: начало случайного набора — тоже случайный набор. Поэтому вызовы
+с разными limit (например, /random?limit=N в API) пользуются одним буфером, а не
+перестраивают его при каждой смене limit.
+
+Классы:
+-------
+RandomFilmSampler
+    __init__(self, db_manager, buffer_size=0, ids_ttl=600)
+        Инициализирует объект RandomFilmSampler.
+
+    load_ids(self)
+        Загружает идентификаторы фильмов из базы данных.
+
+    sample_ids(self, limit)
+        Выбирает случайные различные идентификаторы фильмов.
+
+    fetch_movies(self, film_ids)
+        Загружает строки film_details для заданных идентификаторов.
+
+    get_random_movies(self, limit=10)
+        Возвращает случайные фильмы.
+
+    invalidate(self)
+        Сбрасывает кэш идентификаторов и буфер.
+"""
+
+import random
+import threading
+import time
+from array import array
+from collections import deque
+
+
+class RandomFilmSampler:
+    """
+    Класс для выборки случайных фильмов по кэшированному массиву идентификаторов.
+
+    Атрибуты:
+    ----------
+    db_manager : DatabaseManager
+        Объект для выполнения запросов к базе данных.
+    buffer_size : int
+        Количество заранее выбранных наборов фильмов в буфере (0 — буфер отключен).
+    ids_ttl : float
+        Время жизни кэша идентификаторов в секундах.
+
+    Методы:
+    -------
+    load_ids()
+        Загружает идентификаторы фильмов из базы данных.
+    sample_ids(limit)
+        Выбирает случайные различные идентификаторы фильмов.
+    fetch_movies(film_ids)
+        Загружает строки film_details для заданных идентификаторов.
+    get_random_movies(limit=10)
+        Возвращает случайные фильмы.
+    invalidate()
+        Сбрасывает кэш идентификаторов и буфер.
+    """
+
+    def __init__(self, db_manager, buffer_size=0, ids_ttl=600):
+        """
+        Инициализирует объект RandomFilmSampler.
+
+        Параметры:
+        ----------
+        db_manager : DatabaseManager
+            Объект для выполнения запросов к базе данных.
+        buffer_size : int, optional
+            Количество заранее выбранных наборов фильмов в буфере (по умолчанию 0 — буфер отключен).
+        ids_ttl : float, optional
+            Время жизни кэша идентификаторов в секундах (по умолчанию 600).
+        """
+        self.db_manager = db_manager
+        self.buffer_size = buffer_size
+        self.ids_ttl = ids_ttl
+        self._ids = None
+        self._ids_loaded_at = 0.0
+        self._buffer = deque()
+        self._batch_size = 0
+        self._refilling = False
+        self._lock = threading.Lock()
+
+    def load_ids(self):
+        """
+        Загружает идентификаторы фильмов из базы данных.
+
+        Возвращает:
+        ----------
+        array
+            Массив идентификаторов фильмов.
+        """
+        rows = self.db_manager.execute_query("SELECT film_id FROM film_details")
+        ids = array('I', (row['film_id'] for row in rows))
+        with self._lock:
+            self._ids = ids
+            self._ids_loaded_at = time.monotonic()
+        return ids
+
+    def _get_ids(self):
+        """
+        Возвращает кэшированный массив идентификаторов, загружая его при необходимости.
+        """
+        ids = self._ids
+        if ids is None or time.monotonic() - self._ids_loaded_at > self.ids_ttl:
+            ids = self.load_ids()
+        return ids
+
+    def sample_ids(self, limit):
+        """
+        Выбирает случайные различные идентификаторы фильмов.
+
+        Для каталога, который заметно больше limit, random.sample выбирает элементы
+        через множество уже выбранных индексов, то есть за O(limit) без копирования массива.
+
+        Параметры:
+        ----------
+        limit : int
+            Количество идентификаторов.
+
+        Возвращает:
+        ----------
+        list of int
+            Список различных идентификаторов фильмов.
+        """
+        ids = self._get_ids()
+        return random.sample(ids, min(limit, len(ids)))
+
+    def fetch_movies(self, film_ids):
+        """
+        Загружает строки film_details для заданных идентификаторов.
+
+        Параметры:
+        ----------
+        film_ids : list of int
+            Идентификаторы фильмов.
+
+        Возвращает:
+        ----------
+        list of dict
+            Фильмы в порядке переданных идентификаторов.
+        """
+        if not film_ids:
+            return []
+        placeholders = ', '.join(['%s'] * len(film_ids))
+        query = f"""SELECT film_id, title, description, genre, release_year, actors
+FROM film_details
+WHERE film_id IN ({placeholders})"""
+        rows = {row['film_id']: row for row in self.db_manager.execute_query(query, tuple(film_ids))}
+        return [rows[film_id] for film_id in film_ids if film_id in rows]
+
+    def _fill_buffer(self, size):
+        """
+        Заполняет буфер наборами случайных фильмов размера size одним запросом к базе данных.
+
+        Если за время запроса размер наборов вырос (был запрошен больший limit),
+        выбранные наборы уже малы и в буфер не добавляются.
+        """
+        batches = [self.sample_ids(size) for _ in range(self.buffer_size)]
+        unique_ids = list({film_id for batch in batches for film_id in batch})
+        rows = {row['film_id']: row for row in self.fetch_movies(unique_ids)}
+        with self._lock:
+            if size >= self._batch_size:
+                for batch in batches:
+                    self._buffer.append([rows[film_id] for film_id in batch if film_id in rows])
+            self._refilling = False
+
+    def _refill_in_background(self, size):
+        """
+        Запускает пополнение буфера в фоновом потоке, если оно еще не запущено.
+        """
+        with self._lock:
+            if self._refilling:
+                return
+            self._refilling = True
+
+        def refill():
+            try:
+                self._fill_buffer(size)
+            except Exception:
+                with self._lock:
+                    self._refilling = False
+
+        threading.Thread(target=refill, daemon=True).start()
+
+    def get_random_movies(self, limit=10):
+        """
+        Возвращает случайные фильмы.
+
+        Если буфер включен, набор берется из буфера (первые limit фильмов набора),
+        а пополнение буфера запускается в фоне, когда в нем остается меньше половины наборов.
+        Буфер заполняется синхронно, только если он пуст или limit больше размера его наборов.
+
+        Параметры:
+        ----------
+        limit : int, optional
+            Количество фильмов для возврата (по умолчанию 10).
+
+        Возвращает:
+        ----------
+        list of dict
+            Список случайных фильмов.
+        """
+        if not self.buffer_size:
+            return self.fetch_movies(self.sample_ids(limit))
+
+        with self._lock:
+            if limit > self._batch_size:
+                # Наборы в буфере меньше limit: дальше наборы выбираются по новому размеру
+                self._batch_size = limit
+                self._buffer.clear()
+            size = self._batch_size
+            batch = self._buffer.popleft() if self._buffer else None
+
+        if batch is None:
+            self._fill_buffer(size)
+            with self._lock:
+                batch = self._buffer.popleft() if self._buffer else None
+            if batch is None:
+                # Наборы разобрали другие потоки или размер наборов вырос во время заполнения
+                return self.fetch_movies(self.sample_ids(limit))
+
+        with self._lock:
+            remaining = len(self._buffer)
+        if remaining < self.buffer_size // 2:
+            self._refill_in_background(size)
+        return batch[:limit]
+
+    def invalidate(self):
+        """
+        Сбрасывает кэш идентификаторов и буфер.
+        """
+        with self._lock:
+            self._ids = None
+            self._buffer.clear()
+            self._batch_size = 0
@@ -0,0 +1,532 @@
+"""
+database/sqlite_import.py
+-------------------------
+
+Этот модуль собирает встроенную базу данных SQLite из скриптов MySQL в database_scripts:
+дампа Sakila (Dump20240624.sql) и скриптов таблиц приложения (film_details, пользователи,
+журнал запросов, языковые пакеты). Команда: `python main.py import-sqlite film_search.db`.
+
+Из скриптов переносятся только CREATE TABLE и INSERT ... VALUES: типы столбцов MySQL приводятся
+к типам SQLite, строковые столбцы сравниваются без учета регистра (как в MySQL), индексы создаются
+отдельными CREATE INDEX. Представления, процедуры и триггеры MySQL пропускаются; вместо них создаются
+виртуальная таблица FTS5 film_text_fts для полнотекстового поиска и триггеры SQLite, которые
+поддерживают film_text_fts и film_details в актуальном состоянии.
+
+База сначала записывается во временный файл и подменяет существующую только после успешного импорта.
+
+Функции:
+--------
+iter_statements(data)
+    Разбивает текст скрипта MySQL на инструкции.
+
+convert_create_table(statement)
+    Переводит CREATE TABLE MySQL в инструкции SQLite.
+
+parse_insert(statement)
+    Разбирает INSERT ... VALUES MySQL.
+
+import_scripts(path, scripts_dir=SCRIPTS_DIR, scripts=SCRIPTS, populate=None)
+    Собирает базу данных SQLite из скриптов MySQL.
+
+run_import(args)
+    Точка входа команды `import-sqlite`.
+"""
+
+import os
+import re
+import sqlite3
+import sys
+
+from .backends import SQLiteBackend, SQLiteConnection
+
+# Каталог со скриптами базы данных
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'database_scripts')
+
+# Скрипты в порядке выполнения (как при развертывании базы данных MySQL)
+SCRIPTS = (
+    'Dump20240624.sql',
+    'Film_Details_Table.sql',
+    'Users_Table.sql',
+    'User_Queries_Table.sql',
+    'User_Query_Stats_Table.sql',
+    'Language_Packs_Table.sql',
+    'New_Language.sql',
+)
+
+# Лексемы скрипта: строки и идентификаторы переносятся как есть, комментарии (в том числе
+# условные /*!...*/) удаляются, остальной текст читается кусками до следующего особого символа
+_SCRIPT_TOKEN = re.compile(rb"""
+    '(?:[^'\\]|\\.|'')*'
+  | "(?:[^"\\]|\\.|"")*"
+  | `[^`]*`
+  | (?P<comment>--(?:[ \t][^\n]*)?(?=\n|$)|\#[^\n]*|/\*.*?\*/)
+  | [^'"`\-#/;$\n]+
+  | .
+""", re.S | re.X)
+
+_DELIMITER_LINE = re.compile(rb'[ \t]*DELIMITER[ \t]+(\S+)[^\n]*(?:\n|$)', re.I)
+
+_CREATE_TABLE = re.compile(r'\s*CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)\s*\(', re.I)
+
+_IS_CREATE_TABLE = re.compile(rb'\s*CREATE\s+TABLE\b', re.I)
+
+_INSERT = re.compile(rb'\s*INSERT\s+(?:IGNORE\s+)?INTO\s+`?(\w+)`?\s*(?:\(([^)]*)\))?\s*VALUES\s*', re.I)
+
+_VALUE_TOKEN = re.compile(rb"""\s*(?:
+    (?P<open>\()
+  | (?P<close>\))
+  | (?P<comma>,)
+  | _binary\s*'(?P<binary>(?:[^'\\]|\\.|'')*)'
+  | (?:_\w+\s*)?'(?P<string>(?:[^'\\]|\\.|'')*)'
+  | (?P<null>NULL)\b
+  | (?P<number>[-+]?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)
+  | (?P<word>\w+)
+)""", re.S | re.X | re.I)
+
+_ESCAPE = re.compile(rb"\\(.)|''", re.S)
+
+_ESCAPES = {b'0': b'\x00', b'b': b'\b', b'n': b'\n', b'r': b'\r', b't': b'\t', b'Z': b'\x1a'}
+
+# Типы столбцов MySQL -> типы SQLite
+_INTEGER_TYPES = {'tinyint', 'smallint', 'mediumint', 'int', 'integer', 'bigint', 'bit', 'bool', 'boolean', 'year'}
+_NUMERIC_TYPES = {'decimal', 'numeric', 'dec', 'fixed'}
+_REAL_TYPES = {'float', 'double', 'real'}
+_STRING_TYPES = {'char', 'varchar', 'tinytext', 'text', 'mediumtext', 'longtext', 'enum', 'set'}
+_TEXT_TYPES = {'json', 'date', 'datetime', 'timestamp', 'time'}
+
+# Полнотекстовый индекс film_text и триггеры, которые поддерживают его при изменении film_text
+FULL_TEXT_SCHEMA = (
+    "CREATE VIRTUAL TABLE film_text_fts USING fts5(title, description, content='film_text', content_rowid='film_id')",
+    "INSERT INTO film_text_fts (film_text_fts) VALUES ('rebuild')",
+    """CREATE TRIGGER film_text_fts_insert AFTER INSERT ON film_text
+BEGIN
+    INSERT INTO film_text_fts (rowid, title, description) VALUES (NEW.film_id, NEW.title, NEW.description);
+END""",
+    """CREATE TRIGGER film_text_fts_delete AFTER DELETE ON film_text
+BEGIN
+    INSERT INTO film_text_fts (film_text_fts, rowid, title, description)
+    VALUES ('delete', OLD.film_id, OLD.title, OLD.description);
+END""",
+    """CREATE TRIGGER film_text_fts_update AFTER UPDATE ON film_text
+BEGIN
+    INSERT INTO film_text_fts (film_text_fts, rowid, title, description)
+    VALUES ('delete', OLD.film_id, OLD.title, OLD.description);
+    INSERT INTO film_text_fts (rowid, title, description) VALUES (NEW.film_id, NEW.title, NEW.description);
+END""",
+)
+
+# Триггеры film_details (аналог триггеров из Film_Details_Table.sql):
+# (имя, событие, таблица, подзапрос или список пересчитываемых фильмов, условие WHEN)
+FILM_DETAILS_TRIGGERS = (
+    ('film_details_film_insert', 'INSERT', 'film', 'NEW.film_id', None),
+    ('film_details_film_update', 'UPDATE', 'film', 'NEW.film_id, OLD.film_id', None),
+    ('film_details_film_delete', 'DELETE', 'film', 'OLD.film_id', None),
+    ('film_details_film_actor_insert', 'INSERT', 'film_actor', 'NEW.film_id', None),
+    ('film_details_film_actor_update', 'UPDATE', 'film_actor', 'NEW.film_id, OLD.film_id', None),
+    ('film_details_film_actor_delete', 'DELETE', 'film_actor', 'OLD.film_id', None),
+    ('film_details_film_category_insert', 'INSERT', 'film_category', 'NEW.film_id', None),
+    ('film_details_film_category_update', 'UPDATE', 'film_category', 'NEW.film_id, OLD.film_id', None),
+    ('film_details_film_category_delete', 'DELETE', 'film_category', 'OLD.film_id', None),
+    ('film_details_actor_update', 'UPDATE', 'actor', 'SELECT film_id FROM film_actor WHERE actor_id = NEW.actor_id',
+     'OLD.first_name IS NOT NEW.first_name OR OLD.last_name IS NOT NEW.last_name'),
+    ('film_details_category_update', 'UPDATE', 'category',
+     'SELECT film_id FROM film_category WHERE category_id = NEW.category_id', 'OLD.name IS NOT NEW.name'),
+)
+
+
+def iter_statements(data):
+    """
+    Разбивает текст скрипта MySQL на инструкции.
+
+    Учитываются строки, идентификаторы в обратных кавычках, комментарии и смена разделителя
+    командой DELIMITER (в блоках процедур и триггеров).
+
+    Параметры:
+    ----------
+    data : bytes
+        Текст скрипта (байты, так как дамп содержит двоичные строки _binary).
+
+    Возвращает:
+    ----------
+    generator of bytes
+        Инструкции без комментариев и завершающего разделителя.
+    """
+    delimiter = b';'
+    statement = []
+    position = 0
+    length = len(data)
+    while position < length:
+        if position == 0 or data[position - 1:position] == b'\n':
+            match = _DELIMITER_LINE.match(data, position)
+            if match:
+                delimiter = match.group(1)
+                position = match.end()
+                continue
+        if data.startswith(delimiter, position):
+            text = b''.join(statement).strip()
+            if text:
+                yield text
+            statement = []
+            position += len(delimiter)
+            continue
+        match = _SCRIPT_TOKEN.match(data, position)
+        statement.append(b' ' if match.group('comment') is not None else match.group())
+        position = match.end()
+
+    text = b''.join(statement).strip()
+    if text:
+        yield text
+
+
+def _split_definitions(body):
+    """
+    Разбивает тело CREATE TABLE на определения по запятым верхнего уровня.
+    """
+    definitions = []
+    depth = 0
+    quote = None
+    start = 0
+    for index, char in enumerate(body):
+        if quote:
+            if char == quote and body[index - 1] != '\\':
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            definitions.append(body[start:index].strip())
+            start = index + 1
+    definitions.append(body[start:].strip())
+    return [definition for definition in definitions if definition]
+
+
+def _column_list(text):
+    """
+    Возвращает список столбцов из "(a, b(10), c)" без длин префиксов индекса.
+    """
+    inner = text[text.index('(') + 1:text.rindex(')')]
+    return [re.sub(r'\(\d+\)', '', column).split()[0] for column in inner.split(',')]
+
+
+def _convert_column(definition):
+    """
+    Переводит определение столбца MySQL в определение SQLite.
+
+    Возвращает:
+    ----------
+    tuple of (str, str, dict)
+        Имя столбца, тип SQLite и признаки: not_null, default, primary_key, auto_increment, unique.
+    """
+    match = re.match(r"(\w+)\s+(\w+)(\s*\((?:[^()']|'(?:[^'\\]|\\.|'')*')*\))?(.*)$", definition, re.S)
+    if not match:
+        raise ValueError(f"Unsupported column definition: {definition}")
+    name, mysql_type, _, rest = match.groups()
+    rest = re.sub(r"\bCOMMENT\s+'(?:[^'\\]|\\.|'')*'", '', rest, flags=re.I)
+
+    mysql_type = mysql_type.lower()
+    if mysql_type in _INTEGER_TYPES:
+        sqlite_type = 'INTEGER'
+    elif mysql_type in _NUMERIC_TYPES:
+        sqlite_type = 'NUMERIC'
+    elif mysql_type in _REAL_TYPES:
+        sqlite_type = 'REAL'
+    elif mysql_type in _STRING_TYPES:
+        # Как utf8mb4_0900_ai_ci в MySQL: сравнение и сортировка без учета регистра
+        sqlite_type = 'TEXT COLLATE NOCASE'
+    elif mysql_type in _TEXT_TYPES:
+        sqlite_type = 'TEXT'
+    else:
+        sqlite_type = 'BLOB'
+
+    default = re.search(r"\bDEFAULT\s+('(?:[^'\\]|\\.|'')*'|[-+]?\d+(?:\.\d+)?|NULL\b|CURRENT_TIMESTAMP\b)",
+                        rest, re.I)
+    attributes = {
+        'not_null': re.search(r'\bNOT\s+NULL\b', rest, re.I) is not None,
+        'default': default.group(1) if default else None,
+        'primary_key': re.search(r'\bPRIMARY\s+KEY\b', rest, re.I) is not None,
+        'auto_increment': re.search(r'\bAUTO_INCREMENT\b', rest, re.I) is not None,
+        'unique': re.search(r'\bUNIQUE\b', rest, re.I) is not None,
+    }
+    return name, sqlite_type, attributes
+
+
+def convert_create_table(statement, index_names=None):
+    """
+    Переводит CREATE TABLE MySQL в инструкции SQLite.
+
+    Первичный ключ из одного целочисленного столбца становится INTEGER PRIMARY KEY
+    (псевдонимом rowid), индексы KEY, INDEX и UNIQUE — отдельными CREATE INDEX,
+    индексы FULLTEXT и SPATIAL пропускаются.
+
+    Параметры:
+    ----------
+    statement : str
+        Инструкция CREATE TABLE.
+    index_names : set of str, optional
+        Уже занятые имена индексов: в SQLite они общие для всей базы, а не для таблицы.
+
+    Возвращает:
+    ----------
+    tuple of (str, list of str)
+        Имя таблицы и инструкции SQLite (DROP TABLE, CREATE TABLE и CREATE INDEX).
+    """
+    statement = statement.replace('`', '')
+    match = _CREATE_TABLE.match(statement)
+    if not match:
+        raise ValueError("Unsupported CREATE TABLE statement")
+    table = match.group(1)
+    body = statement[match.end():statement.rindex(')')]
+    index_names = set() if index_names is None else index_names
+
+    columns = []
+    primary_key = []
+    constraints = []
+    indexes = []
+    for definition in _split_definitions(body):
+        upper = definition.upper()
+        if upper.startswith('PRIMARY KEY'):
+            primary_key = _column_list(definition)
+        elif re.match(r'(UNIQUE\s+(KEY|INDEX)|KEY|INDEX)\b', upper):
+            unique = upper.startswith('UNIQUE')
+            name = re.match(r'(?:UNIQUE\s+)?(?:KEY|INDEX)\s+(\w+)', definition, re.I)
+            indexes.append((name.group(1) if name else None, unique, _column_list(definition)))
+        elif upper.startswith(('FULLTEXT', 'SPATIAL', 'CHECK')):
+            continue
+        elif upper.startswith(('CONSTRAINT', 'FOREIGN KEY')):
+            constraints.append(re.sub(r'\s+', ' ', definition))
+        else:
+            columns.append(_convert_column(definition))
+
+    types = {name: sqlite_type for name, sqlite_type, _ in columns}
+    inline_key = None
+    if len(primary_key) == 1 and types.get(primary_key[0]) == 'INTEGER':
+        inline_key = primary_key[0]
+        primary_key = []
+    for name, sqlite_type, attributes in columns:
+        if attributes['primary_key']:
+            if sqlite_type == 'INTEGER':
+                inline_key = name
+            else:
+                primary_key = [name]
+
+    lines = []
+    for name, sqlite_type, attributes in columns:
+        line = f"{name} {sqlite_type}"
+        if name == inline_key:
+            line = f"{name} INTEGER PRIMARY KEY" + (" AUTOINCREMENT" if attributes['auto_increment'] else "")
+        if attributes['not_null'] and name != inline_key:
+            line += " NOT NULL"
+        if attributes['unique'] and not attributes['primary_key']:
+            line += " UNIQUE"
+        if attributes['default'] is not None:
+            line += f" DEFAULT {attributes['default']}"
+        lines.append(line)
+    if primary_key:
+        lines.append(f"PRIMARY KEY ({', '.join(primary_key)})")
+    lines.extend(constraints)
+
+    statements = [f"DROP TABLE IF EXISTS {table}",
+                  f"CREATE TABLE {table} (\n    " + ",\n    ".join(lines) + "\n)"]
+    for name, unique, index_columns in indexes:
+        name = name or f"idx_{table}_{'_'.join(index_columns)}"
+        if name in index_names:
+            name = f"{table}_{name}"
+        index_names.add(name)
+        statements.append(f"CREATE {'UNIQUE ' if unique else ''}INDEX {name} ON {table} ({', '.join(index_columns)})")
+    return table, statements
+
+
+def _unescape(raw):
+    """
+    Раскрывает escape-последовательности строкового литерала MySQL.
+    """
+    def replace(match):
+        char = match.group(1)
+        if char is None:
+            return b"'"
+        if char in (b'%', b'_'):
+            # В MySQL \% и \_ сохраняют обратную косую черту
+            return b'\\' + char
+        return _ESCAPES.get(char, char)
+    return _ESCAPE.sub(replace, raw)
+
+
+def parse_insert(statement):
+    """
+    Разбирает INSERT ... VALUES MySQL.
+
+    Параметры:
+    ----------
+    statement : bytes
+        Инструкция INSERT.
+
+    Возвращает:
+    ----------
+    tuple of (str, list of str or None, list of tuple) or None
+        Таблица, список столбцов (None, если не указан) и строки значений;
+        None, если это не INSERT ... VALUES (например, INSERT ... SELECT).
+    """
+    match = _INSERT.match(statement)
+    if not match:
+        return None
+    table = match.group(1).decode('ascii')
+    columns = match.group(2)
+    if columns is not None:
+        columns = [column.strip().strip('`') for column in columns.decode('utf-8').split(',')]
+
+    rows = []
+    row = None
+    position = match.end()
+    length = len(statement)
+    while position < length:
+        token = _VALUE_TOKEN.match(statement, position)
+        if not token:
+            if statement[position:].strip():
+                raise ValueError(f"Unsupported value in INSERT into {table} at offset {position}")
+            break
+        position = token.end()
+        kind = token.lastgroup
+        if kind == 'open':
+            row = []
+        elif kind == 'close':
+            rows.append(tuple(row))
+            row = None
+        elif kind == 'comma':
+            continue
+        elif kind == 'binary':
+            row.append(_unescape(token.group('binary')))
+        elif kind == 'string':
+            row.append(_unescape(token.group('string')).decode('utf-8'))
+        elif kind == 'null':
+            row.append(None)
+        elif kind == 'number':
+            number = token.group('number')
+            row.append(float(number) if re.search(rb'[.eE]', number) else int(number))
+        else:
+            word = token.group('word').upper()
+            if word not in (b'TRUE', b'FALSE'):
+                raise ValueError(f"Unsupported value {word.decode()} in INSERT into {table}")
+            row.append(1 if word == b'TRUE' else 0)
+    return table, columns, rows
+
+
+def _film_details_trigger(name, event, table, films, when):
+    """
+    Возвращает триггер SQLite, пересчитывающий строки film_details для фильмов films.
+    """
+    condition = f"f.film_id IN ({films})"
+    when = f"\nWHEN {when}" if when else ""
+    return f"""CREATE TRIGGER {name} AFTER {event} ON {table}{when}
+BEGIN
+    DELETE FROM film_details WHERE film_id IN ({films});
+    {SQLiteBackend.FILM_DETAILS_INSERT}{SQLiteBackend.FILM_DETAILS_SELECT.format(condition=condition)};
+END"""
+
+
+def _finalize(connection):
+    """
+    Заполняет film_details и создает полнотекстовый индекс и триггеры SQLite.
+    """
+    for query, params in SQLiteBackend().film_details_refresh():
+        connection.execute(query.replace('%s', '?'), params or ())
+    for query in FULL_TEXT_SCHEMA:
+        connection.execute(query)
+    for trigger in FILM_DETAILS_TRIGGERS:
+        connection.execute(_film_details_trigger(*trigger))
+
+
+def import_scripts(path, scripts_dir=SCRIPTS_DIR, scripts=SCRIPTS, populate=None):
+    """
+    Собирает базу данных SQLite из скриптов MySQL.
+
+    Параметры:
+    ----------
+    path : str
+        Путь к создаваемому файлу базы данных (существующий файл заменяется).
+    scripts_dir : str, optional
+        Каталог со скриптами (по умолчанию database_scripts).
+    scripts : iterable of str, optional
+        Имена скриптов в порядке выполнения (по умолчанию SCRIPTS).
+    populate : callable, optional
+        Функция populate(cursor, backend), которая добавляет данные после скриптов, но до заполнения
+        film_details и создания триггеров, и возвращает количество добавленных строк по таблицам
+        (так генератор синтетического каталога не пересчитывает film_details на каждую строку).
+
+    Возвращает:
+    ----------
+    dict
+        Количество импортированных строк по таблицам.
+    """
+    temporary_path = path + '.tmp'
+    if os.path.exists(temporary_path):
+        os.remove(temporary_path)
+
+    counts = {}
+    index_names = set()
+    connection = sqlite3.connect(temporary_path, isolation_level=None)
+    try:
+        # Во время импорта журнал не нужен: при ошибке временный файл просто удаляется
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.execute("BEGIN")
+        for script in scripts:
+            with open(os.path.join(scripts_dir, script), 'rb') as f:
+                data = f.read()
+            for statement in iter_statements(data):
+                try:
+                    if _IS_CREATE_TABLE.match(statement):
+                        table, statements = convert_create_table(statement.decode('utf-8'), index_names)
+                        for query in statements:
+                            connection.execute(query)
+                        counts[table] = 0
+                        continue
+                    insert = parse_insert(statement)
+                    if insert is None:
+                        continue
+                    table, columns, rows = insert
+                    if not rows:
+                        continue
+                    target = f"{table} ({', '.join(columns)})" if columns else table
+                    placeholders = ', '.join(['?'] * len(rows[0]))
+                    connection.executemany(f"INSERT INTO {target} VALUES ({placeholders})", rows)
+                    counts[table] = counts.get(table, 0) + len(rows)
+                except (ValueError, sqlite3.Error) as error:
+                    head = statement[:80].decode('utf-8', 'replace')
+                    raise ValueError(f"{script}: cannot import statement '{head}...': {error}") from error
+        if populate is not None:
+            backend = SQLiteBackend()
+            backend.register_functions(connection)
+            for table, count in populate(SQLiteConnection(connection).cursor(), backend).items():
+                counts[table] = counts.get(table, 0) + count
+        _finalize(connection)
+        counts['film_details'] = connection.execute("SELECT COUNT(*) FROM film_details").fetchone()[0]
+        connection.execute("COMMIT")
+        connection.execute("ANALYZE")
+        # WAL позволяет читать базу, пока журнал запросов записывает в нее новые строки
+        connection.execute("PRAGMA journal_mode = WAL")
+    except BaseException:
+        connection.close()
+        os.remove(temporary_path)
+        raise
+    connection.close()
+    os.replace(temporary_path, path)
+    return counts
+
+
+def run_import(args):
+    """
+    Точка входа команды `import-sqlite`: собирает базу данных и выводит количество строк по таблицам.
+
+    Параметры:
+    ----------
+    args : argparse.Namespace
+        Аргументы команды: path, scripts_dir.
+    """
+    counts = import_scripts(args.path, args.scripts_dir or SCRIPTS_DIR)
+    for table, count in counts.items():
+        print(f"{table:<20} {count:>8}")
+    print(f"SQLite database written to {args.path}; set DATABASE_CONFIG = "
+          f"{{'backend': 'sqlite', 'database': '{args.path}'}} in config.py to use it.", file=sys.stderr)
@@ -0,0 +1,276 @@
+"""
+database/statements.py
+----------------------
+
+Этот модуль содержит реестр форм (shapes) запросов поиска и кэш подготовленных выражений.
+
+Форма запроса — набор признаков, от которых зависит текст SQL: какие фильтры заданы, сколько
+идентификаторов в списке IN (с округлением вверх до степени двойки), столбец и порядок сортировки
+и направление постраничной навигации. Значения фильтров в текст не входят и передаются параметрами,
+поэтому для одной формы текст запроса собирается один раз, а сервер разбирает и планирует его
+один раз на соединение: кэш хранит для каждого соединения пула подготовленные выражения
+(server-side prepared statements) по формам и выполняет их с новыми параметрами.
+
+Для SQLite отдельного выражения на сервере нет: модуль sqlite3 сам кэширует скомпилированные
+выражения соединения по тексту запроса, которому достаточно быть одинаковым для одной формы.
+
+Классы:
+-------
+SearchShape
+    Форма запроса поиска к film_details.
+
+QueryShapes
+    __init__(self, builder)
+        Инициализирует реестр форм запросов.
+
+    query(self, shape)
+        Возвращает текст запроса для формы.
+
+StatementCache
+    __init__(self, backend, max_per_connection=64)
+        Инициализирует кэш подготовленных выражений.
+
+    execute(self, connection, shape, query, params)
+        Выполняет запрос подготовленным выражением формы и возвращает строки.
+
+    discard(self, connection)
+        Забывает подготовленные выражения закрываемого соединения.
+
+Функции:
+--------
+id_list_bucket(count, max_ids)
+    Возвращает размер списка IN для количества идентификаторов.
+
+pad_ids(film_ids, size)
+    Дополняет список идентификаторов до размера списка IN.
+"""
+
+import threading
+from collections import OrderedDict, namedtuple
+
+# Форма запроса поиска: ids — размер списка IN (None — нет списка), genre/start_year/end_year — заданы ли
+# фильтры, sort_by и sort_order — проверенная сортировка, keyset — None, "next" или "prev",
+# limit — есть ли LIMIT (его нет у запроса, читающего все результаты)
+SearchShape = namedtuple('SearchShape', 'ids genre start_year end_year sort_by sort_order keyset limit')
+
+
+def id_list_bucket(count, max_ids):
+    """
+    Возвращает размер списка IN для количества идентификаторов.
+
+    Размер округляется вверх до степени двойки, чтобы число форм запроса было ограничено.
+
+    Параметры:
+    ----------
+    count : int
+        Количество идентификаторов.
+    max_ids : int
+        Наибольший размер списка для подготовленного выражения.
+
+    Возвращает:
+    ----------
+    int or None
+        Размер списка или None, если идентификаторов больше max_ids
+        (тогда запрос выполняется без подготовленного выражения).
+    """
+    size = 1
+    while size < count:
+        size *= 2
+    return size if size <= max_ids else None
+
+
+def pad_ids(film_ids, size):
+    """
+    Дополняет список идентификаторов до размера списка IN повтором последнего идентификатора.
+    Повторы в IN не меняют результат запроса.
+
+    Параметры:
+    ----------
+    film_ids : list of int
+        Идентификаторы фильмов (непустой список).
+    size : int
+        Размер списка IN.
+
+    Возвращает:
+    ----------
+    list of int
+        Список длины size.
+    """
+    return list(film_ids) + [film_ids[-1]] * (size - len(film_ids))
+
+
+class QueryShapes:
+    """
+    Реестр форм запросов: текст запроса собирается один раз для каждой формы.
+
+    Для одной формы всегда возвращается один и тот же объект строки — курсор подготовленных
+    выражений mysql.connector сравнивает запрос с предыдущим по ссылке.
+
+    Атрибуты:
+    ----------
+    builder : callable
+        Функция builder(shape), собирающая текст запроса для формы.
+
+    Методы:
+    -------
+    query(shape)
+        Возвращает текст запроса для формы.
+    """
+
+    def __init__(self, builder):
+        """
+        Инициализирует реестр форм запросов.
+
+        Параметры:
+        ----------
+        builder : callable
+            Функция builder(shape), собирающая текст запроса для формы.
+        """
+        self.builder = builder
+        self._queries = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._queries)
+
+    def query(self, shape):
+        """
+        Возвращает текст запроса для формы.
+
+        Параметры:
+        ----------
+        shape : tuple
+            Форма запроса (например, SearchShape).
+
+        Возвращает:
+        ----------
+        str
+            Текст запроса с параметрами %s.
+        """
+        query = self._queries.get(shape)
+        if query is None:
+            with self._lock:
+                query = self._queries.setdefault(shape, self.builder(shape))
+        return query
+
+
+class StatementCache:
+    """
+    Кэш подготовленных выражений по формам запросов для каждого соединения пула.
+
+    Соединение в каждый момент использует один поток, поэтому выражения одного соединения
+    не требуют блокировки; блокировка защищает только словарь соединений.
+
+    Атрибуты:
+    ----------
+    backend : StorageBackend
+        Хранилище, которое создает курсоры подготовленных выражений.
+    max_per_connection : int
+        Максимальное количество подготовленных выражений на соединение; давно не использованные
+        выражения закрываются (и освобождаются на сервере).
+    hits : int
+        Количество выполнений уже подготовленных выражений.
+    misses : int
+        Количество подготовок новых выражений.
+
+    Методы:
+    -------
+    execute(connection, shape, query, params)
+        Выполняет запрос подготовленным выражением формы и возвращает строки.
+    discard(connection)
+        Забывает подготовленные выражения закрываемого соединения.
+    """
+
+    def __init__(self, backend, max_per_connection=64):
+        """
+        Инициализирует кэш подготовленных выражений.
+
+        Параметры:
+        ----------
+        backend : StorageBackend
+            Хранилище, которое создает курсоры подготовленных выражений.
+        max_per_connection : int, optional
+            Максимальное количество подготовленных выражений на соединение (по умолчанию 64).
+        """
+        self.backend = backend
+        self.max_per_connection = max_per_connection
+        self.hits = 0
+        self.misses = 0
+        self._statements = {}
+        self._lock = threading.Lock()
+
+    def _cursor(self, connection, shape):
+        """
+        Возвращает курсор подготовленного выражения формы, создавая его при необходимости.
+        """
+        with self._lock:
+            statements = self._statements.setdefault(connection, OrderedDict())
+        cursor = statements.get(shape)
+        if cursor is not None:
+            statements.move_to_end(shape)
+            self.hits += 1
+            return cursor
+
+        self.misses += 1
+        cursor = self.backend.prepared_cursor(connection)
+        statements[shape] = cursor
+        if len(statements) > self.max_per_connection:
+            _, evicted = statements.popitem(last=False)
+            evicted.close()
+        return cursor
+
+    def execute(self, connection, shape, query, params):
+        """
+        Выполняет запрос подготовленным выражением формы и возвращает строки.
+
+        Параметры:
+        ----------
+        connection : mysql.connector.connection.MySQLConnection or SQLiteConnection
+            Соединение, полученное из пула.
+        shape : tuple or None
+            Форма запроса (None — выполнить обычным курсором без подготовки).
+        query : str
+            Текст запроса для формы (из QueryShapes).
+        params : list
+            Параметры запроса.
+
+        Возвращает:
+        ----------
+        list of dict
+            Строки результата.
+        """
+        if shape is None:
+            cursor = connection.cursor(dictionary=True)
+            try:
+                cursor.execute(query, params)
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+
+        cursor = self._cursor(connection, shape)
+        try:
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+        except self.backend.Error:
+            # Выражение могло остаться в неизвестном состоянии — при следующем вызове оно подготовится заново
+            self._statements.get(connection, {}).pop(shape, None)
+            try:
+                cursor.close()
+            except self.backend.Error:
+                pass
+            raise
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in rows]
+
+    def discard(self, connection):
+        """
+        Забывает подготовленные выражения закрываемого соединения
+        (на сервере они освобождаются вместе с соединением).
+
+        Параметры:
+        ----------
+        connection : mysql.connector.connection.MySQLConnection or SQLiteConnection
+            Закрываемое соединение.
+        """
+        with self._lock:
+            self._statements.pop(connection, None)
@@ -0,0 +1,289 @@
+"""
+database/trigram.py
+-------------------
+
+Этот модуль содержит класс TrigramIndex — инвертированный индекс по триграммам названий фильмов
+(и, при необходимости, описаний), который заменяет поиск `title LIKE %keyword%`.
+
+Каждая строка приводится к нижнему регистру без диакритики (как сравнение в MySQL
+с сопоставлением utf8mb4_0900_ai_ci) и разбивается на триграммы. Для подстроки берутся
+списки фильмов ее триграмм, пересекаются начиная с самого короткого, а оставшиеся кандидаты
+проверяются на точное вхождение подстроки.
+
+Классы:
+-------
+TrigramIndex
+    __init__(self, n=3, include_description=False)
+        Инициализирует пустой индекс.
+
+    build(self, rows)
+        Строит индекс по строкам film_details.
+
+    search(self, substring)
+        Возвращает идентификаторы фильмов, содержащих подстроку.
+
+    search_keywords(self, keywords, match_all=False)
+        Возвращает идентификаторы фильмов, подходящих под набор ключевых слов.
+
+    save(self, path, signature=None)
+        Сохраняет индекс в файл.
+
+    load(cls, path)
+        Загружает индекс из файла.
+
+Функции:
+--------
+normalize_text(text)
+    Приводит текст к виду, в котором он хранится в индексе.
+"""
+
+import json
+import os
+import time
+import unicodedata
+from array import array
+
+INDEX_FORMAT_VERSION = 1
+
+# Разделитель полей: не встречается в пользовательском вводе,
+# поэтому подстрока не может совпасть на стыке названия и описания
+FIELD_SEPARATOR = '\x00'
+
+
+def normalize_text(text):
+    """
+    Приводит текст к виду, в котором он хранится в индексе: нижний регистр без диакритики.
+
+    Параметры:
+    ----------
+    text : str
+        Исходный текст.
+
+    Возвращает:
+    ----------
+    str
+        Нормализованный текст.
+    """
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+class TrigramIndex:
+    """
+    Инвертированный индекс по n-граммам названий (и описаний) фильмов.
+
+    Атрибуты:
+    ----------
+    n : int
+        Длина n-граммы.
+    include_description : bool
+        Индексировать ли описание фильма вместе с названием.
+    signature : dict
+        Сведения о данных, по которым построен индекс (для проверки актуальности файла).
+
+    Методы:
+    -------
+    build(rows)
+        Строит индекс по строкам film_details.
+    search(substring)
+        Возвращает идентификаторы фильмов, содержащих подстроку.
+    search_keywords(keywords, match_all=False)
+        Возвращает идентификаторы фильмов, подходящих под набор ключевых слов.
+    save(path, signature=None)
+        Сохраняет индекс в файл.
+    load(path)
+        Загружает индекс из файла.
+    """
+
+    def __init__(self, n=3, include_description=False):
+        """
+        Инициализирует пустой индекс.
+
+        Параметры:
+        ----------
+        n : int, optional
+            Длина n-граммы (по умолчанию 3).
+        include_description : bool, optional
+            Индексировать ли описание фильма вместе с названием (по умолчанию False).
+        """
+        self.n = n
+        self.include_description = include_description
+        self.signature = None
+        self._texts = {}
+        self._postings = {}
+        self.loaded_at = time.monotonic()
+
+    def __len__(self):
+        return len(self._texts)
+
+    def _grams(self, text):
+        """
+        Возвращает множество n-грамм нормализованного текста.
+        """
+        return {text[i:i + self.n] for i in range(len(text) - self.n + 1)}
+
+    def _document_text(self, row):
+        """
+        Собирает индексируемый текст фильма из строки film_details.
+        """
+        text = normalize_text(row.get('title'))
+        if self.include_description:
+            text += FIELD_SEPARATOR + normalize_text(row.get('description'))
+        return text
+
+    def build(self, rows):
+        """
+        Строит индекс по строкам film_details.
+
+        Параметры:
+        ----------
+        rows : iterable of dict
+            Строки с ключами film_id, title и (при include_description) description.
+
+        Возвращает:
+        ----------
+        TrigramIndex
+            Этот же индекс.
+        """
+        texts = {}
+        postings = {}
+        for row in rows:
+            film_id = row['film_id']
+            text = self._document_text(row)
+            texts[film_id] = text
+            for gram in self._grams(text):
+                postings.setdefault(gram, []).append(film_id)
+
+        self._texts = texts
+        self._postings = {gram: array('I', sorted(ids)) for gram, ids in postings.items()}
+        return self
+
+    def search(self, substring):
+        """
+        Возвращает идентификаторы фильмов, содержащих подстроку.
+
+        Параметры:
+        ----------
+        substring : str
+            Искомая подстрока.
+
+        Возвращает:
+        ----------
+        set of int
+            Идентификаторы подходящих фильмов.
+        """
+        needle = normalize_text(substring)
+        if not needle:
+            return set(self._texts)
+
+        grams = self._grams(needle)
+        if not grams:
+            # Подстрока короче n-граммы: триграммы не помогают, проверяем все названия
+            return {film_id for film_id, text in self._texts.items() if needle in text}
+
+        posting_lists = []
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if not posting:
+                return set()
+            posting_lists.append(posting)
+        posting_lists.sort(key=len)
+
+        candidates = set(posting_lists[0])
+        for posting in posting_lists[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return candidates
+
+        # Совпадение всех триграмм еще не означает вхождение подстроки целиком
+        return {film_id for film_id in candidates if needle in self._texts[film_id]}
+
+    def search_keywords(self, keywords, match_all=False):
+        """
+        Возвращает идентификаторы фильмов, подходящих под набор ключевых слов.
+
+        Параметры:
+        ----------
+        keywords : list of str
+            Ключевые слова.
+        match_all : bool, optional
+            True — фильм должен содержать все ключевые слова (AND),
+            False — хотя бы одно (OR, по умолчанию).
+
+        Возвращает:
+        ----------
+        list of int
+            Отсортированный список идентификаторов фильмов.
+        """
+        result = None
+        for keyword in keywords:
+            matches = self.search(keyword)
+            if result is None:
+                result = matches
+            elif match_all:
+                result &= matches
+            else:
+                result |= matches
+            if match_all and not result:
+                break
+        return sorted(result or ())
+
+    def save(self, path, signature=None):
+        """
+        Сохраняет индекс в файл.
+
+        Параметры:
+        ----------
+        path : str
+            Путь к файлу индекса.
+        signature : dict, optional
+            Сведения о данных, по которым построен индекс.
+        """
+        if signature is not None:
+            self.signature = signature
+        data = {
+            'version': INDEX_FORMAT_VERSION,
+            'n': self.n,
+            'include_description': self.include_description,
+            'signature': self.signature,
+            'texts': {str(film_id): text for film_id, text in self._texts.items()},
+            'postings': {gram: list(ids) for gram, ids in self._postings.items()},
+        }
+        # Файл записывается целиком во временный и подменяется, поэтому сбой при записи не оставляет обрезанный индекс
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Загружает индекс из файла.
+
+        Параметры:
+        ----------
+        path : str
+            Путь к файлу индекса.
+
+        Возвращает:
+        ----------
+        TrigramIndex or None
+            Загруженный индекс или None, если файла нет, он поврежден
+            или создан другой версией формата.
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get('version') != INDEX_FORMAT_VERSION:
+            return None
+
+        try:
+            index = cls(n=data['n'], include_description=data['include_description'])
+            index.signature = data.get('signature')
+            index._texts = {int(film_id): text for film_id, text in data['texts'].items()}
+            index._postings = {gram: array('I', ids) for gram, ids in data['postings'].items()}
+        except (KeyError, TypeError, ValueError, OverflowError, AttributeError):
+            return None
+        return index
@@ -0,0 +1,216 @@
+-- Код на SQL для создания материализованной таблицы film_details с денормализованными данными о фильмах
+-- и триггеров, которые поддерживают ее в актуальном состоянии при изменении исходных таблиц.
+
+-- Использовать базу данных project_220424_oskolkov
+use project_220424_oskolkov;
+
+-- Удалить таблицу film_details, если она существует
+DROP TABLE IF EXISTS film_details;
+
+-- Создать таблицу film_details: одна строка на фильм со списками жанров и актеров
+CREATE TABLE film_details (
+    film_id SMALLINT UNSIGNED NOT NULL PRIMARY KEY, -- Идентификатор фильма (film.film_id)
+    title VARCHAR(128) NOT NULL, -- Название фильма
+    description TEXT, -- Описание фильма
+    genre VARCHAR(255), -- Жанры фильма через запятую (для вывода; поиск по жанру идет через film_category)
+    release_year YEAR, -- Год выпуска
+    actors TEXT, -- Актеры фильма через запятую
+    KEY idx_film_details_title (title),
+    KEY idx_film_details_release_year (release_year)
+);
+
+-- Удалить процедуры и триггеры, если они существуют
+DROP PROCEDURE IF EXISTS refresh_film_details;
+DROP PROCEDURE IF EXISTS refresh_film_details_for_actor;
+DROP PROCEDURE IF EXISTS refresh_film_details_for_category;
+DROP PROCEDURE IF EXISTS rebuild_film_details;
+DROP TRIGGER IF EXISTS film_details_film_insert;
+DROP TRIGGER IF EXISTS film_details_film_update;
+DROP TRIGGER IF EXISTS film_details_film_delete;
+DROP TRIGGER IF EXISTS film_details_film_actor_insert;
+DROP TRIGGER IF EXISTS film_details_film_actor_update;
+DROP TRIGGER IF EXISTS film_details_film_actor_delete;
+DROP TRIGGER IF EXISTS film_details_film_category_insert;
+DROP TRIGGER IF EXISTS film_details_film_category_update;
+DROP TRIGGER IF EXISTS film_details_film_category_delete;
+DROP TRIGGER IF EXISTS film_details_actor_update;
+DROP TRIGGER IF EXISTS film_details_category_update;
+
+DELIMITER //
+
+-- Пересчитать строку film_details для одного фильма (удаленный фильм просто исчезает из таблицы)
+CREATE PROCEDURE refresh_film_details(IN p_film_id SMALLINT UNSIGNED)
+BEGIN
+    DELETE FROM film_details WHERE film_id = p_film_id;
+
+    INSERT INTO film_details (film_id, title, description, genre, release_year, actors)
+    SELECT
+        f.film_id,
+        f.title,
+        f.description,
+        GROUP_CONCAT(DISTINCT c.name ORDER BY c.name SEPARATOR ', '),
+        f.release_year,
+        GROUP_CONCAT(DISTINCT CONCAT(a.first_name, ' ', a.last_name) SEPARATOR ', ')
+    FROM film f
+    LEFT JOIN film_category fc ON f.film_id = fc.film_id
+    LEFT JOIN category c ON fc.category_id = c.category_id
+    LEFT JOIN film_actor fa ON f.film_id = fa.film_id
+    LEFT JOIN actor a ON fa.actor_id = a.actor_id
+    WHERE f.film_id = p_film_id
+    GROUP BY f.film_id, f.title, f.description, f.release_year;
+END //
+
+-- Пересчитать строки film_details для всех фильмов актера (например, после изменения имени)
+CREATE PROCEDURE refresh_film_details_for_actor(IN p_actor_id SMALLINT UNSIGNED)
+BEGIN
+    DECLARE done INT DEFAULT FALSE;
+    DECLARE v_film_id SMALLINT UNSIGNED;
+    DECLARE films CURSOR FOR SELECT film_id FROM film_actor WHERE actor_id = p_actor_id;
+    DECLARE CONTINUE HANDLER FOR NOT FOUND SET done = TRUE;
+
+    OPEN films;
+    read_loop: LOOP
+        FETCH films INTO v_film_id;
+        IF done THEN
+            LEAVE read_loop;
+        END IF;
+        CALL refresh_film_details(v_film_id);
+    END LOOP;
+    CLOSE films;
+END //
+
+-- Пересчитать строки film_details для всех фильмов жанра (например, после переименования жанра)
+CREATE PROCEDURE refresh_film_details_for_category(IN p_category_id TINYINT UNSIGNED)
+BEGIN
+    DECLARE done INT DEFAULT FALSE;
+    DECLARE v_film_id SMALLINT UNSIGNED;
+    DECLARE films CURSOR FOR SELECT film_id FROM film_category WHERE category_id = p_category_id;
+    DECLARE CONTINUE HANDLER FOR NOT FOUND SET done = TRUE;
+
+    OPEN films;
+    read_loop: LOOP
+        FETCH films INTO v_film_id;
+        IF done THEN
+            LEAVE read_loop;
+        END IF;
+        CALL refresh_film_details(v_film_id);
+    END LOOP;
+    CLOSE films;
+END //
+
+-- Полностью перестроить film_details (используется при первичном заполнении)
+CREATE PROCEDURE rebuild_film_details()
+BEGIN
+    DELETE FROM film_details;
+
+    INSERT INTO film_details (film_id, title, description, genre, release_year, actors)
+    SELECT
+        f.film_id,
+        f.title,
+        f.description,
+        GROUP_CONCAT(DISTINCT c.name ORDER BY c.name SEPARATOR ', '),
+        f.release_year,
+        GROUP_CONCAT(DISTINCT CONCAT(a.first_name, ' ', a.last_name) SEPARATOR ', ')
+    FROM film f
+    LEFT JOIN film_category fc ON f.film_id = fc.film_id
+    LEFT JOIN category c ON fc.category_id = c.category_id
+    LEFT JOIN film_actor fa ON f.film_id = fa.film_id
+    LEFT JOIN actor a ON fa.actor_id = a.actor_id
+    GROUP BY f.film_id, f.title, f.description, f.release_year;
+END //
+
+-- Триггеры таблицы film
+CREATE TRIGGER film_details_film_insert AFTER INSERT ON film
+FOR EACH ROW
+BEGIN
+    CALL refresh_film_details(NEW.film_id);
+END //
+
+CREATE TRIGGER film_details_film_update AFTER UPDATE ON film
+FOR EACH ROW
+BEGIN
+    CALL refresh_film_details(NEW.film_id);
+    IF OLD.film_id <> NEW.film_id THEN
+        CALL refresh_film_details(OLD.film_id);
+    END IF;
+END //
+
+CREATE TRIGGER film_details_film_delete AFTER DELETE ON film
+FOR EACH ROW
+BEGIN
+    DELETE FROM film_details WHERE film_id = OLD.film_id;
+END //
+
+-- Триггеры таблицы film_actor
+CREATE TRIGGER film_details_film_actor_insert AFTER INSERT ON film_actor
+FOR EACH ROW
+BEGIN
+    CALL refresh_film_details(NEW.film_id);
+END //
+
+CREATE TRIGGER film_details_film_actor_update AFTER UPDATE ON film_actor
+FOR EACH ROW
+BEGIN
+    CALL refresh_film_details(NEW.film_id);
+    IF OLD.film_id <> NEW.film_id THEN
+        CALL refresh_film_details(OLD.film_id);
+    END IF;
+END //
+
+CREATE TRIGGER film_details_film_actor_delete AFTER DELETE ON film_actor
+FOR EACH ROW
+BEGIN
+    CALL refresh_film_details(OLD.film_id);
+END //
+
+-- Триггеры таблицы film_category
+CREATE TRIGGER film_details_film_category_insert AFTER INSERT ON film_category
+FOR EACH ROW
+BEGIN
+    CALL refresh_film_details(NEW.film_id);
+END //
+
+CREATE TRIGGER film_details_film_category_update AFTER UPDATE ON film_category
+FOR EACH ROW
+BEGIN
+    CALL refresh_film_details(NEW.film_id);
+    IF OLD.film_id <> NEW.film_id THEN
+        CALL refresh_film_details(OLD.film_id);
+    END IF;
+END //
+
+CREATE TRIGGER film_details_film_category_delete AFTER DELETE ON film_category
+FOR EACH ROW
+BEGIN
+    CALL refresh_film_details(OLD.film_id);
+END //
+
+-- Триггеры таблиц actor и category (меняются только имена, которые входят в списки)
+CREATE TRIGGER film_details_actor_update AFTER UPDATE ON actor
+FOR EACH ROW
+BEGIN
+    IF OLD.first_name <> NEW.first_name OR OLD.last_name <> NEW.last_name THEN
+        CALL refresh_film_details_for_actor(NEW.actor_id);
+    END IF;
+END //
+
+CREATE TRIGGER film_details_category_update AFTER UPDATE ON category
+FOR EACH ROW
+BEGIN
+    IF OLD.name <> NEW.name THEN
+        CALL refresh_film_details_for_category(NEW.category_id);
+    END IF;
+END //
+
+DELIMITER ;
+
+-- Первичное заполнение таблицы
+CALL rebuild_film_details();
+
+-- Комментарии:
+-- - film_details заменяет CTE, который раньше пересчитывался при каждом поиске:
+--   поиск читает готовые строки и фильтрует их по индексам title и release_year.
+-- - Столбец genre — список всех жанров фильма через запятую, поэтому равенство с одним жанром
+--   теряло бы фильмы с несколькими жанрами. Поиск по жанру проверяет принадлежность фильма жанру
+--   через film_category и category (индекс film_category по category_id), а индексов по genre нет.
+-- - Строки пересчитываются по одной при изменении film, film_actor, film_category, actor и category.
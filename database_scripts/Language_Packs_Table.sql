@@ -92,7 +92,15 @@ INSERT INTO localized_text (language_id, text_key, text_value) VALUES
 (1, 'logout_successful', 'Logout successful.'),
 (1, 'login_prompt', 'Login:'),
 (1, 'login_successful', 'Login successful'),
-(1, 'login_failed', 'Login failed. Please check your credentials and try again.');
+(1, 'login_failed', 'Login failed. Please check your credentials and try again.'),
+(1, 'search_mode_prompt', 'Search mode (1 - by title, 2 - full-text, 3 - full-text boolean; Enter - by title): '),
+(1, 'search_mode', 'Search mode'),
+(1, 'page_navigation_hint', 'n - next page, p - previous page'),
+(1, 'no_more_pages', 'No more pages.'),
+(1, 'query_stats', 'Database query statistics (times in ms):'),
+(1, 'no_query_stats', 'No database queries have been measured yet.'),
+(1, 'profiling_started', 'Profiling started. Enter "prof" again to stop and save the profiles.'),
+(1, 'profiling_saved', 'Profiling stopped. Saved files: {}');
 
 -- Вставить локализованные тексты для немецкого языка (language_id = 2)
 INSERT INTO localized_text (language_id, text_key, text_value) VALUES
@@ -154,7 +162,15 @@ INSERT INTO localized_text (language_id, text_key, text_value) VALUES
 (2, 'logout_successful', 'Abmeldung erfolgreich.'),
 (2, 'login_prompt', 'Anmeldung:'),
 (2, 'login_successful', 'Anmeldung erfolgreich'),
-(2, 'login_failed', 'Anmeldung fehlgeschlagen. Bitte überprüfen Sie Ihre Anmeldeinformationen und versuchen Sie es erneut.');
+(2, 'login_failed', 'Anmeldung fehlgeschlagen. Bitte überprüfen Sie Ihre Anmeldeinformationen und versuchen Sie es erneut.'),
+(2, 'search_mode_prompt', 'Suchmodus (1 - nach Titel, 2 - Volltext, 3 - Volltext boolesch; Enter - nach Titel): '),
+(2, 'search_mode', 'Suchmodus'),
+(2, 'page_navigation_hint', 'n - nächste Seite, p - vorherige Seite'),
+(2, 'no_more_pages', 'Keine weiteren Seiten.'),
+(2, 'query_stats', 'Statistik der Datenbankabfragen (Zeiten in ms):'),
+(2, 'no_query_stats', 'Es wurden noch keine Datenbankabfragen gemessen.'),
+(2, 'profiling_started', 'Profiling gestartet. Geben Sie erneut "prof" ein, um es zu beenden und die Profile zu speichern.'),
+(2, 'profiling_saved', 'Profiling beendet. Gespeicherte Dateien: {}');
 
 -- Вставить локализованные тексты для русского языка (language_id = 3)
 INSERT INTO localized_text (language_id, text_key, text_value) VALUES
@@ -216,7 +232,15 @@ INSERT INTO localized_text (language_id, text_key, text_value) VALUES
 (3, 'logout_successful', 'Выход выполнен успешно.'),
 (3, 'login_prompt', 'Вход:'),
 (3, 'login_successful', 'Вход успешно выполнен'),
-(3, 'login_failed', 'Ошибка входа. Пожалуйста, проверьте ваши учетные данные и попробуйте снова.');
+(3, 'login_failed', 'Ошибка входа. Пожалуйста, проверьте ваши учетные данные и попробуйте снова.'),
+(3, 'search_mode_prompt', 'Режим поиска (1 - по названию, 2 - полнотекстовый, 3 - полнотекстовый булев; Enter - по названию): '),
+(3, 'search_mode', 'Режим поиска'),
+(3, 'page_navigation_hint', 'n - следующая страница, p - предыдущая страница'),
+(3, 'no_more_pages', 'Больше страниц нет.'),
+(3, 'query_stats', 'Статистика запросов к базе данных (время в мс):'),
+(3, 'no_query_stats', 'Запросы к базе данных еще не измерялись.'),
+(3, 'profiling_started', 'Профилирование запущено. Введите "prof" еще раз, чтобы остановить его и сохранить профили.'),
+(3, 'profiling_saved', 'Профилирование остановлено. Сохраненные файлы: {}');
 
 -- Вставить локализованные тексты для украинского языка (language_id = 4)
 INSERT INTO localized_text (language_id, text_key, text_value) VALUES
@@ -278,7 +302,15 @@ INSERT INTO localized_text (language_id, text_key, text_value) VALUES
 (4, 'logout_successful', 'Вихід із системи успішний.'),
 (4, 'login_prompt', 'Логін:'),
 (4, 'login_successful', 'Вхід успішний'),
-(4, 'login_failed', 'Невдалий вхід. Перевірте свої облікові дані та спробуйте ще раз.');
+(4, 'login_failed', 'Невдалий вхід. Перевірте свої облікові дані та спробуйте ще раз.'),
+(4, 'search_mode_prompt', 'Режим пошуку (1 - за назвою, 2 - повнотекстовий, 3 - повнотекстовий булевий; Enter - за назвою): '),
+(4, 'search_mode', 'Режим пошуку'),
+(4, 'page_navigation_hint', 'n - наступна сторінка, p - попередня сторінка'),
+(4, 'no_more_pages', 'Більше сторінок немає.'),
+(4, 'query_stats', 'Статистика запитів до бази даних (час у мс):'),
+(4, 'no_query_stats', 'Запити до бази даних ще не вимірювалися.'),
+(4, 'profiling_started', 'Профілювання запущено. Введіть "prof" ще раз, щоб зупинити його та зберегти профілі.'),
+(4, 'profiling_saved', 'Профілювання зупинено. Збережені файли: {}');
 
 -- Вставить локализованные тексты для грузинского языка (language_id = 5)
 INSERT INTO localized_text (language_id, text_key, text_value) VALUES
@@ -340,4 +372,12 @@ INSERT INTO localized_text (language_id, text_key, text_value) VALUES
 (5, 'logout_successful', 'გამოსვლა წარმატებით.'),
 (5, 'login_prompt', 'შესვლა:'),
 (5, 'login_successful', 'შესვლა წარმატებით'),
-(5, 'login_failed', 'შესვლა ვერ მოხერხდა. გთხოვთ, შეამოწმეთ თქვენი მონაცემები და სცადოთ თავიდან.');
\ No newline at end of file
+(5, 'login_failed', 'შესვლა ვერ მოხერხდა. გთხოვთ, შეამოწმეთ თქვენი მონაცემები და სცადოთ თავიდან.'),
+(5, 'search_mode_prompt', 'ძიების რეჟიმი (1 - სათაურით, 2 - სრულტექსტური, 3 - სრულტექსტური ლოგიკური; Enter - სათაურით): '),
+(5, 'search_mode', 'ძიების რეჟიმი'),
+(5, 'page_navigation_hint', 'n - შემდეგი გვერდი, p - წინა გვერდი'),
+(5, 'no_more_pages', 'მეტი გვერდი არ არის.'),
+(5, 'query_stats', 'მონაცემთა ბაზის მოთხოვნების სტატისტიკა (დრო მწ-ში):'),
+(5, 'no_query_stats', 'მონაცემთა ბაზის მოთხოვნები ჯერ არ გაზომილა.'),
+(5, 'profiling_started', 'პროფილირება დაიწყო. შეიყვანეთ "prof" ხელახლა, რომ შეაჩეროთ და შეინახოთ პროფილები.'),
+(5, 'profiling_saved', 'პროფილირება შეჩერდა. შენახული ფაილები: {}');
\ No newline at end of file
@@ -66,7 +66,15 @@ INSERT INTO localized_text (language_id, text_key, text_value) VALUES
 (6, 'logout_successful', 'Выхад паспяховы.'),
 (6, 'login_prompt', 'Уваход:'),
 (6, 'login_successful', 'Уваход паспяховы'),
-(6, 'login_failed', 'Уваход не ўдалось. Калі ласка, праверце вашыя крэдыціці і паспрабуйце яшчэ раз.'); -- Вставляем локализованные тексты для белорусского языка
+(6, 'login_failed', 'Уваход не ўдалось. Калі ласка, праверце вашыя крэдыціці і паспрабуйце яшчэ раз.'),
+(6, 'search_mode_prompt', 'Рэжым пошуку (1 - па назве, 2 - паўнатэкставы, 3 - паўнатэкставы булеў; Enter - па назве): '),
+(6, 'search_mode', 'Рэжым пошуку'),
+(6, 'page_navigation_hint', 'n - наступная старонка, p - папярэдняя старонка'),
+(6, 'no_more_pages', 'Больш старонак няма.'),
+(6, 'query_stats', 'Статыстыка запытаў да базы даных (час у мс):'),
+(6, 'no_query_stats', 'Запыты да базы даных яшчэ не вымяраліся.'),
+(6, 'profiling_started', 'Прафіляванне запушчана. Увядзіце "prof" яшчэ раз, каб спыніць яго і захаваць профілі.'),
+(6, 'profiling_saved', 'Прафіляванне спынена. Захаваныя файлы: {}'); -- Вставляем локализованные тексты для белорусского языка
 
 -- Дополнительные вставки записей для белорусского языка в таблицу localized_text для других языков
 -- Английский
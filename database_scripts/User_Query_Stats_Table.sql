@@ -0,0 +1,27 @@
+-- Удаление таблицы user_query_stats, если она существует
+DROP TABLE IF EXISTS user_query_stats;
+
+-- Создание таблицы со счетчиками поисковых запросов (свертка таблицы user_queries)
+CREATE TABLE user_query_stats (
+    search_type VARCHAR(50) NOT NULL, -- Тип поискового запроса
+    params_hash CHAR(64) NOT NULL, -- SHA-256 от параметров запроса в каноническом виде JSON
+    search_params JSON NOT NULL, -- Параметры поискового запроса в формате JSON
+    query_count INT UNSIGNED NOT NULL DEFAULT 0, -- Количество таких запросов
+    last_query_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP, -- Время последнего запроса
+    PRIMARY KEY (search_type, params_hash),
+    KEY idx_query_count (query_count)
+);
+
+-- Первичное заполнение счетчиков по уже накопленному журналу
+INSERT INTO user_query_stats (search_type, params_hash, search_params, query_count)
+SELECT search_type, SHA2(CAST(search_params AS CHAR), 256), search_params, COUNT(*)
+FROM user_queries
+GROUP BY search_type, search_params;
+
+-- Комментарии к столбцам:
+-- - params_hash: JSON нельзя включить в первичный ключ, поэтому запросы различаются по хешу.
+--   MySQL хранит JSON в каноническом виде (с упорядоченными ключами), и хеш считается от него,
+--   поэтому одинаковые параметры с разным порядком ключей попадают в одну строку.
+-- - query_count: увеличивается приложением (QueryLogger) в той же транзакции, что и запись в user_queries.
+
+-- Популярные запросы читаются по индексу idx_query_count и не требуют группировки всего журнала.
@@ -2,13 +2,18 @@
 CREATE TABLE users (
     id INT AUTO_INCREMENT PRIMARY KEY, -- Уникальный идентификатор пользователя
     username VARCHAR(255) NOT NULL, -- Имя пользователя, обязательное поле
-    password VARCHAR(255) NOT NULL -- Пароль пользователя, обязательное поле
+    password VARCHAR(255) NOT NULL, -- Пароль пользователя, обязательное поле
+    UNIQUE INDEX uq_users_username (username) -- Уникальный индекс для входа и регистрации по имени
 );
 
+-- Для уже созданной таблицы индекс добавляется командой (приложение выполняет ее само при запуске,
+-- если индекса нет и в таблице нет повторяющихся имен):
+-- ALTER TABLE users ADD UNIQUE INDEX uq_users_username (username);
+
 -- Комментарии к столбцам:
 -- - id: Уникальный номер пользователя, автоинкрементируемый
 -- - username: Имя пользователя, используемое для входа в систему
 -- - password: Хэшированный пароль пользователя для безопасного хранения
 
 -- Предполагается, что в данной таблице будут храниться учетные записи пользователей,
--- где каждая запись имеет уникальный id, имя пользователя и захэшированный пароль.
\ No newline at end of file
+-- где каждая запись имеет уникальный id, имя пользователя и захэшированный пароль.
@@ -16,7 +16,7 @@ FilmSearchApp:
 Импортируемые модули, необходимые для работы приложения:
 - DatabaseManager из database
 - AuthManager из authentication
-- load_localization_texts_from_file из utils
+- load_localization_texts_from_file, ScreenRenderer и StartupProfiler из utils
 - QueryLogger из log_manager
 - json
 
@@ -29,11 +29,14 @@ FilmSearchApp:
 
 Методы:
 -------
-- __init__(self, db_config, language_file='language_pack.json', state_file='user_state.json'):
+- __init__(self, db_config, language_file='language_pack.json', state_file='user_state.json', profiler=None):
     Инициализация приложения, загрузка конфигураций, создание менеджеров и установка состояния.
 
 - start(self):
-    Начало работы приложения, устанавливает соединение с базой данных и запускает главное меню.
+    Начало работы приложения, запуск фонового прогрева и главного меню.
+
+- prewarm(self):
+    Параллельный прогрев данных, нужных главному меню и поиску.
 
 - run_main_menu(self):
     Запуск главного меню, которое отображает пользователю опции и обрабатывает их выбор.
@@ -48,13 +51,16 @@ FilmSearchApp:
     Отображение информации о текущем пользователе, включая его идентификатор и имя.
 
 - app_exit(self):
-    Выход из приложения, отключение от базы данных и очистка данных.
+    Выход из приложения, отключение от базы данных, закрытие пула соединений и очистка данных.
 
 - process_choice(self, choice):
     Обработка выбора пользователя из главного меню: вызов соответствующей функции в зависимости от выбора.
 
 - search_movies_by_keyword(self):
-    Поиск фильмов по ключевым словам.
+    Поиск фильмов по ключевым словам (по названию или полнотекстовый).
+
+- select_search_mode(self):
+    Выбор режима поиска по ключевым словам.
 
 - search_movies_by_genre(self):
     Поиск фильмов по жанру.
@@ -86,9 +92,24 @@ FilmSearchApp:
 - select_language(self):
     Выбор нового языка интерфейса из доступных опций.
 
+- show_search_page(self, fetch_page, cursor=None, direction='next'):
+    Отображение страницы результатов поиска и запоминание ее для постраничной навигации.
+
+- next_page(self):
+    Переход на следующую страницу результатов последнего поиска.
+
+- previous_page(self):
+    Переход на предыдущую страницу результатов последнего поиска.
+
 - display_results(self, results=None):
     Отображение результатов поиска фильмов в форматированном виде.
 
+- display_query_stats(self):
+    Отображение статистики времени выполнения запросов к базе данных.
+
+- toggle_profiling(self):
+    Запуск или остановка профилирования сеанса (скрытая команда 'prof').
+
 Примечания:
 -----------
 - Приложение использует различные модули для работы с базой данных, аутентификации,
@@ -97,11 +118,15 @@ FilmSearchApp:
 - Класс `FilmSearchApp` организует весь функционал в удобный и легко расширяемый интерфейс поиска фильмов.
 """
 
-from database import DatabaseManager
+from database import DatabaseManager, close_connection_pools, get_query_stats
 from authentication import AuthManager
-from utils import load_localization_texts_from_file
+from utils import ScreenRenderer, SessionProfiler, StartupProfiler, load_localization_texts_from_file
 from log_manager import QueryLogger
+from config import QUERY_STATS_CONFIG, STARTUP_CONFIG
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import partial
 import json
+import sys
 
 
 class FilmSearchApp:
@@ -110,11 +135,14 @@ class FilmSearchApp:
 
     Методы:
     -------
-    - __init__(self, db_config, language_file='language_pack.json', state_file='user_state.json'):
+    - __init__(self, db_config, language_file='language_pack.json', state_file='user_state.json', profiler=None):
         Инициализация приложения, загрузка конфигураций, создание менеджеров и установка состояния.
 
     - start(self):
-        Начало работы приложения, устанавливает соединение с базой данных и запускает главное меню.
+        Начало работы приложения, запуск фонового прогрева и главного меню.
+
+    - prewarm(self):
+        Параллельный прогрев данных, нужных главному меню и поиску.
 
     - run_main_menu(self):
         Запуск главного меню, которое отображает пользователю опции и обрабатывает их выбор.
@@ -135,7 +163,10 @@ class FilmSearchApp:
         Обработка выбора пользователя из главного меню: вызов соответствующей функции в зависимости от выбора.
 
     - search_movies_by_keyword(self):
-        Поиск фильмов по ключевым словам.
+        Поиск фильмов по ключевым словам (по названию или полнотекстовый).
+
+    - select_search_mode(self):
+        Выбор режима поиска по ключевым словам.
 
     - search_movies_by_genre(self):
         Поиск фильмов по жанру.
@@ -167,14 +198,34 @@ class FilmSearchApp:
     - select_language(self):
         Выбор нового языка интерфейса из доступных опций.
 
+    - show_search_page(self, fetch_page, cursor=None, direction='next'):
+        Отображение страницы результатов поиска и запоминание ее для постраничной навигации.
+
+    - next_page(self):
+        Переход на следующую страницу результатов последнего поиска.
+
+    - previous_page(self):
+        Переход на предыдущую страницу результатов последнего поиска.
+
     - display_results(self, results=None):
         Отображение результатов поиска фильмов в форматированном виде.
+
+    - display_query_stats(self):
+        Отображение статистики времени выполнения запросов к базе данных.
+
+    - toggle_profiling(self):
+        Запуск или остановка профилирования сеанса (скрытая команда 'prof').
     """
 
-    def __init__(self, db_config, language_file='language_pack.json', state_file='user_state.json'):
+    def __init__(self, db_config, language_file='language_pack.json', state_file='user_state.json', profiler=None,
+                 session_profiler=None):
         """
         Инициализация приложения, загрузка конфигураций, создание менеджеров и установка состояния.
 
+        Конструктор не обращается к базе данных (кроме первого запуска, когда еще нет файла
+        локализации): соединения открываются при первом запросе, а данные для главного меню
+        загружаются в фоне методом prewarm().
+
         Параметры:
         ----------
         - db_config: dict
@@ -183,14 +234,24 @@ class FilmSearchApp:
             Файл с текстами локализации (по умолчанию 'language_pack.json').
         - state_file: str
             Файл состояния пользователя (по умолчанию 'user_state.json').
-        """
-        self.localization_manager = load_localization_texts_from_file(language_file)
-        self.db_manager = DatabaseManager(**db_config)
-        self.db_manager.connect()
-        self.auth_manager = AuthManager(self.localization_manager, self.db_manager, state_file)
-        self.result = self.display_results(self.db_manager.get_random_movies())
-        self.query_logger = QueryLogger()
-        self.db_manager.disconnect()
+        - profiler: StartupProfiler
+            Объект для замера этапов запуска (по умолчанию замер выключен).
+        - session_profiler: SessionProfiler
+            Профилировщик сеанса (по умолчанию не запущен; его запускает скрытая команда 'prof').
+        """
+        self.profiler = profiler or StartupProfiler()
+        self.session_profiler = session_profiler or SessionProfiler()
+        with self.profiler.phase('localization'):
+            self.localization_manager = load_localization_texts_from_file(language_file)
+        with self.profiler.phase('managers'):
+            self.db_manager = DatabaseManager(**db_config)
+            self.auth_manager = AuthManager(self.localization_manager, self.db_manager, state_file,
+                                            validate_state=False)
+            self.renderer = ScreenRenderer(self.localization_manager)
+            self.query_logger = QueryLogger()
+        self.result = ''
+        self.search_pager = None
+        self.search_page = None
         self.header = '''+----------------------------------------------------------+
 |   _____ _             __  __               _             |  
 |  |_   _| |__   ___   |  \/  | ___ __    __(_) ___  ___   |
@@ -202,20 +263,59 @@ class FilmSearchApp:
 
     def start(self):
         """
-        Начало работы приложения, устанавливает соединение с базой данных и запускает главное меню.
+        Начало работы приложения, запуск фонового прогрева и главного меню.
+
+        Первый кадр ждет случайные фильмы для баннера не дольше STARTUP_CONFIG['first_frame_timeout'];
+        если они не успели загрузиться, баннер появится со следующим кадром.
         """
         self.db_manager.connect()
+        random_movies = self.prewarm()
+        try:
+            self.result = self.display_results(random_movies.result(timeout=STARTUP_CONFIG['first_frame_timeout']))
+        except FutureTimeoutError:
+            pass
         self.run_main_menu()
 
+    def prewarm(self):
+        """
+        Параллельный прогрев данных, нужных главному меню и поиску: случайные фильмы для баннера,
+        категории, каталог языков, перепроверка сохраненной сессии пользователя,
+        проверка уникального индекса по имени пользователя и загрузка столбцового каталога
+        (если выбран движок поиска 'columnar').
+
+        Возвращает:
+        ----------
+        - concurrent.futures.Future
+            Результат загрузки случайных фильмов для баннера.
+        """
+        tasks = {
+            'random_movies': self.db_manager.get_random_movies,
+            'categories': self.db_manager.get_categories,
+            'language_catalog': self.db_manager.get_language_catalog,
+            'session': self.auth_manager.validate_session,
+            'username_index': self.auth_manager.ensure_username_index,
+            'columnar_catalog': self.db_manager.get_columnar_catalog,
+        }
+        executor = ThreadPoolExecutor(max_workers=STARTUP_CONFIG['prewarm_workers'], thread_name_prefix='prewarm')
+        futures = {name: executor.submit(self.profiler.timed(name, task)) for name, task in tasks.items()}
+        executor.shutdown(wait=False)
+        return futures['random_movies']
+
     def run_main_menu(self):
         """
         Запуск главного меню, которое отображает пользователю опции и обрабатывает их выбор.
         """
         while True:
             self.display_menu()
+            if self.profiler.enabled:
+                # Отчет о запуске выводится один раз, сразу после первого кадра
+                sys.stderr.write(self.profiler.report() + '\n')
+                self.profiler.enabled = False
             choice = input(self.localization_manager.get_localized_text('choose_option'))
-            self.result = self.display_results(self.db_manager.get_random_movies())
-            self.process_choice(choice)
+            # Действие пользователя профилируется целиком, если профилирование сеанса запущено
+            with self.session_profiler.action():
+                self.result = self.display_results(self.db_manager.get_random_movies())
+                self.process_choice(choice)
 
     @staticmethod
     def get_chunks(lst, chunk_size):
@@ -240,45 +340,12 @@ class FilmSearchApp:
     def display_menu(self):
         """
         Отображение главного меню с различными опциями, включая смену языка и текущее состояние пользователя.
-        """
-        menu_items = [self.localization_manager.get_localized_text('change_language'),
-                      self.localization_manager.get_localized_text('display_popular_queries')]
 
-        if self.auth_manager.user_id != 0:
-            menu_items.extend([
-                '{}'.format(self.auth_manager.username),
-                self.localization_manager.get_localized_text('logout'),
-                self.localization_manager.get_localized_text('exit'),
-            ])
-        else:
-            menu_items.extend([
-                self.localization_manager.get_localized_text('register'),
-                self.localization_manager.get_localized_text('login'),
-                self.localization_manager.get_localized_text('exit'),
-            ])
-
-        menu_items.extend([
-            self.localization_manager.get_localized_text('search_keyword'),
-            self.localization_manager.get_localized_text('search_genre'),
-            self.localization_manager.get_localized_text('search_year'),
-            self.localization_manager.get_localized_text('search_actor'),
-            self.localization_manager.get_localized_text('search_multiple_criteria'),
-        ])
-
-        result_display = []
-        for idx, item in enumerate(menu_items, start=1):
-            item_string = f'|[{idx}]{item}|'
-            item_string = f'+{"-" * (len(item_string) - 2)}+\n{item_string}\n+{"-" * (len(item_string) - 2)}+'
-            result_display.append(item_string.split('\n'))
-
-        print(self.header)
-        chunk_size = 5
-        for chunk in self.get_chunks(result_display, chunk_size):
-            chunk = list(zip(*chunk))
-            for string in chunk:
-                print(' '.join(string))
-
-        print(self.result)
+        Разметка меню собирается один раз для языка и состояния входа (см. utils/rendering.py),
+        а весь кадр выводится одной записью.
+        """
+        username = self.auth_manager.username if self.auth_manager.user_id != 0 else None
+        self.renderer.write_frame(self.header, self.renderer.render_menu(username), self.result)
 
     def user_display(self):
         """
@@ -303,20 +370,40 @@ class FilmSearchApp:
         Выход из приложения, отключение от базы данных и очистка данных.
         """
         print(self.localization_manager.get_localized_text('app_exit_message'))
+        self.localization_manager.close()
         if self.query_logger:
-            del self.query_logger
+            # Дожидаемся записи журнала запросов, накопленного в фоновом режиме
+            self.query_logger.close()
         self.db_manager.disconnect()
+        close_connection_pools()
         exit()
 
     def process_choice(self, choice):
         """
         Обработка выбора пользователя из главного меню: вызов соответствующей функции в зависимости от выбора.
+        Команды 'n' (или '>') и 'p' (или '<') листают страницы результатов последнего поиска,
+        команда 's' показывает статистику запросов к базе данных.
+        Скрытая команда 'prof' запускает и останавливает профилирование сеанса.
 
         Параметры:
         ----------
         - choice: str
             Выбор пользователя.
         """
+        command = choice.strip().lower()
+        if command in ('n', '>'):
+            self.next_page()
+            return
+        if command in ('p', '<'):
+            self.previous_page()
+            return
+        if command in ('s', 'stats'):
+            self.display_query_stats()
+            return
+        if command == 'prof':
+            self.toggle_profiling()
+            return
+
         if self.auth_manager.user_id != 0:
             choice3 = self.user_display
             choice4 = self.logout_user
@@ -344,21 +431,36 @@ class FilmSearchApp:
 
     def search_movies_by_keyword(self):
         """
-        Поиск фильмов по ключевым словам.
+        Поиск фильмов по ключевым словам (по названию или полнотекстовый).
         """
         keywords = input(self.localization_manager.get_localized_text('enter_keyword'))
-        self.query_logger.log_keyword_search(self.auth_manager.user_id, keywords)
-        keywords = keywords.split()
-        self.result = self.display_results(self.db_manager.search_movies(keywords=keywords))
+        mode = self.select_search_mode()
+        self.query_logger.log_keyword_search(self.auth_manager.user_id, keywords, mode)
+        if mode == 'title':
+            self.show_search_page(partial(self.db_manager.search_movies_page, keywords=keywords.split()))
+        else:
+            self.show_search_page(partial(self.db_manager.full_text_search_page, keywords, mode=mode))
+
+    def select_search_mode(self):
+        """
+        Выбор режима поиска по ключевым словам.
+
+        Возвращает:
+        ----------
+        - str
+            'title' — поиск по названию, 'natural' или 'boolean' — полнотекстовый поиск.
+        """
+        choice = input(self.localization_manager.get_localized_text('search_mode_prompt')).strip()
+        return {'2': 'natural', '3': 'boolean'}.get(choice, 'title')
 
     def search_movies_by_genre(self):
         """
         Поиск фильмов по жанру.
         """
-        print('\n'.join(self.db_manager.fetch_column('category', 'name')))
+        print('\n'.join(self.db_manager.get_categories().values()))
         genre = input(self.localization_manager.get_localized_text('enter_genre'))
         self.query_logger.log_genre_search(self.auth_manager.user_id, genre)
-        self.result = self.display_results(self.db_manager.search_movies(genre=genre))
+        self.show_search_page(partial(self.db_manager.search_movies_page, genre=genre))
 
     def search_movies_by_year(self):
         """
@@ -366,7 +468,7 @@ class FilmSearchApp:
         """
         year = input(self.localization_manager.get_localized_text('enter_year'))
         self.query_logger.log_year_search(self.auth_manager.user_id, year)
-        self.result = self.display_results(self.db_manager.search_movies(start_year=year, end_year=year))
+        self.show_search_page(partial(self.db_manager.search_movies_page, start_year=year, end_year=year))
 
     def search_movies_by_actor(self):
         """
@@ -374,32 +476,51 @@ class FilmSearchApp:
         """
         actor = input(self.localization_manager.get_localized_text('enter_actor'))
         self.query_logger.log_actor_search(self.auth_manager.user_id, actor)
-        self.result = self.display_results(self.db_manager.search_movies(actor_name=actor))
+        self.show_search_page(partial(self.db_manager.search_movies_page, actor_name=actor))
 
     def search_movies_by_multiple_criteria(self):
         """
         Поиск фильмов по нескольким критериям: ключевым словам, жанру, году выпуска, актерам.
         """
         keywords = input(self.localization_manager.get_localized_text('enter_keyword_optional'))
-        print('\n'.join(self.db_manager.fetch_column('category', 'name')))
+        mode = self.select_search_mode() if keywords.strip() else 'title'
+        print('\n'.join(self.db_manager.get_categories().values()))
         genre = input(self.localization_manager.get_localized_text('enter_genre_optional'))
         start_year = input(self.localization_manager.get_localized_text('enter_start_year_optional'))
         end_year = input(self.localization_manager.get_localized_text('enter_end_year_optional'))
         actor = input(self.localization_manager.get_localized_text('enter_actor_optional'))
-        print('\n'.join(['title', 'genre', 'release_year', 'actors']))
-        sort_by = input(self.localization_manager.get_localized_text('sort_by')).lower()
-        sort_order = input(self.localization_manager.get_localized_text('sort_order'))
+        sort_by = sort_order = ''
+        sort_columns = ['title', 'genre', 'release_year', 'actors']
+        if mode == 'title':
+            # Полнотекстовый поиск всегда сортирует результаты по релевантности
+            print('\n'.join(sort_columns))
+            sort_by = input(self.localization_manager.get_localized_text('sort_by')).lower()
+            sort_order = input(self.localization_manager.get_localized_text('sort_order'))
         self.query_logger.log_multiple_criteria_search(self.auth_manager.user_id, keywords, genre,
-                                                       start_year, end_year, actor)
+                                                       start_year, end_year, actor, mode)
+
+        if mode != 'title':
+            self.show_search_page(partial(
+                self.db_manager.full_text_search_page,
+                keywords,
+                mode=mode,
+                genre=genre or None,
+                start_year=start_year or None,
+                end_year=end_year or None,
+                actor_name=actor or None
+            ))
+            return
+
         keywords = keywords.split()
 
-        self.result = self.display_results(self.db_manager.search_movies(
+        self.show_search_page(partial(
+            self.db_manager.search_movies_page,
             keywords=keywords or None,
             genre=genre or None,
             start_year=start_year or None,
             end_year=end_year or None,
             actor_name=actor or None,
-            sort_by=sort_by or None,
+            sort_by=sort_by if sort_by in sort_columns else None,
             sort_order=sort_order if sort_order in ["ASC", "DESC"] else "ASC"
         ))
 
@@ -415,7 +536,8 @@ class FilmSearchApp:
             'year': self.localization_manager.get_localized_text('release_year'),
             'actor': self.localization_manager.get_localized_text('actors'),
             'end_year': self.localization_manager.get_localized_text('end_year'),
-            'start_year': self.localization_manager.get_localized_text('start_year')
+            'start_year': self.localization_manager.get_localized_text('start_year'),
+            'mode': self.localization_manager.get_localized_text('search_mode')
         }
         search_type_dict = {
             'keyword': self.localization_manager.get_localized_text('search_keyword'),
@@ -487,9 +609,9 @@ class FilmSearchApp:
         - str
             Код нового языка.
         """
-        select_languages = self.db_manager.fetch_column('language_pack', 'language_name')
-        select_languages = [self.localization_manager.get_localized_text(x.lower()) for x in select_languages]
-        select_code = self.db_manager.fetch_column('language_pack', 'language_code')
+        languages = self.db_manager.get_language_catalog()
+        select_languages = [self.localization_manager.get_localized_text(x['language_name'].lower()) for x in languages]
+        select_code = [x['language_code'] for x in languages]
         for idx, item in enumerate(select_languages, start=1):
             print(f'{idx}. {item}')
         choice = input(self.localization_manager.get_localized_text('choose_language'))
@@ -499,6 +621,66 @@ class FilmSearchApp:
             self.result = self.localization_manager.get_localized_text('invalid_option')
             return self.localization_manager.current_language_code
 
+    def show_search_page(self, fetch_page, cursor=None, direction='next'):
+        """
+        Отображение страницы результатов поиска и запоминание ее для постраничной навигации.
+
+        Параметры:
+        ----------
+        - fetch_page: callable
+            Функция, возвращающая SearchPage по ключу страницы (cursor) и направлению (direction).
+        - cursor: tuple or int
+            Ключ страницы (по умолчанию None — первая страница).
+        - direction: str
+            'next' или 'prev' (по умолчанию 'next').
+        """
+        page = fetch_page(cursor=cursor, direction=direction)
+        self.search_pager = fetch_page
+        self.search_page = page
+        self.result = self.display_results(page.rows)
+        if page.rows and (page.next_cursor is not None or page.prev_cursor is not None):
+            self.result += '\n' + self.localization_manager.get_localized_text('page_navigation_hint')
+
+    def next_page(self):
+        """
+        Переход на следующую страницу результатов последнего поиска.
+        """
+        if self.search_page is None or self.search_page.next_cursor is None:
+            self.result = self.localization_manager.get_localized_text('no_more_pages')
+            return
+        self.show_search_page(self.search_pager, self.search_page.next_cursor, 'next')
+
+    def previous_page(self):
+        """
+        Переход на предыдущую страницу результатов последнего поиска.
+        """
+        if self.search_page is None or self.search_page.prev_cursor is None:
+            self.result = self.localization_manager.get_localized_text('no_more_pages')
+            return
+        self.show_search_page(self.search_pager, self.search_page.prev_cursor, 'prev')
+
+    def display_query_stats(self):
+        """
+        Отображение статистики времени выполнения запросов к базе данных (p50/p95/p99 по формам запросов).
+        """
+        stats = get_query_stats().snapshot(QUERY_STATS_CONFIG['stats_limit'])
+        self.result = self.renderer.render_query_stats(stats)
+
+    def toggle_profiling(self):
+        """
+        Запуск или остановка профилирования сеанса (скрытая команда 'prof').
+
+        Профилирование запускается без перезапуска приложения и охватывает каждое следующее действие
+        пользователя; при повторной команде профили сохраняются в каталог PROFILING_CONFIG['directory'].
+        """
+        if self.session_profiler.active:
+            paths = self.session_profiler.stop(label=f'user{self.auth_manager.user_id}')
+            self.result = self.localization_manager.get_localized_text('profiling_saved').format(
+                ', '.join(paths) or '-')
+        else:
+            self.session_profiler.start(force=True)
+            self.result = self.localization_manager.get_localized_text('profiling_started')
+
     def display_results(self, results=None):
         """
         Отображение результатов поиска фильмов в форматированном виде.
@@ -513,32 +695,4 @@ class FilmSearchApp:
         - str
             Отформатированная строка с результатами поиска фильмов.
         """
-        result_list = []
-        width = len(self.localization_manager.get_localized_text('release_year'))
-
-        # Create header
-        result_list.append("+{:-<32}+{:-<22}+{:-<{width}}+{:-<40}".format("", "", "", "", width=width + 2))
-        result_list.append("| {:<30} | {:<20} | {:<{width}} | {:<40}".format(
-            self.localization_manager.get_localized_text('title'),
-            self.localization_manager.get_localized_text('genre'),
-            self.localization_manager.get_localized_text('release_year'),
-            self.localization_manager.get_localized_text('actors'),
-            width=width
-        ))
-        result_list.append("+{:-<32}+{:-<22}+{:-<{width}}+{:-<40}".format("", "", "", "", width=width + 2))
-
-        if results:
-            for film in results:
-                title = film.get('title') or ''
-                genre = film.get('genre') or ''
-                release_year = film.get('release_year') or ''
-                actors = film.get('actors') or ''
-
-                result_list.append("| {:<30} | {:<20} | {:<{width}} | {:<40}".format(
-                    title, genre, release_year, actors, width=width
-                ))
-
-            result_list.append("+{:-<32}+{:-<22}+{:-<{width}}+{:-<40}".format("", "", "", "", width=width + 2))
-            return '\n'.join(result_list)
-        else:
-            return self.localization_manager.get_localized_text('no_results_found')
+        return self.renderer.render_results(results)
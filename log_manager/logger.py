@@ -4,20 +4,31 @@ log_manager/logger.py
 
 Этот модуль содержит класс QueryLogger,который используется для ведения журнала поисковых запросов пользователей
 в базе данных и получения популярных поисковых запросов.
+Соединения берутся из общего пула (см. database/pool.py) на время каждого вызова.
+
+В фоновом режиме (QUERY_LOGGER_CONFIG['async_mode']) запросы не записываются сразу:
+log_query кладет запись в ограниченную очередь, а фоновый поток записывает накопленные
+записи пачками через executemany — по достижении batch_size или раз в flush_interval секунд.
+Поэтому запись журнала не задерживает сам поиск, а популярные запросы могут отставать
+от журнала на одну пачку.
+
+Вместе с записью в user_queries в той же транзакции увеличиваются счетчики в таблице
+user_query_stats (см. database_scripts/User_Query_Stats_Table.sql), из которой читаются
+популярные запросы без группировки всего журнала.
 
 Классы:
 -------
 QueryLogger
-    __init__(self)
+    __init__(self, **options)
         Инициализирует объект QueryLogger.
 
     connect(self)
-        Устанавливает соединение с базой данных.
+        Подключается к общему пулу соединений.
 
     disconnect(self)
-        Закрывает соединение с базой данных.
+        Отключается от общего пула соединений.
 
-    log_keyword_search(self, user_id, keywords)
+    log_keyword_search(self, user_id, keywords, mode='title')
         Записывает запрос поиска по ключевым словам.
 
     log_genre_search(self, user_id, genre)
@@ -29,37 +40,82 @@ QueryLogger
     log_actor_search(self, user_id, actor)
         Записывает запрос поиска по актеру.
 
-    log_multiple_criteria_search(self, user_id, keywords, genre, start_year, end_year, actor)
+    log_multiple_criteria_search(self, user_id, keywords, genre, start_year, end_year, actor, mode='title')
         Записывает запрос поиска по нескольким критериям.
 
     log_query(self, user_id, search_type, params)
-        Записывает поисковый запрос в базу данных.
+        Записывает поисковый запрос в базу данных (или ставит его в очередь на запись).
+
+    flush(self, timeout=None)
+        Дожидается записи запросов, поставленных в очередь к моменту вызова.
+
+    close(self)
+        Записывает оставшиеся запросы, останавливает фоновый поток и отключается от пула.
 
     get_popular_search_queries(self, limit=10)
         Получает популярные поисковые запросы.
 
     __del__(self)
-        Закрывает соединение с базой данных при удалении объекта.
+        Закрывает журнал при удалении объекта.
 """
 
-import mysql.connector
 import json
-from config import DATABASE_CONFIG
+import queue
+import threading
+import time
+from collections import Counter
+from config import DATABASE_CONFIG, QUERY_LOGGER_CONFIG
+from database.pool import get_connection_pool
+
+# Политики переполнения очереди
+OVERFLOW_POLICIES = ('block', 'drop_newest', 'drop_oldest')
+
+# Маркер остановки фонового потока
+_STOP = object()
+
+
+class _FlushMarker:
+    """
+    Маркер в очереди, о котором фоновый поток сообщает после записи всех записей перед ним.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
 
 
 class QueryLogger:
     """
     Класс для ведения журнала поисковых запросов пользователей.
 
+    Атрибуты:
+    ----------
+    async_mode : bool
+        Записывать ли запросы в фоновом потоке.
+    batch_size : int
+        Максимальное количество записей в одной пачке.
+    flush_interval : float
+        Максимальное время (в секундах), которое запись ждет в очереди до отправки.
+    max_queue_size : int
+        Максимальное количество записей в очереди.
+    overflow_policy : str
+        Поведение при заполненной очереди: 'block' — ждать не дольше block_timeout,
+        'drop_newest' — отбросить новую запись, 'drop_oldest' — отбросить самую старую.
+    block_timeout : float
+        Максимальное время ожидания места в очереди для политики 'block' (в секундах).
+    flush_timeout : float
+        Максимальное время ожидания записи очереди методом flush (в секундах).
+    dropped : int
+        Количество отброшенных записей.
+
     Методы:
     -------
-    __init__(self)
+    __init__(self, **options)
         Инициализирует объект QueryLogger.
     connect(self)
-        Устанавливает соединение с базой данных.
+        Подключается к общему пулу соединений.
     disconnect(self)
-        Закрывает соединение с базой данных.
-    log_keyword_search(self, user_id, keywords)
+        Отключается от общего пула соединений.
+    log_keyword_search(self, user_id, keywords, mode='title')
         Записывает запрос поиска по ключевым словам.
     log_genre_search(self, user_id, genre)
         Записывает запрос поиска по жанру.
@@ -67,40 +123,64 @@ class QueryLogger:
         Записывает запрос поиска по году.
     log_actor_search(self, user_id, actor)
         Записывает запрос поиска по актеру.
-    log_multiple_criteria_search(self, user_id, keywords, genre, start_year, end_year, actor)
+    log_multiple_criteria_search(self, user_id, keywords, genre, start_year, end_year, actor, mode='title')
         Записывает запрос поиска по нескольким критериям.
     log_query(self, user_id, search_type, params)
-        Записывает поисковый запрос в базу данных.
+        Записывает поисковый запрос в базу данных (или ставит его в очередь на запись).
+    flush(self, timeout=None)
+        Дожидается записи запросов, поставленных в очередь к моменту вызова.
+    close(self)
+        Записывает оставшиеся запросы, останавливает фоновый поток и отключается от пула.
     get_popular_search_queries(self, limit=10)
         Получает популярные поисковые запросы.
     __del__(self)
-        Закрывает соединение с базой данных при удалении объекта.
+        Закрывает журнал при удалении объекта.
     """
 
-    def __init__(self):
+    def __init__(self, **options):
         """
         Инициализирует объект QueryLogger.
+
+        Параметры:
+        ----------
+        **options
+            Переопределяют значения из QUERY_LOGGER_CONFIG: async_mode, batch_size, flush_interval,
+            max_queue_size, overflow_policy, block_timeout, flush_timeout.
         """
-        self.connection = None
-        self.cursor = None
+        settings = dict(QUERY_LOGGER_CONFIG, **options)
+        if settings['overflow_policy'] not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {settings['overflow_policy']}")
+
+        self.pool = None
+        self.async_mode = settings['async_mode']
+        self.batch_size = settings['batch_size']
+        self.flush_interval = settings['flush_interval']
+        self.max_queue_size = settings['max_queue_size']
+        self.overflow_policy = settings['overflow_policy']
+        self.block_timeout = settings['block_timeout']
+        self.flush_timeout = settings['flush_timeout']
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=self.max_queue_size)
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        # Проверка _closed и постановка в очередь выполняются под этой блокировкой,
+        # чтобы запись не встала в очередь после маркера остановки
+        self._close_lock = threading.Lock()
+        self._closed = False
 
     def connect(self):
         """
-        Устанавливает соединение с базой данных.
+        Подключается к общему пулу соединений.
         """
-        self.connection = mysql.connector.connect(**DATABASE_CONFIG)
-        self.cursor = self.connection.cursor()
+        self.pool = get_connection_pool(DATABASE_CONFIG)
 
     def disconnect(self):
         """
-        Закрывает соединение с базой данных.
+        Отключается от общего пула соединений.
         """
-        if self.cursor:
-            self.cursor.close()
-        if self.connection:
-            self.connection.close()
+        self.pool = None
 
-    def log_keyword_search(self, user_id, keywords):
+    def log_keyword_search(self, user_id, keywords, mode='title'):
         """
         Записывает запрос поиска по ключевым словам.
 
@@ -110,8 +190,13 @@ class QueryLogger:
             ID пользователя.
         keywords : str
             Ключевые слова для поиска.
+        mode : str, optional
+            Режим поиска: 'title' (по названию, по умолчанию), 'natural' или 'boolean' (полнотекстовый).
         """
-        self.log_query(user_id, "keyword", {"keywords": keywords})
+        params = {"keywords": keywords}
+        if mode != 'title':
+            params["mode"] = mode
+        self.log_query(user_id, "keyword", params)
 
     def log_genre_search(self, user_id, genre):
         """
@@ -152,7 +237,7 @@ class QueryLogger:
         """
         self.log_query(user_id, "actor", {"actor": actor})
 
-    def log_multiple_criteria_search(self, user_id, keywords, genre, start_year, end_year, actor):
+    def log_multiple_criteria_search(self, user_id, keywords, genre, start_year, end_year, actor, mode='title'):
         """
         Записывает запрос поиска по нескольким критериям.
 
@@ -170,10 +255,14 @@ class QueryLogger:
             Конечный год для поиска.
         actor : str
             Имя актера для поиска.
+        mode : str, optional
+            Режим поиска по ключевым словам: 'title' (по умолчанию), 'natural' или 'boolean'.
         """
-        self.log_query(user_id, "multiple_criteria",
-                       {"keywords": keywords, "genre": genre, "start_year": start_year, "end_year": end_year,
-                        "actor": actor, })
+        params = {"keywords": keywords, "genre": genre, "start_year": start_year, "end_year": end_year,
+                  "actor": actor, }
+        if mode != 'title':
+            params["mode"] = mode
+        self.log_query(user_id, "multiple_criteria", params)
 
     def log_query(self, user_id, search_type, params):
         """
@@ -188,21 +277,187 @@ class QueryLogger:
         params : dict
             Параметры поиска.
         """
-        if not self.connection:
+        record = (user_id, search_type, json.dumps(params))
+        if self.async_mode:
+            with self._close_lock:
+                if not self._closed:
+                    self._enqueue(record)
+                    return
+        # Синхронный режим или журнал уже закрыт: фоновый поток больше не принимает записи
+        self._write_batch([record])
+
+    def _write_batch(self, records):
+        """
+        Записывает пачку запросов в базу данных одним executemany
+        и увеличивает счетчики user_query_stats в той же транзакции.
+
+        Параметры:
+        ----------
+        records : list of tuple
+            Записи (user_id, search_type, search_params).
+        """
+        if not self.pool:
             self.connect()
 
         insert_query = """
         INSERT INTO user_queries (user_id, search_type, search_params)
         VALUES (%s, %s, %s)
         """
-        params = (user_id, search_type, json.dumps(params))
-        self.cursor.execute(insert_query, params)
-        self.connection.commit()
+        # Хеш считается от канонического вида JSON, как и при первичном заполнении таблицы;
+        # запрос со счетчиками зависит от диалекта и берется у хранилища (см. database/backends.py)
+        stats_query = self.pool.backend.QUERY_STATS_UPSERT
+        counts = Counter((search_type, search_params) for _, search_type, search_params in records)
+        stats = [(search_type, search_params, search_params, count)
+                 for (search_type, search_params), count in counts.items()]
+        with self.pool.cursor(commit=True) as cursor:
+            cursor.executemany(insert_query, records)
+            cursor.executemany(stats_query, stats)
+
+    def _enqueue(self, record):
+        """
+        Ставит запись в очередь фонового потока с учетом политики переполнения.
+        """
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+
+        if self.overflow_policy == 'block':
+            try:
+                self._queue.put(record, timeout=self.block_timeout)
+            except queue.Full:
+                self.dropped += 1
+        elif self.overflow_policy == 'drop_oldest':
+            try:
+                oldest = self._queue.get_nowait()
+                self._queue.task_done()
+                self.dropped += 1
+                if isinstance(oldest, _FlushMarker):
+                    # Маркер flush не отбрасывается, а встает в конец очереди вместо новой записи
+                    self._queue.put_nowait(oldest)
+                    return
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+        else:
+            self.dropped += 1
+
+    def _ensure_writer(self):
+        """
+        Запускает фоновый поток записи, если он еще не запущен.
+        """
+        if self._writer is not None:
+            return
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._writer_loop, name='query-logger', daemon=True)
+                self._writer.start()
+
+    def _writer_loop(self):
+        """
+        Цикл фонового потока: собирает пачку до batch_size записей или до истечения
+        flush_interval с момента первой записи в пачке и записывает ее.
+        Маркер flush завершает пачку досрочно; о нем сообщается после записи пачки.
+        """
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                break
+            if isinstance(item, _FlushMarker):
+                self._queue.task_done()
+                item.done.set()
+                continue
+
+            batch = [item]
+            marker = None
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                if isinstance(item, _FlushMarker):
+                    self._queue.task_done()
+                    marker = item
+                    break
+                batch.append(item)
+
+            try:
+                self._write_batch(batch)
+            except Exception as error:
+                print(f"Error writing query log: {error}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+                if marker is not None:
+                    marker.done.set()
+
+    def flush(self, timeout=None):
+        """
+        Дожидается записи запросов, поставленных в очередь к моменту вызова.
+
+        В очередь ставится маркер, и метод ждет, пока фоновый поток запишет все записи перед ним;
+        записи, поставленные в очередь после вызова, возврат не задерживают.
+
+        Параметры:
+        ----------
+        timeout : float, optional
+            Максимальное время ожидания в секундах (по умолчанию flush_timeout).
+
+        Возвращает:
+        ----------
+        bool
+            True, если записи записаны, и False, если время ожидания истекло.
+        """
+        if self._writer is None or not self._writer.is_alive():
+            return True
+        timeout = self.flush_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        marker = _FlushMarker()
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.done.wait(max(0.0, deadline - time.monotonic()))
+
+    def close(self):
+        """
+        Записывает оставшиеся запросы, останавливает фоновый поток и отключается от пула.
+        Повторный вызов ничего не делает.
+        """
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._writer is not None and self._writer.is_alive():
+                # Маркер встает в очередь после всех записей, поэтому поток запишет их до остановки
+                self._queue.put(_STOP)
+        if self._writer is not None:
+            self._writer.join()
+        self.disconnect()
 
     def get_popular_search_queries(self, limit=10):
         """
         Получает популярные поисковые запросы.
 
+        Запросы читаются из таблицы счетчиков user_query_stats по индексу idx_query_count,
+        поэтому время чтения не зависит от размера журнала. Метод не дожидается записи очереди
+        фонового потока: запросы последней пачки могут еще не входить в счетчики.
+
         Параметры:
         ----------
         limit : int, optional
@@ -213,22 +468,22 @@ class QueryLogger:
         list
             Список популярных поисковых запросов.
         """
-        if not self.connection:
+        if not self.pool:
             self.connect()
 
         query = """
-SELECT search_type, search_params, COUNT(*) AS query_count
-FROM user_queries
-GROUP BY search_type, search_params
+SELECT search_type, search_params, query_count
+FROM user_query_stats
 ORDER BY query_count DESC
         LIMIT %s
         """
         params = (limit,)
-        self.cursor.execute(query, params)
-        return self.cursor.fetchall()
+        with self.pool.cursor() as cursor:
+            cursor.execute(query, params)
+            return cursor.fetchall()
 
     def __del__(self):
         """
-        Закрывает соединение с базой данных при удалении объекта.
+        Закрывает журнал при удалении объекта.
         """
-        self.disconnect()
+        self.close()
@@ -7,20 +7,179 @@ main.py
 
 Использование:
     Запустите этот скрипт для запуска консольного приложения по поиску фильмов.
+
+    python main.py --startup-profile
+        Запуск с выводом длительности этапов запуска после первого кадра меню.
+
+    python main.py --profile cprofile,tracemalloc
+        Запуск с профилированием сеанса (см. utils/profiling.py); то же включает переменная окружения
+        FILM_SEARCH_PROFILE=cprofile,tracemalloc, а скрытая команда `prof` запускает и останавливает
+        профилирование без перезапуска приложения.
+
+    python main.py batch queries.jsonl [--workers N] [--limit N] [--output results.jsonl] [--no-cache]
+        Неинтерактивное выполнение запросов из файла JSONL (см. batch_runner.py).
+
+    python main.py serve [--host HOST] [--port PORT] [--workers N]
+        Запуск HTTP/JSON-сервиса поиска (см. api_server.py).
+
+    python main.py import-sqlite [film_search.db] [--scripts-dir database_scripts]
+        Сборка встроенной базы данных SQLite из скриптов MySQL (см. database/sqlite_import.py).
+
+    python main.py generate [catalog.db] [--scale 10] [--queries N] [--users N] [--seed N]
+        Генерация синтетического каталога и журнала запросов (см. benchmarks/generator.py).
+
+    python main.py bench [--output FILE] [--baseline FILE] [--save-baseline] [--only PREFIX ...]
+        Выполнение бенчмарков и сравнение с базовыми результатами (см. benchmarks/suite.py).
+
+    python main.py parity [--count N] [--seed N] [--page-size N]
+        Сравнение результатов движков поиска с результатами запросов к базе данных (см. benchmarks/parity.py).
 """
+import time
+
+# Момент запуска фиксируется до остальных импортов, чтобы отчет о запуске учитывал и их
+STARTED_AT = time.perf_counter()
+
+import argparse
+
 from config import DATABASE_CONFIG
-from film_search_app import FilmSearchApp
+from utils.startup import StartupProfiler
+
+
+def parse_args(argv=None):
+    """
+    Разбирает аргументы командной строки.
 
+    Параметры:
+    ----------
+    argv : list of str, optional
+        Аргументы командной строки (по умолчанию sys.argv[1:]).
 
-def main():
+    Возвращает:
+    ----------
+    argparse.Namespace
+        Разобранные аргументы.
+    """
+    parser = argparse.ArgumentParser(description='Console film search application.')
+    parser.add_argument('--startup-profile', action='store_true',
+                        help='print a per-phase startup timing breakdown after the first menu frame')
+    parser.add_argument('--profile', metavar='MODES',
+                        help="profile the session: comma-separated cprofile, tracemalloc or all "
+                             "(default: FILM_SEARCH_PROFILE environment variable, then PROFILING_CONFIG modes)")
+    subparsers = parser.add_subparsers(dest='command')
+
+    batch = subparsers.add_parser('batch', help='run searches from a JSONL file without the interactive menu')
+    batch.add_argument('input', help="JSONL file with {search_type, search_params} per line ('-' for stdin)")
+    batch.add_argument('--output', default='-', help="file for JSONL results (default: stdout)")
+    batch.add_argument('--workers', type=int, default=4,
+                       help='maximum number of concurrent searches (keep within POOL_CONFIG pool_size)')
+    batch.add_argument('--limit', type=int, default=10, help='maximum number of results per search')
+    batch.add_argument('--no-cache', action='store_true', help='bypass the search result cache')
+
+    serve = subparsers.add_parser('serve', help='serve the search functions as an HTTP/JSON API')
+    serve.add_argument('--host', help='address to listen on (default: API_SERVER_CONFIG host)')
+    serve.add_argument('--port', type=int, help='port to listen on (default: API_SERVER_CONFIG port)')
+    serve.add_argument('--workers', type=int,
+                       help='database worker threads (default: API_SERVER_CONFIG db_workers)')
+
+    import_sqlite = subparsers.add_parser('import-sqlite',
+                                          help='build an embedded SQLite database from the MySQL scripts')
+    import_sqlite.add_argument('path', nargs='?', default='film_search.db',
+                               help='SQLite database file to create (default: film_search.db)')
+    import_sqlite.add_argument('--scripts-dir', default=None,
+                               help='directory with the Sakila dump and table scripts (default: database_scripts)')
+
+    generate = subparsers.add_parser('generate', help='generate a synthetic catalog and query log for benchmarks')
+    generate.add_argument('path', nargs='?',
+                          help='build a new SQLite database at this path (default: add to DATABASE_CONFIG database)')
+    generate.add_argument('--scale', type=int, default=10, help='catalog size as a multiple of Sakila (default: 10)')
+    generate.add_argument('--queries', type=int,
+                          help='number of query log records (default: scale * BENCHMARK_CONFIG queries_per_scale)')
+    generate.add_argument('--users', type=int,
+                          help='number of users (default: scale * BENCHMARK_CONFIG users_per_scale)')
+    generate.add_argument('--seed', type=int, help='random seed (default: BENCHMARK_CONFIG seed)')
+    generate.add_argument('--scripts-dir', default=None,
+                          help='directory with the Sakila dump and table scripts (default: database_scripts)')
+
+    bench = subparsers.add_parser('bench', help='run the micro-benchmark suite and compare it with a baseline')
+    bench.add_argument('--output', help='JSON file for the results (default: BENCHMARK_CONFIG results_file)')
+    bench.add_argument('--baseline', help='baseline JSON file (default: BENCHMARK_CONFIG baseline_file)')
+    bench.add_argument('--save-baseline', action='store_true', help='store these results as the new baseline')
+    bench.add_argument('--repeat', type=int, help='measured runs per benchmark (default: BENCHMARK_CONFIG repeat)')
+    bench.add_argument('--warmup', type=int, help='warm-up runs per benchmark (default: BENCHMARK_CONFIG warmup)')
+    bench.add_argument('--only', nargs='+', metavar='PREFIX', help='run only benchmarks with these name prefixes')
+    bench.add_argument('--threshold', type=float,
+                       help='allowed relative p50 slowdown (default: BENCHMARK_CONFIG regression_threshold)')
+
+    parity = subparsers.add_parser('parity', help='check that every search engine returns the same results as SQL')
+    parity.add_argument('--count', type=int, default=200, help='number of random search criteria (default: 200)')
+    parity.add_argument('--seed', type=int, help='random seed (default: BENCHMARK_CONFIG seed)')
+    parity.add_argument('--page-size', type=int, default=7, help='page size for paging comparisons (default: 7)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """
     Инициализирует и запускает приложение FilmSearchApp.
 
     Создает экземпляр класса FilmSearchApp, используя конфигурацию базы данных
-    DATABASE_CONFIG из модуля config. Затем вызывает метод start() для запуска приложения.
+    DATABASE_CONFIG из модуля config. Затем вызывает метод start() для запуска приложения,
+    при необходимости профилируя сеанс (флаг --profile или переменная окружения FILM_SEARCH_PROFILE).
+    Команда `batch` вместо этого выполняет запросы из файла без интерактивного меню,
+    команда `serve` запускает HTTP/JSON-сервис поиска,
+    команда `import-sqlite` собирает встроенную базу данных SQLite,
+    команда `generate` генерирует синтетический каталог,
+    команда `bench` выполняет бенчмарки,
+    а команда `parity` сравнивает результаты движков поиска.
+
+    Параметры:
+    ----------
+    argv : list of str, optional
+        Аргументы командной строки (по умолчанию sys.argv[1:]).
     """
-    app = FilmSearchApp(DATABASE_CONFIG)
-    app.start()
+    args = parse_args(argv)
+    if args.command == 'batch':
+        from batch_runner import run_batch
+        run_batch(args)
+        return
+    if args.command == 'serve':
+        from api_server import run_server
+        run_server(args)
+        return
+    if args.command == 'import-sqlite':
+        from database.sqlite_import import run_import
+        run_import(args)
+        return
+    if args.command == 'generate':
+        from benchmarks.generator import run_generate
+        run_generate(args)
+        return
+    if args.command == 'bench':
+        from benchmarks.suite import run_benchmarks
+        run_benchmarks(args)
+        return
+    if args.command == 'parity':
+        from benchmarks.parity import run_parity
+        run_parity(args)
+        return
+
+    profiler = StartupProfiler(enabled=args.startup_profile, started_at=STARTED_AT)
+
+    from film_search_app import FilmSearchApp
+    from utils.profiling import SessionProfiler
+    profiler.record('imports', time.perf_counter() - STARTED_AT)
+
+    try:
+        session_profiler = SessionProfiler.from_config(args.profile)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    session_profiler.start()
+
+    app = FilmSearchApp(DATABASE_CONFIG, profiler=profiler, session_profiler=session_profiler)
+    try:
+        app.start()
+    finally:
+        # Выход из приложения завершает процесс через SystemExit, поэтому профили сохраняются здесь
+        session_profiler.stop(label=f'user{app.auth_manager.user_id}')
 
 
 if __name__ == "__main__":
@@ -6,6 +6,9 @@ utils/__init__.py
 Импортируемые модули:
 ----------------------
 load_localization_texts_from_file: Функция для загрузки текстов локализации из файла.
+ScreenRenderer: Класс для формирования и вывода экранов приложения (меню и таблицы результатов).
+StartupProfiler: Класс для замера длительности этапов запуска приложения.
+SessionProfiler: Класс для выборочного профилирования сеанса (cProfile и tracemalloc).
 
 Примеры использования:
 ----------------------
@@ -15,3 +18,6 @@ localization_texts = load_localization_texts_from_file('language_pack.json')
 # Использование localization_texts для доступа к текстам локализации в приложении.
 """
 from .localization import load_localization_texts_from_file
+from .rendering import ScreenRenderer
+from .startup import StartupProfiler
+from .profiling import SessionProfiler
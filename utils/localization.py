@@ -6,8 +6,32 @@ utils/localization.py
 который используется для управления локализацией текстов на разных языках.
 Он поддерживает загрузку языковых пакетов из базы данных и файлов, а также их сохранение.
 
+Все языковые пакеты загружаются из базы данных одним запросом в LocalizationStore и сохраняются
+в файл-кэш вместе с контрольной суммой таблиц локализации. При запуске пакеты читаются из файла,
+а актуальность файла проверяется в фоновом потоке: кэш перестраивается, только если
+содержимое базы данных изменилось. Смена языка лишь переключает ссылку на уже загруженный пакет.
+
 Классы:
 -------
+LocalizationStore
+    __init__(self)
+        Инициализирует пустое хранилище языковых пакетов.
+
+    load_from_database(self)
+        Загружает все языковые пакеты из базы данных.
+
+    load_from_file(self, path)
+        Загружает языковые пакеты из файла-кэша.
+
+    save_to_file(self, path, current_language_code=None)
+        Сохраняет языковые пакеты в файл-кэш.
+
+    is_stale(self)
+        Проверяет, изменилось ли содержимое таблиц локализации в базе данных.
+
+    get_pack(self, language_code)
+        Возвращает языковой пакет по коду языка.
+
 LocalizationManager
     __init__(self, language_file='language_pack.json')
         Инициализирует объект LocalizationManager.
@@ -25,7 +49,10 @@ LocalizationManager
         Возвращает локализованный текст по заданному ключу.
 
     change_language(self, new_language_code)
-        Меняет текущий язык и загружает соответствующий языковой пакет из базы данных.
+        Меняет текущий язык на один из загруженных языковых пакетов.
+
+    close(self)
+        Сохраняет выбранный язык в файл, если он изменился.
 
 Функции:
 --------
@@ -35,8 +62,188 @@ load_localization_texts_from_file(language_file='language_pack.json')
 
 import os
 import json
-import mysql.connector
+import sys
+import threading
 from config import DATABASE_CONFIG
+from database.backends import get_backend
+from database.pool import get_connection_pool
+
+CACHE_FORMAT_VERSION = 1
+
+DEFAULT_LANGUAGE_CODE = 'en'
+
+
+class LocalizationStore:
+    """
+    Хранилище всех языковых пакетов в памяти.
+
+    Ключи текстов интернируются и общие для всех языков, поэтому пакеты разных языков
+    не хранят отдельные копии одинаковых ключей.
+
+    Атрибуты:
+    ----------
+    signature : list of int or None
+        Количество строк и контрольные суммы таблиц localized_text и language_pack,
+        по которым построено хранилище.
+    languages : list of str
+        Коды загруженных языков.
+
+    Методы:
+    -------
+    load_from_database()
+        Загружает все языковые пакеты из базы данных.
+    load_from_file(path)
+        Загружает языковые пакеты из файла-кэша.
+    save_to_file(path, current_language_code=None)
+        Сохраняет языковые пакеты в файл-кэш.
+    is_stale()
+        Проверяет, изменилось ли содержимое таблиц локализации в базе данных.
+    get_pack(language_code)
+        Возвращает языковой пакет по коду языка.
+    """
+
+    # Контрольная сумма не зависит от порядка строк, поэтому совпадает при одинаковом содержимом
+    SIGNATURE_QUERY = """
+    SELECT
+        (SELECT COUNT(*) FROM localized_text) AS text_count,
+        (SELECT COALESCE(BIT_XOR(CRC32(CONCAT_WS(CHAR(31), language_id, text_key, text_value))), 0)
+         FROM localized_text) AS text_checksum,
+        (SELECT COUNT(*) FROM language_pack) AS language_count,
+        (SELECT COALESCE(BIT_XOR(CRC32(CONCAT_WS(CHAR(31), language_id, language_code))), 0)
+         FROM language_pack) AS language_checksum
+    """
+
+    TEXTS_QUERY = """
+    SELECT lp.language_code, lt.text_key, lt.text_value
+    FROM localized_text lt
+    JOIN language_pack lp ON lt.language_id = lp.language_id
+    """
+
+    def __init__(self):
+        """
+        Инициализирует пустое хранилище языковых пакетов.
+        """
+        self.signature = None
+        self._packs = {}
+
+    @property
+    def languages(self):
+        return list(self._packs)
+
+    @staticmethod
+    def _fetch_signature(cursor):
+        """
+        Читает количество строк и контрольные суммы таблиц локализации.
+        """
+        cursor.execute(LocalizationStore.SIGNATURE_QUERY)
+        return [int(value) for value in cursor.fetchone()]
+
+    def load_from_database(self):
+        """
+        Загружает все языковые пакеты из базы данных одним запросом.
+
+        Возвращает:
+        ----------
+        LocalizationStore
+            Это же хранилище.
+        """
+        with get_connection_pool(DATABASE_CONFIG).cursor() as cursor:
+            signature = self._fetch_signature(cursor)
+            cursor.execute(self.TEXTS_QUERY)
+            rows = cursor.fetchall()
+
+        packs = {}
+        for language_code, text_key, text_value in rows:
+            packs.setdefault(language_code, {})[sys.intern(text_key)] = text_value
+
+        self._packs = packs
+        self.signature = signature
+        return self
+
+    def load_from_file(self, path):
+        """
+        Загружает языковые пакеты из файла-кэша.
+
+        Параметры:
+        ----------
+        path : str
+            Путь к файлу-кэшу.
+
+        Возвращает:
+        ----------
+        dict or None
+            Служебные данные файла (ключ current_language_code) или None,
+            если файла нет или он создан другой версией формата.
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get('version') != CACHE_FORMAT_VERSION:
+            return None
+
+        keys = [sys.intern(key) for key in data['keys']]
+        self._packs = {
+            language_code: {key: value for key, value in zip(keys, values) if value is not None}
+            for language_code, values in data['packs'].items()
+        }
+        self.signature = data.get('signature')
+        return data.get('_meta', {})
+
+    def save_to_file(self, path, current_language_code=None):
+        """
+        Сохраняет языковые пакеты в файл-кэш.
+
+        Тексты хранятся таблицей: общий список ключей и по списку значений на каждый язык
+        (None — ключ не переведен на этот язык).
+
+        Параметры:
+        ----------
+        path : str
+            Путь к файлу-кэшу.
+        current_language_code : str, optional
+            Код выбранного языка, который восстанавливается при следующем запуске.
+        """
+        keys = sorted({key for pack in self._packs.values() for key in pack})
+        data = {
+            'version': CACHE_FORMAT_VERSION,
+            'signature': self.signature,
+            '_meta': {'current_language_code': current_language_code},
+            'keys': keys,
+            'packs': {language_code: [pack.get(key) for key in keys]
+                      for language_code, pack in self._packs.items()},
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+
+    def is_stale(self):
+        """
+        Проверяет, изменилось ли содержимое таблиц локализации в базе данных.
+
+        Возвращает:
+        ----------
+        bool
+            True, если хранилище нужно перестроить.
+        """
+        with get_connection_pool(DATABASE_CONFIG).cursor() as cursor:
+            return self._fetch_signature(cursor) != self.signature
+
+    def get_pack(self, language_code):
+        """
+        Возвращает языковой пакет по коду языка.
+
+        Параметры:
+        ----------
+        language_code : str
+            Код языка.
+
+        Возвращает:
+        ----------
+        dict or None
+            Словарь локализованных текстов или None, если язык не загружен.
+        """
+        return self._packs.get(language_code)
 
 
 class LocalizationManager:
@@ -51,6 +258,8 @@ class LocalizationManager:
         Код текущего языка.
     localized_texts : dict
         Словарь локализованных текстов.
+    store : LocalizationStore
+        Хранилище всех загруженных языковых пакетов.
 
     Методы:
     -------
@@ -65,13 +274,18 @@ class LocalizationManager:
     get_localized_text(text_key)
         Возвращает локализованный текст по заданному ключу.
     change_language(new_language_code)
-        Меняет текущий язык и загружает соответствующий языковой пакет из базы данных.
+        Меняет текущий язык на один из загруженных языковых пакетов.
+    close()
+        Сохраняет выбранный язык в файл, если он изменился.
     """
 
     def __init__(self, language_file='language_pack.json'):
         """
         Инициализирует объект LocalizationManager.
 
+        Если файл языкового пакета есть, тексты берутся из него, а его актуальность
+        проверяется в фоновом потоке. Иначе все языковые пакеты загружаются из базы данных.
+
         Параметры:
         ----------
         language_file : str, optional
@@ -80,16 +294,38 @@ class LocalizationManager:
         self.language_file = language_file
         self.current_language_code = None
         self.localized_texts = {}
+        self.store = LocalizationStore()
+        self._unsaved = False
+        self._refresh_thread = None
 
-        if os.path.exists(self.language_file):
-            self.load_language_pack_from_file()
+        if self.load_language_pack_from_file():
+            self._refresh_thread = threading.Thread(target=self._refresh_if_stale, daemon=True)
+            self._refresh_thread.start()
         else:
-            self.load_language_pack_from_database('en')
+            self.load_language_pack_from_database(self.current_language_code or DEFAULT_LANGUAGE_CODE)
             self.save_language_pack_to_file()
 
+    def _refresh_if_stale(self):
+        """
+        Перестраивает хранилище, если содержимое таблиц локализации изменилось.
+        Выполняется в фоновом потоке.
+        """
+        try:
+            if not self.store.is_stale():
+                return
+            store = LocalizationStore().load_from_database()
+        except get_backend(DATABASE_CONFIG).Error as error:
+            print(f"Error checking language packs in database: {error}")
+            return
+
+        # Подмена ссылок атомарна, поэтому читающий код видит либо старый, либо новый пакет
+        self.store = store
+        self.localized_texts = store.get_pack(self.current_language_code) or self.localized_texts
+        self.save_language_pack_to_file()
+
     def load_language_pack_from_database(self, language_code):
         """
-        Загружает языковой пакет из базы данных по заданному языковому коду.
+        Загружает языковые пакеты из базы данных и выбирает пакет по заданному языковому коду.
 
         Параметры:
         ----------
@@ -97,45 +333,49 @@ class LocalizationManager:
             Код языка для загрузки языкового пакета.
         """
         try:
-            connection = mysql.connector.connect(**DATABASE_CONFIG)
-            cursor = connection.cursor(dictionary=True)
-
-            query = """
-            SELECT lt.text_key, lt.text_value
-            FROM localized_text lt
-            JOIN language_pack lp ON lt.language_id = lp.language_id
-            WHERE lp.language_code = %s
-            """
-            cursor.execute(query, (language_code,))
-            localized_texts = cursor.fetchall()
-
-            self.localized_texts = {text['text_key']: text['text_value'] for text in localized_texts}
-            self.current_language_code = language_code
-
-            cursor.close()
-            connection.close()
-
-        except mysql.connector.Error as error:
+            store = LocalizationStore().load_from_database()
+        except get_backend(DATABASE_CONFIG).Error as error:
             print(f"Error loading language pack from database: {error}")
+            return
+
+        self.store = store
+        pack = store.get_pack(language_code)
+        if pack is not None:
+            self.localized_texts = pack
+            self.current_language_code = language_code
 
     def load_language_pack_from_file(self):
         """
         Загружает языковой пакет из файла.
+
+        Возвращает:
+        ----------
+        bool
+            True, если файл найден и создан текущей версией формата.
         """
-        if os.path.exists(self.language_file):
-            with open(self.language_file, 'r', encoding='utf-8') as f:
-                self.localized_texts = json.load(f)
-                self.current_language_code = self.localized_texts.get('_meta', {}).get('current_language_code', None)
-        else:
+        if not os.path.exists(self.language_file):
             print(f"Language file '{self.language_file}' not found. Creating a new one.")
+            return False
+
+        meta = self.store.load_from_file(self.language_file)
+        if meta is None:
+            return False
+
+        language_code = meta.get('current_language_code') or DEFAULT_LANGUAGE_CODE
+        pack = self.store.get_pack(language_code)
+        if pack is None:
+            return False
+        self.localized_texts = pack
+        self.current_language_code = language_code
+        return True
 
     def save_language_pack_to_file(self):
         """
-        Сохраняет текущий языковой пакет в файл.
+        Сохраняет языковые пакеты и выбранный язык в файл.
         """
         try:
-            with open(self.language_file, 'w', encoding='utf-8') as f:
-                json.dump(self.localized_texts, f, ensure_ascii=False, indent=4)
+            self.store.save_to_file(self.language_file, self.current_language_code)
+            self._unsaved = False
         except Exception as e:
             print(f"Error saving language pack to file: {e}")
 
@@ -157,17 +397,35 @@ class LocalizationManager:
 
     def change_language(self, new_language_code):
         """
-        Меняет текущий язык и загружает соответствующий языковой пакет из базы данных.
+        Меняет текущий язык на один из загруженных языковых пакетов.
+
+        Смена языка не обращается ни к базе данных, ни к файлу: выбранный язык
+        сохраняется при выходе из приложения (см. close()). Из базы данных пакеты
+        загружаются, только если нужного языка нет в хранилище.
 
         Параметры:
         ----------
         new_language_code : str
-            Код нового языка для загрузки языкового пакета.
+            Код нового языка.
         """
-        if new_language_code != self.current_language_code:
+        if new_language_code == self.current_language_code:
+            return
+
+        pack = self.store.get_pack(new_language_code)
+        if pack is None:
             self.load_language_pack_from_database(new_language_code)
+            self.save_language_pack_to_file()
+            return
+
+        self.localized_texts = pack
+        self.current_language_code = new_language_code
+        self._unsaved = True
 
-            self.localized_texts['_meta'] = {'current_language_code': new_language_code}
+    def close(self):
+        """
+        Сохраняет выбранный язык в файл, если он изменился.
+        """
+        if self._unsaved:
             self.save_language_pack_to_file()
 
 
@@ -0,0 +1,322 @@
+"""
+utils/profiling.py
+------------------
+
+Этот модуль содержит класс SessionProfiler, который по запросу профилирует сеанс работы с приложением
+с помощью cProfile и/или tracemalloc и сохраняет профили в каталог PROFILING_CONFIG['directory'].
+
+Профилирование включается флагом `python main.py --profile cprofile,tracemalloc`, переменной окружения
+FILM_SEARCH_PROFILE с тем же значением или скрытой командой `prof` главного меню, которая запускает
+и останавливает его без перезапуска приложения.
+
+Чтобы профилирование можно было держать включенным постоянно, оно выборочное: профилируется только доля
+сеансов (session_sample_rate), а cProfile включается только на время доли действий пользователя
+(action_sample_rate) — между действиями и в невыбранных действиях накладных расходов нет.
+Команда `prof` профилирует все действия, пока ее не вызовут повторно.
+
+cProfile замеряет только поток, в котором выполняются действия пользователя (главный поток приложения);
+tracemalloc учитывает выделения памяти во всех потоках.
+
+Классы:
+-------
+SessionProfiler
+    __init__(self, modes=(), directory='profiles', session_sample_rate=1.0, action_sample_rate=1.0,
+             tracemalloc_frames=1, top_n=25)
+        Инициализирует объект SessionProfiler.
+
+    from_config(cls, modes=None)
+        Создает профилировщик по PROFILING_CONFIG, флагу командной строки и переменной окружения.
+
+    start(self, modes=None, force=False)
+        Начинает профилирование сеанса.
+
+    action(self)
+        Контекстный менеджер, профилирующий одно действие пользователя.
+
+    stop(self, label='')
+        Останавливает профилирование и сохраняет профили.
+
+Функции:
+--------
+parse_profile_modes(value)
+    Разбирает список режимов профилирования.
+"""
+
+import cProfile
+import io
+import os
+import random
+import time
+from contextlib import contextmanager
+
+from config import PROFILING_CONFIG
+
+# Переменная окружения, включающая профилирование (значение — как у флага --profile)
+PROFILE_ENV_VARIABLE = 'FILM_SEARCH_PROFILE'
+
+# Режимы профилирования
+PROFILE_MODES = ('cprofile', 'tracemalloc')
+
+
+def parse_profile_modes(value):
+    """
+    Разбирает список режимов профилирования.
+
+    Параметры:
+    ----------
+    value : str or None
+        Режимы через запятую: 'cprofile', 'tracemalloc' или 'all' (оба режима).
+
+    Возвращает:
+    ----------
+    tuple of str
+        Режимы профилирования (пустой кортеж, если значение пустое).
+
+    Исключения:
+    -----------
+    ValueError
+        Если указан неизвестный режим.
+    """
+    modes = []
+    for mode in (value or '').lower().split(','):
+        mode = mode.strip()
+        if not mode:
+            continue
+        if mode == 'all':
+            modes.extend(PROFILE_MODES)
+        elif mode in PROFILE_MODES:
+            modes.append(mode)
+        else:
+            raise ValueError(f"Unknown profiling mode: {mode} (expected {', '.join(PROFILE_MODES)} or all)")
+    return tuple(dict.fromkeys(modes))
+
+
+class SessionProfiler:
+    """
+    Класс для выборочного профилирования сеанса работы с приложением.
+
+    Атрибуты:
+    ----------
+    modes : tuple of str
+        Режимы профилирования по умолчанию ('cprofile', 'tracemalloc').
+    directory : str
+        Каталог, в который сохраняются профили.
+    session_sample_rate : float
+        Доля сеансов, которые профилируются при включении флагом или переменной окружения.
+    action_sample_rate : float
+        Доля действий пользователя, которые профилируются cProfile.
+    tracemalloc_frames : int
+        Глубина стека, сохраняемая tracemalloc для каждого выделения памяти.
+    top_n : int
+        Количество строк в текстовых сводках профилей.
+    active : bool
+        Идет ли профилирование.
+    actions : int
+        Количество действий пользователя с начала профилирования.
+    sampled_actions : int
+        Количество действий, профилированных cProfile.
+
+    Методы:
+    -------
+    from_config(modes=None)
+        Создает профилировщик по PROFILING_CONFIG, флагу командной строки и переменной окружения.
+    start(modes=None, force=False)
+        Начинает профилирование сеанса.
+    action()
+        Контекстный менеджер, профилирующий одно действие пользователя.
+    stop(label='')
+        Останавливает профилирование и сохраняет профили.
+    """
+
+    def __init__(self, modes=(), directory='profiles', session_sample_rate=1.0, action_sample_rate=1.0,
+                 tracemalloc_frames=1, top_n=25):
+        """
+        Инициализирует объект SessionProfiler.
+
+        Параметры:
+        ----------
+        modes : tuple of str, optional
+            Режимы профилирования по умолчанию (по умолчанию пустой кортеж — профилирование выключено).
+        directory : str, optional
+            Каталог для профилей (по умолчанию 'profiles').
+        session_sample_rate : float, optional
+            Доля профилируемых сеансов (по умолчанию 1.0).
+        action_sample_rate : float, optional
+            Доля действий, профилируемых cProfile (по умолчанию 1.0).
+        tracemalloc_frames : int, optional
+            Глубина стека tracemalloc (по умолчанию 1 — меньше всего накладных расходов).
+        top_n : int, optional
+            Количество строк в текстовых сводках (по умолчанию 25).
+        """
+        self.modes = tuple(modes)
+        self.directory = directory
+        self.session_sample_rate = session_sample_rate
+        self.action_sample_rate = action_sample_rate
+        self.tracemalloc_frames = tracemalloc_frames
+        self.top_n = top_n
+        self.active = False
+        self.actions = 0
+        self.sampled_actions = 0
+        self._rate = action_sample_rate
+        self._profile = None
+        self._memory = False
+        self._tracing = False
+        self._started_at = None
+
+    @classmethod
+    def from_config(cls, modes=None):
+        """
+        Создает профилировщик по PROFILING_CONFIG.
+
+        Параметры:
+        ----------
+        modes : str, optional
+            Значение флага --profile. Если не задано, режимы берутся из переменной окружения
+            FILM_SEARCH_PROFILE, а если нет и ее — из PROFILING_CONFIG['modes'].
+
+        Возвращает:
+        ----------
+        SessionProfiler
+            Профилировщик (еще не запущенный).
+
+        Исключения:
+        -----------
+        ValueError
+            Если указан неизвестный режим.
+        """
+        if modes is None:
+            modes = os.environ.get(PROFILE_ENV_VARIABLE)
+        if modes is None:
+            modes = ','.join(PROFILING_CONFIG['modes'])
+        return cls(modes=parse_profile_modes(modes),
+                   directory=PROFILING_CONFIG['directory'],
+                   session_sample_rate=PROFILING_CONFIG['session_sample_rate'],
+                   action_sample_rate=PROFILING_CONFIG['action_sample_rate'],
+                   tracemalloc_frames=PROFILING_CONFIG['tracemalloc_frames'],
+                   top_n=PROFILING_CONFIG['top_n'])
+
+    def start(self, modes=None, force=False):
+        """
+        Начинает профилирование сеанса.
+
+        Параметры:
+        ----------
+        modes : tuple of str, optional
+            Режимы профилирования (по умолчанию modes объекта, а если они не заданы — 'cprofile').
+        force : bool, optional
+            Профилировать независимо от session_sample_rate и каждое действие пользователя
+            (так запускает профилирование команда `prof`; по умолчанию False).
+
+        Возвращает:
+        ----------
+        bool
+            True, если профилирование запущено.
+        """
+        if self.active:
+            return True
+        if not force:
+            modes = modes or self.modes
+            if not modes or random.random() >= self.session_sample_rate:
+                return False
+        modes = modes or self.modes or PROFILE_MODES[:1]
+
+        # pstats и tracemalloc импортируются только при профилировании: вместе они заметно удлиняют запуск
+        import tracemalloc
+
+        self._rate = 1.0 if force else self.action_sample_rate
+        self.actions = 0
+        self.sampled_actions = 0
+        self._started_at = time.localtime()
+        if 'cprofile' in modes:
+            self._profile = cProfile.Profile()
+        # tracemalloc может быть уже запущен (например, python -X tracemalloc) — тогда его не останавливаем
+        self._memory = 'tracemalloc' in modes
+        if self._memory and not tracemalloc.is_tracing():
+            tracemalloc.start(self.tracemalloc_frames)
+            self._tracing = True
+        self.active = True
+        return True
+
+    @contextmanager
+    def action(self):
+        """
+        Контекстный менеджер, профилирующий одно действие пользователя cProfile
+        (с вероятностью action_sample_rate, если профилирование запущено).
+        """
+        if not self.active:
+            yield
+            return
+        self.actions += 1
+        profile = self._profile
+        if profile is None or random.random() >= self._rate:
+            yield
+            return
+        self.sampled_actions += 1
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+
+    def stop(self, label=''):
+        """
+        Останавливает профилирование и сохраняет профили в каталог directory.
+
+        Для cProfile сохраняются файл .prof (для pstats, snakeviz и т.п.) и текстовая сводка
+        по суммарному времени, для tracemalloc — снимок .snapshot (tracemalloc.Snapshot.load)
+        и текстовая сводка по строкам с наибольшим объемом выделенной памяти.
+
+        Параметры:
+        ----------
+        label : str, optional
+            Метка, добавляемая к именам файлов (например, идентификатор пользователя).
+
+        Возвращает:
+        ----------
+        list of str
+            Пути сохраненных файлов (пустой список, если профилирование не было запущено).
+        """
+        if not self.active:
+            return []
+        import pstats
+        import tracemalloc
+
+        self.active = False
+        profile, self._profile = self._profile, None
+        if profile is not None:
+            profile.disable()
+        snapshot = None
+        if self._memory and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            if self._tracing:
+                tracemalloc.stop()
+        self._memory = self._tracing = False
+
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"session-{time.strftime('%Y%m%d-%H%M%S', self._started_at)}-{os.getpid()}"
+        if label:
+            name += f'-{label}'
+        base = os.path.join(self.directory, name)
+        paths = []
+
+        if profile is not None and self.sampled_actions:
+            profile.dump_stats(base + '.prof')
+            summary = io.StringIO()
+            summary.write(f'Profiled actions: {self.sampled_actions} of {self.actions}\n')
+            pstats.Stats(profile, stream=summary).sort_stats('cumulative').print_stats(self.top_n)
+            with open(base + '.txt', 'w', encoding='utf-8') as file:
+                file.write(summary.getvalue())
+            paths.extend([base + '.prof', base + '.txt'])
+
+        if snapshot is not None:
+            snapshot.dump(base + '.snapshot')
+            # В сводку не попадают выделения самого tracemalloc и импорта модулей
+            statistics = snapshot.filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            )).statistics('lineno')
+            with open(base + '-alloc.txt', 'w', encoding='utf-8') as file:
+                file.write(f'Traced memory: {sum(stat.size for stat in statistics) / 1024:.1f} KiB\n')
+                file.writelines(f'{stat}\n' for stat in statistics[:self.top_n])
+            paths.extend([base + '.snapshot', base + '-alloc.txt'])
+        return paths
@@ -0,0 +1,236 @@
+"""
+utils/rendering.py
+------------------
+
+Этот модуль содержит класс ScreenRenderer, который формирует экраны приложения:
+главное меню в рамках и таблицу результатов поиска.
+
+Разметка меню и таблицы собирается один раз для каждого языка и состояния входа пользователя
+и хранится до смены языка. Строки результатов форматируются готовым шаблоном в один буфер,
+а каждый кадр выводится одним вызовом sys.stdout.write — это заметно быстрее построчного
+print при работе через медленное SSH-соединение.
+
+Классы:
+-------
+ScreenRenderer
+    __init__(self, localization_manager, chunk_size=5, stream=None)
+        Инициализирует объект ScreenRenderer.
+
+    render_menu(self, username=None)
+        Возвращает разметку главного меню.
+
+    render_results(self, results=None)
+        Возвращает таблицу результатов поиска.
+
+    render_query_stats(self, stats)
+        Возвращает таблицу статистики запросов к базе данных.
+
+    write_frame(self, *parts)
+        Выводит кадр одним вызовом write.
+"""
+
+import re
+import sys
+
+# Ключи пунктов главного меню: общие, для гостя, для вошедшего пользователя и пункты поиска
+MENU_HEAD_KEYS = ('change_language', 'display_popular_queries')
+MENU_GUEST_KEYS = ('register', 'login', 'exit')
+MENU_USER_KEYS = ('logout', 'exit')
+MENU_SEARCH_KEYS = ('search_keyword', 'search_genre', 'search_year', 'search_actor', 'search_multiple_criteria')
+
+# Список столбцов запроса SELECT (до первого FROM) в таблице статистики запросов
+SELECT_COLUMNS = re.compile(r'^SELECT\s.+?\sFROM\s', re.I)
+
+
+class ScreenRenderer:
+    """
+    Класс для формирования и вывода экранов приложения.
+
+    Атрибуты:
+    ----------
+    localization_manager : LocalizationManager
+        Менеджер локализации, из которого берутся тексты текущего языка.
+    chunk_size : int
+        Количество пунктов меню в одной строке.
+    stream : file object
+        Поток вывода (по умолчанию sys.stdout).
+
+    Методы:
+    -------
+    render_menu(username=None)
+        Возвращает разметку главного меню.
+    render_results(results=None)
+        Возвращает таблицу результатов поиска.
+    render_query_stats(stats)
+        Возвращает таблицу статистики запросов к базе данных.
+    write_frame(*parts)
+        Выводит кадр одним вызовом write.
+    """
+
+    def __init__(self, localization_manager, chunk_size=5, stream=None):
+        """
+        Инициализирует объект ScreenRenderer.
+
+        Параметры:
+        ----------
+        localization_manager : LocalizationManager
+            Менеджер локализации.
+        chunk_size : int, optional
+            Количество пунктов меню в одной строке (по умолчанию 5).
+        stream : file object, optional
+            Поток вывода (по умолчанию sys.stdout).
+        """
+        self.localization_manager = localization_manager
+        self.chunk_size = chunk_size
+        self.stream = stream
+        self._texts = None
+        self._menus = {}
+        self._table = None
+
+    def _check_language(self):
+        """
+        Сбрасывает собранные шаблоны, если сменился языковой пакет.
+        Пакет сравнивается по ссылке, поэтому проверка не зависит от количества текстов.
+        """
+        texts = self.localization_manager.localized_texts
+        if texts is not self._texts:
+            self._texts = texts
+            self._menus.clear()
+            self._table = None
+
+    def _compile_menu(self, items):
+        """
+        Собирает разметку меню: пункты в рамках по chunk_size в строке.
+        """
+        boxes = []
+        for idx, item in enumerate(items, start=1):
+            item_string = f'|[{idx}]{item}|'
+            border = f'+{"-" * (len(item_string) - 2)}+'
+            boxes.append((border, item_string, border))
+
+        lines = []
+        for i in range(0, len(boxes), self.chunk_size):
+            for string in zip(*boxes[i:i + self.chunk_size]):
+                lines.append(' '.join(string))
+        return '\n'.join(lines)
+
+    def render_menu(self, username=None):
+        """
+        Возвращает разметку главного меню.
+
+        Параметры:
+        ----------
+        username : str, optional
+            Имя вошедшего пользователя (None — пользователь не вошел).
+
+        Возвращает:
+        ----------
+        str
+            Разметка меню без завершающего перевода строки.
+        """
+        self._check_language()
+        menu = self._menus.get(username)
+        if menu is None:
+            text = self.localization_manager.get_localized_text
+            items = [text(key) for key in MENU_HEAD_KEYS]
+            if username is None:
+                items.extend(text(key) for key in MENU_GUEST_KEYS)
+            else:
+                # Имя пользователя выводится как есть, а не как ключ локализации
+                items.append(f'{username}')
+                items.extend(text(key) for key in MENU_USER_KEYS)
+            items.extend(text(key) for key in MENU_SEARCH_KEYS)
+            menu = self._compile_menu(items)
+            self._menus[username] = menu
+        return menu
+
+    def _compile_table(self):
+        """
+        Собирает шаблоны таблицы результатов: заголовок, разделитель и формат строки.
+        """
+        text = self.localization_manager.get_localized_text
+        width = len(text('release_year'))
+        separator = "+{:-<32}+{:-<22}+{:-<{width}}+{:-<40}".format("", "", "", "", width=width + 2)
+        row_format = "| {:<30} | {:<20} | {:<%d} | {:<40}" % width
+        header = '\n'.join([
+            separator,
+            row_format.format(text('title'), text('genre'), text('release_year'), text('actors')),
+            separator,
+        ])
+        self._table = (header, separator, row_format, text('no_results_found'))
+
+    def render_results(self, results=None):
+        """
+        Возвращает таблицу результатов поиска.
+
+        Параметры:
+        ----------
+        results : list of dict, optional
+            Список фильмов для отображения.
+
+        Возвращает:
+        ----------
+        str
+            Отформатированная таблица или сообщение об отсутствии результатов.
+        """
+        self._check_language()
+        if self._table is None:
+            self._compile_table()
+        header, separator, row_format, no_results = self._table
+        if not results:
+            return no_results
+
+        buffer = [header]
+        buffer.extend(
+            row_format.format(film.get('title') or '', film.get('genre') or '',
+                              film.get('release_year') or '', film.get('actors') or '')
+            for film in results
+        )
+        buffer.append(separator)
+        return '\n'.join(buffer)
+
+    def render_query_stats(self, stats):
+        """
+        Возвращает таблицу статистики запросов к базе данных: количество вызовов, строки
+        и перцентили длительности (в миллисекундах) для каждой формы запроса.
+
+        Параметры:
+        ----------
+        stats : list of dict
+            Сводка QueryStats.snapshot().
+
+        Возвращает:
+        ----------
+        str
+            Отформатированная таблица или сообщение об отсутствии статистики.
+        """
+        text = self.localization_manager.get_localized_text
+        if not stats:
+            return text('no_query_stats')
+
+        row_format = "| {:>7} | {:>9} | {:>9} | {:>9} | {:>9} | {:>9} | {:<60}"
+        separator = "+{:-<9}+{:-<11}+{:-<11}+{:-<11}+{:-<11}+{:-<11}+{:-<62}".format(*[""] * 7)
+        buffer = [text('query_stats'), separator,
+                  row_format.format('calls', 'rows', 'p50 ms', 'p95 ms', 'p99 ms', 'max ms', 'query'), separator]
+        for item in stats:
+            # Список столбцов SELECT почти не различает формы, поэтому в таблице он сворачивается
+            shape = SELECT_COLUMNS.sub('SELECT ... FROM ', item['shape'], count=1)
+            shape = shape if len(shape) <= 60 else shape[:57] + '...'
+            buffer.append(row_format.format(item['calls'], item['rows'], f"{item['p50_ms']:.2f}",
+                                            f"{item['p95_ms']:.2f}", f"{item['p99_ms']:.2f}",
+                                            f"{item['max_ms']:.2f}", shape))
+        buffer.append(separator)
+        return '\n'.join(buffer)
+
+    def write_frame(self, *parts):
+        """
+        Выводит кадр одним вызовом write: части разделяются переводом строки.
+
+        Параметры:
+        ----------
+        *parts : str
+            Части кадра (заголовок, меню, результат).
+        """
+        stream = self.stream or sys.stdout
+        stream.write('\n'.join(parts) + '\n')
+        stream.flush()
@@ -0,0 +1,145 @@
+"""
+utils/startup.py
+----------------
+
+Этот модуль содержит класс StartupProfiler, который замеряет длительность этапов запуска приложения
+(импорт модулей, загрузка локализации, создание менеджеров, фоновый прогрев, первый кадр меню)
+и выводит отчет в режиме `python main.py --startup-profile`.
+
+Классы:
+-------
+StartupProfiler
+    __init__(self, enabled=False, started_at=None)
+        Инициализирует объект StartupProfiler.
+
+    phase(self, name)
+        Контекстный менеджер, замеряющий длительность этапа.
+
+    timed(self, name, func)
+        Возвращает функцию, замеряющую длительность вызова func.
+
+    record(self, name, duration)
+        Записывает длительность этапа.
+
+    report(self)
+        Возвращает отчет о длительности этапов.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """
+    Класс для замера длительности этапов запуска приложения.
+
+    Если замер выключен, этапы не записываются, и накладные расходы сводятся к вызову функции.
+
+    Атрибуты:
+    ----------
+    enabled : bool
+        Записывать ли длительность этапов.
+    started_at : float
+        Момент запуска процесса по time.perf_counter (от него считается время до первого кадра).
+    phases : list of tuple
+        Записанные этапы: (название, длительность в секундах, поток).
+
+    Методы:
+    -------
+    phase(name)
+        Контекстный менеджер, замеряющий длительность этапа.
+    timed(name, func)
+        Возвращает функцию, замеряющую длительность вызова func.
+    record(name, duration)
+        Записывает длительность этапа.
+    report()
+        Возвращает отчет о длительности этапов.
+    """
+
+    def __init__(self, enabled=False, started_at=None):
+        """
+        Инициализирует объект StartupProfiler.
+
+        Параметры:
+        ----------
+        enabled : bool, optional
+            Записывать ли длительность этапов (по умолчанию False).
+        started_at : float, optional
+            Момент запуска процесса по time.perf_counter (по умолчанию — момент создания объекта).
+        """
+        self.enabled = enabled
+        self.started_at = time.perf_counter() if started_at is None else started_at
+        self.phases = []
+        self._lock = threading.Lock()
+
+    def record(self, name, duration):
+        """
+        Записывает длительность этапа.
+
+        Параметры:
+        ----------
+        name : str
+            Название этапа.
+        duration : float
+            Длительность в секундах.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self.phases.append((name, duration, threading.current_thread().name))
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Контекстный менеджер, замеряющий длительность этапа.
+
+        Параметры:
+        ----------
+        name : str
+            Название этапа.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def timed(self, name, func):
+        """
+        Возвращает функцию, замеряющую длительность вызова func (для задач, выполняемых в других потоках).
+
+        Параметры:
+        ----------
+        name : str
+            Название этапа.
+        func : callable
+            Функция без аргументов.
+
+        Возвращает:
+        ----------
+        callable
+            Обертка над func.
+        """
+        def wrapper():
+            with self.phase(name):
+                return func()
+        return wrapper
+
+    def report(self):
+        """
+        Возвращает отчет о длительности этапов.
+
+        Возвращает:
+        ----------
+        str
+            Таблица этапов в порядке завершения и время от запуска процесса до построения отчета.
+        """
+        with self._lock:
+            phases = list(self.phases)
+        width = max([len(name) for name, _, _ in phases] + [len('total')])
+        lines = ['Startup profile:']
+        for name, duration, thread_name in phases:
+            lines.append(f'  {name:<{width}}  {duration * 1000:8.1f} ms  [{thread_name}]')
+        lines.append(f'  {"total":<{width}}  {(time.perf_counter() - self.started_at) * 1000:8.1f} ms')
+        return '\n'.join(lines)